@@ -0,0 +1,89 @@
+# Benchmark: ThreadedPortScanner vs AsyncPortScanner vs SelectorPortScanner vs ShardedPortScanner on a loopback target
+# with many listeners
+# (the sharded engine only gets faster than the others with more than one CPU  -  with one, it pays the start-up of
+# its processes (~0.2 s each) & the passing of results between them for nothing)
+#
+# Run from the repository root:
+#     python -m benchmarks.engine_throughput [listeners] [ports]
+
+# Import Libs
+import io
+import sys
+import time
+import queue
+import socket
+import contextlib
+
+from src.scanner import ThreadedPortScanner
+from src.async_scanner import AsyncPortScanner
+from src.selector_scanner import SelectorPortScanner
+from src.sharded_scanner import ShardedPortScanner, default_processes
+from src.results import SCAN_DONE, OPEN
+
+
+# Function to open (up to) 'count' listening sockets on loopback ports starting at 'base'
+def open_listeners(base, count):
+    listeners = []
+    port = base
+    while len(listeners) < count and port <= 65535:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            sock.bind(("127.0.0.1", port))
+            sock.listen(128)
+            listeners.append(sock)
+        except OSError:  # Port already in use  -  skip it
+            sock.close()
+        port += 1
+    return listeners
+
+
+# Function to run one scan engine & return (seconds taken, number of open ports found)
+def run_engine(engine, ports, workers, **settings):
+    q = queue.Queue()
+    start = time.perf_counter()
+    # Silence the scanners' console output while timing
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine(q, args=("127.0.0.1", ports), kwargs=dict(settings, max_workers=workers)).start()
+
+        # Drain the streamed result batches until the scan is done
+        found = 0
+        for batch in iter(q.get, SCAN_DONE):
+            found += sum(1 for row in batch if row[2] == OPEN)
+    elapsed = time.perf_counter() - start
+    return elapsed, found
+
+
+def main():
+    listener_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    port_count = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+
+    # Listeners sit at the start of the range  -  the rest of the range refuses connections
+    base = 20000
+    listeners = open_listeners(base, listener_count)
+    ports = range(base, min(base + port_count, 65536))
+    print(f"{len(listeners)} listeners, scanning {len(ports)} loopback ports ({default_processes()} CPUs)\n")
+
+    # Sharded: 256 workers per process (split between the processes by the scanner)
+    processes = max(2, default_processes())
+
+    try:
+        for name, engine, workers, settings in (("threads", ThreadedPortScanner, 256, {}),
+                                                ("asyncio", AsyncPortScanner, 256, {}),
+                                                ("asyncio", AsyncPortScanner, 1024, {}),
+                                                ("selectors", SelectorPortScanner, 1024, {}),
+                                                ("selectors", SelectorPortScanner, 4096, {}),
+                                                (f"{processes}-proc", ShardedPortScanner, 256 * processes,
+                                                 {'processes': processes}),
+                                                (f"{processes}-proc", ShardedPortScanner, 1024 * processes,
+                                                 {'processes': processes, 'shard_engine': 'selectors'})):
+            elapsed, found = run_engine(engine, ports, workers, **settings)
+            engine_name = f"{name} ({settings['shard_engine']})" if 'shard_engine' in settings else name
+            print(f"{engine_name:<19} workers={workers:<5} {elapsed:8.3f} s  {len(ports) / elapsed:10.0f} ports/s  "
+                  f"open={found}")
+    finally:
+        for sock in listeners:
+            sock.close()
+
+
+if __name__ == "__main__":
+    main()
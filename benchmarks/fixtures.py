@@ -0,0 +1,92 @@
+# Local (loopback) scan targets for the benchmarks  -  no network / root / firewall rules needed
+#
+#     listening ports   -  sockets that listen (connects complete in the kernel, never accepted)
+#     refusing ports    -  nothing bound (the kernel answers the SYN with a RST  ->  "Closed")
+#     black-hole ports  -  listen(0) sockets whose accept queue is kept full: the kernel silently drops any new SYN,
+#                          so connects time out just like on a port behind a dropping firewall  ->  "Filtered"
+
+# Import Libs
+import socket
+
+HOST = "127.0.0.1"
+
+
+# Set of local ports of each kind  -  opened together, closed with close() (or as a context manager)
+class Fixtures:
+    def __init__(self, listening=0, refusing=0, black_holes=0, base=20000):
+        self.sockets = []  # Everything that has to stay open while the scan runs
+        self.listening = []
+        self.refusing = []
+        self.black_holes = []
+
+        port = base
+        try:
+            while len(self.listening) < listening or len(self.black_holes) < black_holes:
+                if port > 65535:
+                    raise OSError("Not enough free local ports for the fixtures")
+                if len(self.listening) < listening:
+                    if self.listen(port, 128):
+                        self.listening.append(port)
+                elif self.black_hole(port):
+                    self.black_holes.append(port)
+                port += 1
+
+            while len(self.refusing) < refusing:
+                if port > 65535:
+                    raise OSError("Not enough free local ports for the fixtures")
+                if self.is_free(port):
+                    self.refusing.append(port)
+                port += 1
+        except BaseException:
+            self.close()
+            raise
+
+    # All the fixture ports (listening, then refusing, then black holes)
+    @property
+    def ports(self):
+        return self.listening + self.refusing + self.black_holes
+
+    # Method to open a listening socket on a port  -  returns it (None if the port is taken)
+    def listen(self, port, backlog):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            sock.bind((HOST, port))
+            sock.listen(backlog)
+        except OSError:
+            sock.close()
+            return None
+        self.sockets.append(sock)
+        return sock
+
+    # Method to turn a port into a black hole  -  returns False if the port is taken
+    def black_hole(self, port):
+        if self.listen(port, 0) is None:
+            return False
+
+        # Fill the accept queue (never accepted)  -  from then on SYNs to the port are dropped
+        filler = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sockets.append(filler)
+        filler.settimeout(1)
+        filler.connect((HOST, port))
+        return True
+
+    # Function to check that nothing listens on a port (so connecting to it is refused)
+    @staticmethod
+    def is_free(port):
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            try:
+                sock.bind((HOST, port))
+            except OSError:
+                return False
+        return True
+
+    def close(self):
+        for sock in self.sockets:
+            sock.close()
+        self.sockets = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
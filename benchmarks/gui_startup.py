@@ -0,0 +1,117 @@
+# Benchmark: GUI startup time  -  from launching Python to the main window being drawn
+# Each run is a fresh Python process; reports the median & worst run against the startup target (TARGET_MS) as
+# one JSON object per line, & exits with status 1 when the median is over the target
+#
+#     import_ms      -  importing tkinter & the GUI code
+#     build_ms       -  building MainView (the main page & the menubar)
+#     first_draw_ms  -  the 1st update() (window mapped & drawn)
+#     process_ms     -  the whole thing as seen from outside (interpreter start-up included)
+#
+# --slow-dns S makes the local IP lookup take S seconds (like on machines with slow / broken DNS)  -  the window
+# must NOT wait for it
+#
+# Run from the repository root (needs a display):
+#     python -m benchmarks.gui_startup [--runs 5] [--slow-dns 3]
+
+# Import Libs
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+# Startup target  -  the window is drawn within this many milliseconds of launching Python
+TARGET_MS = 500
+
+
+# Function to start the GUI once & measure it (runs in the child process)  -  returns the measurements (dict)
+def measure_startup(slow_dns):
+    start = time.perf_counter()
+
+    if slow_dns:
+        import socket
+        lookup = socket.gethostbyname
+
+        def slow_lookup(host):
+            time.sleep(slow_dns)
+            return lookup(host)
+
+        socket.gethostbyname = slow_lookup
+
+    import tkinter as tk
+    from src.main import MainView
+    imported = time.perf_counter()
+    result = {'import_ms': round((imported - start) * 1000, 1)}
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:  # No display
+        result['error'] = str(e)
+        return result
+
+    # Same window set-up as app.py (minus the icon)
+    main = MainView(root)
+    main.pack(side="top", fill="both", expand=True)
+    root.title("Port Scanner")
+    root.wm_geometry("720x480")
+    root.config(menu=main.menubar)
+    built = time.perf_counter()
+
+    root.update()
+    drawn = time.perf_counter()
+    root.destroy()
+
+    result.update({'build_ms': round((built - imported) * 1000, 1),
+                   'first_draw_ms': round((drawn - built) * 1000, 1),
+                   'startup_ms': round((drawn - start) * 1000, 1)})
+    return result
+
+
+# Function to start the GUI in a fresh Python process  -  returns its measurements (+ 'process_ms')
+def run_child(slow_dns):
+    start = time.perf_counter()
+    child = subprocess.run([sys.executable, "-m", "benchmarks.gui_startup", "--child", "--slow-dns", str(slow_dns)],
+                           capture_output=True, text=True, check=False)
+    if child.returncode != 0:
+        raise RuntimeError(f"GUI start-up failed:\n{child.stderr}")
+    result = json.loads(child.stdout)
+    if 'error' not in result:
+        # (the child prints its result right after the 1st draw  -  process exit is not counted)
+        result['process_ms'] = round((time.perf_counter() - start) * 1000, 1)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.gui_startup", description="Time the GUI start-up.")
+    parser.add_argument("--runs", type=int, default=5, help="number of start-ups (default: 5)")
+    parser.add_argument("--slow-dns", type=float, default=0.0, metavar="S",
+                        help="make the local IP lookup take S seconds (default: 0)")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    # Child process  -  start the GUI once, print the measurements
+    if args.child:
+        print(json.dumps(measure_startup(args.slow_dns)), flush=True)
+        return 0
+
+    runs = [run_child(args.slow_dns) for _ in range(args.runs)]
+    record = {'benchmark': "gui_startup", 'time': time.time(), 'runs': len(runs), 'slow_dns_s': args.slow_dns,
+              'target_ms': TARGET_MS,
+              'import_ms': statistics.median(run['import_ms'] for run in runs)}
+
+    if any('error' in run for run in runs):  # No display  -  only the imports could be measured
+        record['error'] = runs[0]['error']
+        print(json.dumps(record))
+        return 0
+
+    for key in ('build_ms', 'first_draw_ms', 'startup_ms', 'process_ms'):
+        record[key] = statistics.median(run[key] for run in runs)
+    record['process_max_ms'] = max(run['process_ms'] for run in runs)
+    record['within_target'] = record['process_ms'] <= TARGET_MS
+    print(json.dumps(record))
+    return 0 if record['within_target'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+# Benchmark: scan history database  -  insert rate & query times over millions of stored results
+# Fills a fresh database with 'scans' scans of 'hosts' hosts x 'ports' ports (a few open ports per host, spread
+# over the last 'days' days), then times each query (median of 'repeat' runs) against the target (TARGET_MS)
+# One JSON object per line; exits with status 1 when a query is over the target
+#
+# Run from the repository root:
+#     python -m benchmarks.history_queries [--scans 40] [--hosts 64] [--ports 1024]
+
+# Import Libs
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import statistics
+
+from src.history import ScanHistory, DAY
+from src.results import CLOSED, OPEN, FILTERED, TCP
+
+# Query target  -  each query comes back within this many milliseconds
+TARGET_MS = 10
+
+
+# Function to fill a database  -  returns the number of results & the insert rate (results/s)
+def fill(history, scans, hosts, ports, days):
+    rng = random.Random(1)
+    hosts = [f"10.0.{i // 256}.{i % 256}" for i in range(hosts)]
+    # Every host has a few ports of its own open, & most of them have some of the usual ports open too
+    common = [port for port in (22, 80, 443) if port <= ports]
+    open_ports = {host: set(rng.sample(range(1, ports + 1), 5)) | {port for port in common if rng.random() < 0.6}
+                  for host in hosts}
+
+    total = 0
+    start = time.perf_counter()
+    for scan in range(scans):
+        found = time.time() - (scans - scan) * days * DAY / scans
+        scan_id = history.start_scan("10.0.0.0/24", f"1-{ports}", TCP, started=found)
+        rows = [(host, port, OPEN if port in open_ports[host] and rng.random() < 0.9 else
+                 FILTERED if port % 97 == 0 else CLOSED, "N/A", "N/A", TCP)
+                for host in hosts for port in range(1, ports + 1)]
+        history.add(scan_id, rows, found)  # (one transaction per scan  -  like HistoryRecorder's big batches)
+        total += len(rows)
+        history.finish_scan(scan_id, finished=found)
+    return total, total / (time.perf_counter() - start)
+
+
+# Function to time a query  -  returns (median milliseconds, number of rows it returned)
+def time_query(query, repeat):
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = query()
+        runs.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(runs), 3), len(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.history_queries",
+                                     description="Time the scan history database.")
+    parser.add_argument("--scans", type=int, default=40, help="scans stored (default: 40)")
+    parser.add_argument("--hosts", type=int, default=64, help="hosts per scan (default: 64)")
+    parser.add_argument("--ports", type=int, default=1024, help="ports per host (default: 1024)")
+    parser.add_argument("--days", type=float, default=30, help="days the scans are spread over (default: 30)")
+    parser.add_argument("--repeat", type=int, default=20, help="runs of each query (default: 20)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "history.sqlite3")
+        history = ScanHistory(path)
+        total, insert_rate = fill(history, args.scans, args.hosts, args.ports, args.days)
+        history.close()
+
+        # Fresh connection  -  like the GUI opening the history page
+        history = ScanHistory(path)
+        record = {'benchmark': "history_queries", 'time': time.time(), 'results': total,
+                  'insert_per_s': round(insert_rate), 'db_mib': round(os.path.getsize(path) / 2 ** 20, 1),
+                  'target_ms': TARGET_MS}
+
+        port = 80 if args.ports >= 80 else 1  # (open on most hosts)
+        queries = {
+            'open_hosts_7d': lambda: history.open_hosts(port, days=7),
+            'open_hosts_all': lambda: history.open_hosts(port),
+            'host_history_open': lambda: history.host_history("10.0.0.1"),
+            'host_history_7d_all_states': lambda: history.host_history("10.0.0.1", days=7, states=None),
+            'scans': lambda: history.scans(),
+        }
+        for name, query in queries.items():
+            record[name + '_ms'], record[name + '_rows'] = time_query(query, args.repeat)
+        history.close()
+
+    record['within_target'] = all(record[name + '_ms'] <= TARGET_MS for name in queries)
+    print(json.dumps(record))
+    return 0 if record['within_target'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+# Benchmark: per-result port info enrichment cost in ThreadedPortScanner.scan()
+# Compares the OLD approach (re-parsing 'ports.json' for every lookup) against the shared PortCatalog
+#
+# Run from the repository root:
+#     python -m benchmarks.port_catalog
+
+# Import Libs
+import os
+import json
+import time
+
+from src import resource_dir
+from src.port_catalog import PortCatalog
+
+
+# OLD enrichment  -  opens & parses 'ports.json' twice per port (once for the name, once for the description)
+def reload_lookup(port):
+    result = []
+    for i in (0, 1):
+        with open(os.path.join(resource_dir, "ports.json")) as f:
+            ports_info = json.load(f)
+        try:
+            value = ports_info["data"][str(port)][i]
+        except KeyError:
+            value = "N/A"
+        result.append(value if value != "NA" else "N/A")
+    return tuple(result)
+
+
+# Function to time the enrichment of every port in 'ports'  -  returns the cost per port (in microseconds)
+def time_per_port(lookup, ports):
+    start = time.perf_counter()
+    for port in ports:
+        lookup(port)
+    return (time.perf_counter() - start) / len(ports) * 1e6
+
+
+def main():
+    # Catalog load cost (paid once per process)
+    start = time.perf_counter()
+    catalog = PortCatalog()
+    load_ms = (time.perf_counter() - start) * 1e3
+    print(f"catalog load (once):           {load_ms:10.2f} ms")
+
+    # Old approach is too slow to run over large ranges  -  use a 1-100 sample
+    print(f"reload per port (1-100):       {time_per_port(reload_lookup, range(1, 101)):10.2f} us/port")
+
+    # Catalog lookups should cost the same whatever the size of the range
+    for end in (1024, 65535):
+        ports = range(1, end + 1)
+        label = f"catalog per port (1-{end}):"
+        print(f"{label:<31}{time_per_port(catalog.lookup, ports):10.2f} us/port")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# Benchmark: memory held by scan results & the cost of saving them
+# Compares the OLD list of (ip, port, state, name, description, protocol) tuples against the column-array ResultStore,
+# then times each export format (written in batches, like during a scan)
+#
+# Run from the repository root:
+#     python -m benchmarks.result_store [hosts]
+
+# Import Libs
+import os
+import sys
+import time
+import tempfile
+import tracemalloc
+
+from src.port_catalog import get_catalog
+from src.results import ResultStore, CLOSED, OPEN, TCP
+from src.export import FORMATS, open_writer
+
+
+# Function to generate the results of a full 1-65535 scan of 'hosts' hosts (in scanner-sized batches)
+def generate_batches(hosts, size=64):
+    catalog = get_catalog()
+    batch = []
+    for h in range(hosts):
+        host = f"10.0.{h // 256}.{h % 256}"
+        for port in range(1, 65536):
+            batch.append((host, port, OPEN if port % 1000 == 0 else CLOSED) + catalog.lookup(port) + (TCP,))
+            if len(batch) >= size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+# Function to measure the memory allocated while filling 'container'  -  returns (container, MiB)
+def measure(container, hosts):
+    tracemalloc.start()
+    for batch in generate_batches(hosts):
+        container.extend(batch)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return container, size / 2 ** 20
+
+
+def main():
+    hosts = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    get_catalog()  # Load the catalog up front (not part of the measurements)
+    print(f"{hosts} host(s) x 65535 ports = {hosts * 65535} results")
+
+    # The batches themselves are freed as they go, so only what the container keeps is counted
+    rows, list_mib = measure([], hosts)
+    print(f"list of tuples:    {list_mib:10.1f} MiB")
+    del rows
+
+    store, store_mib = measure(ResultStore(), hosts)
+    print(f"ResultStore:       {store_mib:10.1f} MiB")
+
+    # Save the whole store in each format
+    with tempfile.TemporaryDirectory() as directory:
+        for fmt in sorted(FORMATS):
+            path = os.path.join(directory, "results." + fmt)
+            start = time.perf_counter()
+            with open_writer(path, fmt) as writer:
+                writer.write_all(store)
+            seconds = time.perf_counter() - start
+            print(f"save {fmt:<6}       {seconds:10.2f} s   {os.path.getsize(path) / 2 ** 20:8.1f} MiB  "
+                  f"{len(store) / seconds:10.0f} results/s")
+
+
+if __name__ == "__main__":
+    main()
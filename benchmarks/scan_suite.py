@@ -0,0 +1,269 @@
+# Benchmark suite: the scan engines against local fixtures (listening, refusing & black-hole ports)
+# Records, for each scenario x engine:
+#     ports/s, p50 / p99 per-port connect latency, peak threads, peak RSS & peak open fds
+# as one JSON object per line (machine-readable  -  append the runs to a file to track regressions over time)
+#
+# Each scan runs in its own fresh Python process (so the peaks are the scan's alone, not the fixtures' or the
+# previous run's); the fixtures are held open by this process
+#
+# Run from the repository root:
+#     python -m benchmarks.scan_suite                            (all scenarios, all engines, JSON to stdout)
+#     python -m benchmarks.scan_suite -o benchmarks.jsonl        (also appended to a file)
+#     python -m benchmarks.scan_suite --scenario mixed --engine asyncio --workers 1024
+
+# Import Libs
+import os
+import sys
+import json
+import time
+import queue
+import argparse
+import platform
+import threading
+import subprocess
+
+try:  # Peak RSS (Unix only)
+    import resource
+except ImportError:
+    resource = None
+
+from benchmarks.fixtures import Fixtures, HOST
+
+# Version of the JSON records (bumped when a field changes meaning)
+SCHEMA = 1
+
+# Scenarios  -  which fixture ports are scanned
+SCENARIOS = {
+    'listening': ('listening',),
+    'refusing': ('refusing',),
+    'black-holes': ('black_holes',),
+    'mixed': ('listening', 'refusing', 'black_holes'),
+}
+
+ENGINES = ('threads', 'asyncio', 'selectors')
+
+# Seconds between two samples of the thread / fd / RSS counts
+SAMPLE_INTERVAL = 0.005
+
+
+# Function to get a percentile (nearest rank) of sorted values  -  None if there are none
+def percentile(values, p):
+    if not values:
+        return None
+    return values[max(0, min(len(values) - 1, -(-len(values) * p // 100) - 1))]
+
+
+# Function to count the open file descriptors of this process  -  None where /proc isn't available
+def count_fds():
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return None
+
+
+# Function to get the peak RSS of this process (KiB)  -  None where it isn't available
+def peak_rss_kib():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak  # (bytes on macOS, KiB elsewhere)
+
+
+# Thread sampling the number of threads & open fds of the process while a scan runs
+class Sampler(threading.Thread):
+    def __init__(self):
+        threading.Thread.__init__(self, daemon=True)
+        self.stopped = threading.Event()
+        self.peak_threads = threading.active_count()
+        self.peak_fds = count_fds()
+
+    def run(self):
+        while not self.stopped.wait(SAMPLE_INTERVAL):
+            self.sample()
+
+    def sample(self):
+        self.peak_threads = max(self.peak_threads, threading.active_count())
+        fds = count_fds()
+        if fds is not None:
+            self.peak_fds = max(self.peak_fds, fds)
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        self.sample()
+
+
+# Function to build a scan engine class that times every connect (per-port latency, seconds)
+def timed_engine(name):
+    if name == "asyncio":
+        from src.async_scanner import AsyncPortScanner
+
+        class TimedScanner(AsyncPortScanner):
+            async def connect(self, loop, address, port, timeout):
+                start = time.perf_counter()
+                result = await AsyncPortScanner.connect(self, loop, address, port, timeout)
+                self.latencies.append(time.perf_counter() - start)
+                return result
+    elif name == "selectors":
+        from src.selector_scanner import SelectorPortScanner
+
+        # (no connect method of its own  -  every connect ends in metrics.connect_done with its latency)
+        class TimedScanner(SelectorPortScanner):
+            def run(self):
+                connect_done = self.metrics.connect_done
+
+                def timed_connect_done(state, seconds):
+                    self.latencies.append(seconds)
+                    connect_done(state, seconds)
+
+                self.metrics.connect_done = timed_connect_done
+                SelectorPortScanner.run(self)
+    else:
+        from src.scanner import ThreadedPortScanner
+
+        class TimedScanner(ThreadedPortScanner):
+            def connect(self, target, port, timeout):
+                start = time.perf_counter()
+                result = ThreadedPortScanner.connect(self, target, port, timeout)
+                self.latencies.append(time.perf_counter() - start)  # (list.append is thread-safe)
+                return result
+
+    return TimedScanner
+
+
+# Function to run ONE scan & measure it (runs in the child process)  -  returns the measurements (dict)
+def measure_scan(engine, ports, workers, timeout, retries):
+    from src.results import SCAN_DONE, status_text
+    from src.port_catalog import get_catalog
+
+    get_catalog()  # Load the catalog up front (not part of the measurements)
+    rss_before = peak_rss_kib()
+    fds_before = count_fds()
+
+    sampler = Sampler()
+    sampler.start()
+
+    q = queue.Queue()
+    scanner = timed_engine(engine)(q, args=(HOST, ports),
+                                   kwargs={'max_workers': workers, 'timeout': timeout, 'retries': retries,
+                                           'verbose': False})
+    scanner.latencies = []
+
+    start = time.perf_counter()
+    scanner.start()
+    states = {}
+    for batch in iter(q.get, SCAN_DONE):
+        for row in batch:
+            states[status_text(row[2])] = states.get(status_text(row[2]), 0) + 1
+    seconds = time.perf_counter() - start
+    scanner.join()
+    sampler.stop()
+
+    latencies = sorted(scanner.latencies)
+    return {
+        'seconds': round(seconds, 4),
+        'ports_per_s': round(len(ports) / seconds, 1),
+        'connects': len(latencies),
+        'latency_p50_ms': round(percentile(latencies, 50) * 1000, 3) if latencies else None,
+        'latency_p99_ms': round(percentile(latencies, 99) * 1000, 3) if latencies else None,
+        'latency_max_ms': round(latencies[-1] * 1000, 3) if latencies else None,
+        'peak_threads': sampler.peak_threads,
+        'peak_rss_kib': peak_rss_kib(),
+        'rss_before_kib': rss_before,
+        'peak_fds': sampler.peak_fds,
+        'fds_before': fds_before,
+        'states': states,
+    }
+
+
+# Function to run a scan in a fresh Python process  -  returns its measurements
+def run_child(engine, ports, workers, timeout, retries):
+    spec = {'engine': engine, 'ports': ports, 'workers': workers, 'timeout': timeout, 'retries': retries}
+    child = subprocess.run([sys.executable, "-m", "benchmarks.scan_suite", "--child"], input=json.dumps(spec),
+                           capture_output=True, text=True, check=False)
+    if child.returncode != 0:
+        raise RuntimeError(f"Benchmark scan failed:\n{child.stderr}")
+    return json.loads(child.stdout)
+
+
+# Function to describe the machine & code a run was made on (stored with every record)
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'commit': commit, 'python': platform.python_version(), 'platform': platform.platform(),
+            'cpus': os.cpu_count()}
+
+
+# Function to build the command line argument parser
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.scan_suite",
+                                     description="Benchmark the scan engines against local port fixtures.")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="scenario to run (repeatable; default: all)")
+    parser.add_argument("--engine", action="append", choices=ENGINES,
+                        help="scan engine to run (repeatable; default: all)")
+    parser.add_argument("--listening", type=int, default=1000, help="listening ports (default: 1000)")
+    parser.add_argument("--refusing", type=int, default=5000, help="refusing ports (default: 5000)")
+    parser.add_argument("--black-holes", type=int, default=200, help="black-hole ports (default: 200)")
+    parser.add_argument("--workers", type=int, default=256, help="scan concurrency (default: 256)")
+    parser.add_argument("--timeout", type=float, default=0.5,
+                        help="max connect timeout in seconds (default: 0.5)")
+    parser.add_argument("--retries", type=int, default=0, help="retries of timed-out ports (default: 0)")
+    parser.add_argument("--repeat", type=int, default=1, help="runs of each scenario x engine (default: 1)")
+    parser.add_argument("-o", "--output", metavar="PATH", help="also append the records to this JSON Lines file")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    # Child process  -  run the scan described on stdin, print its measurements
+    if args.child:
+        spec = json.load(sys.stdin)
+        print(json.dumps(measure_scan(spec['engine'], spec['ports'], spec['workers'], spec['timeout'],
+                                      spec['retries'])))
+        return 0
+
+    scenarios = args.scenario or list(SCENARIOS)
+    engines = args.engine or list(ENGINES)
+    env = environment()
+    output = open(args.output, "a", encoding="utf-8") if args.output else None
+
+    try:
+        with Fixtures(args.listening, args.refusing, args.black_holes) as fixtures:
+            for scenario in scenarios:
+                ports = [port for kind in SCENARIOS[scenario] for port in getattr(fixtures, kind)]
+                if not ports:
+                    continue
+
+                for engine in engines:
+                    for run in range(args.repeat):
+                        record = {'schema': SCHEMA, 'benchmark': "scan_suite", 'time': time.time(),
+                                  'scenario': scenario, 'engine': engine, 'run': run, 'ports': len(ports),
+                                  'workers': args.workers, 'timeout': args.timeout, 'retries': args.retries}
+                        record.update(run_child(engine, ports, args.workers, args.timeout, args.retries))
+                        record.update(env)
+
+                        line = json.dumps(record)
+                        print(line, flush=True)
+                        if output is not None:
+                            output.write(line + "\n")
+                            output.flush()
+
+                        # Short human-readable line (stderr  -  stdout stays pure JSON)
+                        print(f"{scenario:<12} {engine:<8} {record['ports_per_s']:10.0f} ports/s  "
+                              f"p50={record['latency_p50_ms']}ms p99={record['latency_p99_ms']}ms  "
+                              f"threads={record['peak_threads']} rss={record['peak_rss_kib']}KiB "
+                              f"fds={record['peak_fds']}", file=sys.stderr)
+    finally:
+        if output is not None:
+            output.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,8 @@
+# Run the headless command line PortScanner:  python -m src <target> [options]
+import sys
+
+from src.cli import main
+
+# (guarded  -  shard processes of the sharded scanner import this module too)
+if __name__ == "__main__":
+    sys.exit(main())
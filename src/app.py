@@ -15,5 +15,7 @@ if __name__ == "__main__":
     root.resizable(False, False)
 
     root.config(menu=main.menubar)
+    # Closing the window cancels (& checkpoints) a running scan too
+    root.protocol("WM_DELETE_WINDOW", main.exit)
 
     root.mainloop()
@@ -0,0 +1,262 @@
+__all__ = ['AsyncPortScanner', 'default_max_connects']
+
+# asyncio PortScanner  -  alternative scan engine to ThreadedPortScanner
+# Runs ONE event loop (in its own thread) with non-blocking sockets instead of one blocking socket per worker thread
+
+# Import Libs
+import os
+import socket
+import asyncio
+
+try:  # 'resource' (fd limits) is only available on Unix
+    import resource
+except ImportError:
+    resource = None
+
+from src.port_catalog import get_catalog
+from src.results import ResultBatcher, SCAN_DONE, CLOSED, OPEN, FILTERED, UNREACHABLE, UNRESOLVED, TCP
+from src.scheduler import ScanScheduler, BUSY
+from src.scanner import BasePortScanner, error_state
+
+# asyncio.timeout() only exists on Python 3.11+
+_timeout = getattr(asyncio, "timeout", None)
+
+
+# Function to pick a default number of connects in flight
+# Every pending connect holds one fd, so the fd limit is the real cap (not the number of threads)
+def default_max_connects():
+    connects = 1024
+
+    if resource is not None:
+        soft_limit = resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+        if soft_limit != resource.RLIM_INFINITY:
+            # Leave some fds free for the GUI, the resource files, etc.
+            connects = soft_limit - 64
+    elif os.name == "nt":
+        # select() based loops on Windows can only watch 512 sockets at once
+        connects = 500
+
+    # Never less than 1, never more than 4096 connects in flight
+    return max(1, min(connects, 4096))
+
+
+# asyncio PortScanner thread (runs separately from the main tkinter GUI thread)
+# Same contract as ThreadedPortScanner: args=(target, port_list), streams batches of
+# (ip, port, state, name, description, protocol) tuples to the queue, then SCAN_DONE when the scan is done
+class AsyncPortScanner(BasePortScanner):
+    # Method to get the default max number of connects in flight
+    def default_workers(self):
+        return default_max_connects()
+
+    # What happens during the thread process
+    def run(self):
+        try:
+            if self.verbose:
+                print("\nSCANNING...")
+
+            # Resolve the target host names once (up front)
+            self.resolve_targets()
+
+            # Load / start the checkpoint (if any)
+            self.open_checkpoint()
+
+            self.start_banners()
+            try:
+                # Start the port scan (on a new event loop owned by this thread)
+                asyncio.run(self.scan())
+            finally:
+                self.stop_banners()
+                if self.checkpoint is not None:
+                    self.checkpoint.close()
+        except Exception as e:
+            # The scan failed  -  kept for the GUI / command line to report (the traceback is still printed)
+            self.fail(e)
+            raise
+        finally:
+            # (after the port scan is done  -  or has failed)
+            # Tell the Tkinter GUI thread that there are no more results coming
+            self.queue.put(SCAN_DONE)
+
+    # Coroutine to wait while the scan is paused (without blocking the event loop)  -  returns False once the
+    # scan has been cancelled
+    async def async_wait_if_paused(self):
+        while not self.running.is_set():
+            await asyncio.sleep(0.01)
+        return not self.cancelled.is_set()
+
+    # Coroutine to wait until the rate limiter lets a connect to 'host' start (without blocking the event loop)
+    # returns False if the scan is cancelled meanwhile
+    async def async_pace(self, loop, host):
+        delay = self.rate_limiter.reserve(host)
+        if delay > 0:
+            # Sleep in short steps so a cancel isn't held up by connects booked far ahead
+            deadline = loop.time() + delay
+            while not self.cancelled.is_set() and loop.time() < deadline:
+                await asyncio.sleep(min(deadline - loop.time(), 0.1))
+        return not self.cancelled.is_set()
+
+    # Coroutine to check if a port is open
+    async def is_port_open(self, loop, address, port):
+        return (await self.connect(loop, address, port, self.timeout))[0] == OPEN
+
+    # Coroutine to try to connect to a port  -  returns (state, rtt)
+    # 'rtt' is the time (seconds) until the host answered (handshake OR refusal), None if it didn't answer
+    async def connect(self, loop, address, port, timeout):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        self.metrics.connect_started()
+        start = loop.time()
+        state = None
+
+        try:  # Is the socket able to be connected?  (port open)
+            if _timeout is not None:  # Python 3.11+  -  cheaper than wait_for() (no extra task per connect)
+                async with _timeout(timeout):
+                    await loop.sock_connect(sock, (address, port))
+            else:
+                await asyncio.wait_for(loop.sock_connect(sock, (address, port)), timeout)
+            state, rtt = OPEN, loop.time() - start
+        except asyncio.TimeoutError:  # No answer at all
+            state, rtt = FILTERED, None
+        except OSError as e:  # Refused / unreachable / ...
+            state = error_state(e)
+            rtt = loop.time() - start if state == CLOSED else None
+        finally:
+            sock.close()
+            if state is None:  # The coroutine was cancelled  -  not a result
+                self.metrics.connect_cancelled()
+
+        self.metrics.connect_done(state, loop.time() - start)
+        return state, rtt
+
+    # Coroutine to resolve a target host to an IPv4 address  -  None if it can't be resolved
+    async def resolve(self, loop, host):
+        # Already resolved (the usual case)  -  no need to leave the event loop
+        address = self.resolver.cached(host)
+        if address is not None:
+            return address
+
+        try:  # Look it up in a worker thread (the shared resolver only looks each host up once)
+            return await loop.run_in_executor(None, self.resolver.resolve, host)
+        except socket.gaierror:  # Invalid host
+            return None
+
+    async def scan(self):
+        loop = asyncio.get_running_loop()
+
+        # Shared port metadata catalog (loaded once, constant-time lookups)
+        catalog = get_catalog()
+
+        # Number of connects in flight  -  capped, and never more than there are ports to scan
+        workers = max(1, min(self.max_workers, len(self.targets) * len(self.port_list)))
+
+        # Streams the results to the queue (& the checkpoint & 'data') in small batches
+        batcher = ResultBatcher(self.queue, checkpoint=self.checkpoint, store=self.data)
+
+        # 1st pass: every (host, port) pair of all the targets  (incremental scan: priority ports first)
+        # (ports that time out are collected in 'retry' & retried at the end with a longer timeout)
+        retry = {}
+        for scheduler in self.first_pass(workers):
+            await self.scan_pass(loop, scheduler, workers, catalog, batcher, retry, 0)
+
+        # Retry passes: only the ports that timed out (per host)
+        for attempt in range(1, self.retries + 1):
+            if not retry or self.cancelled.is_set():
+                break
+            ports, retry = retry, {}
+            self.skip_dead_hosts(ports, catalog, batcher)
+            await self.scan_pass(loop, ScanScheduler(list(ports), ports, workers, self.per_host_limit),
+                                 workers, catalog, batcher, retry, attempt)
+
+        # Send whatever is left in the batch
+        batcher.flush()
+
+    # Coroutine to scan all the (host, port) pairs handed out by 'scheduler'
+    async def scan_pass(self, loop, scheduler, workers, catalog, batcher, retry, attempt):
+        # Set whenever a host frees up a slot (while every active host is at its limit)
+        slot_freed = asyncio.Event()
+
+        # Semaphore limiting the connects in flight
+        limit = asyncio.Semaphore(workers)
+        pending = set()
+
+        # Coroutine to scan a single (host, port) pair (releases its slots when done)
+        async def probe(host, port):
+            try:
+                # Host name -> address (cached, so only the 1st lookup of a host costs anything)
+                address = await self.resolve(loop, host)
+
+                # Host already given up on  -  report its (already started) ports without scanning them
+                if host in self.dead_hosts:
+                    self.skip_ports(host, (port,), catalog, batcher)
+                    return
+
+                # Wait for the rate limiter (skip the port if the scan is cancelled meanwhile)
+                if not await self.async_pace(loop, host):
+                    return
+
+                if address is None:  # The host name could not be resolved
+                    state, sample = UNRESOLVED, None
+                else:
+                    # Pick the connect timeout (from the host's measured RTT, longer when retrying)
+                    rtt = self.get_rtt(host)
+                    state, sample = await self.connect(loop, address, port, self.connect_timeout(rtt, attempt))
+                    if sample is not None:
+                        rtt.add(sample)
+                    self.rate_limiter.report(state)
+            finally:
+                limit.release()
+                scheduler.done(host)
+                slot_freed.set()
+
+            # Timed out  -  retry it at the end of the scan (no result yet)
+            if state == FILTERED and attempt < self.retries:
+                retry.setdefault(host, []).append(port)
+                return
+
+            # Unreachable / unresolved  -  no point trying the rest of the host's ports
+            if state in (UNREACHABLE, UNRESOLVED):
+                self.give_up(host, state, scheduler, catalog, batcher)
+
+            # Look up the port's name & description
+            port_name, port_description = catalog.lookup(port)
+
+            result = (host, port, state, port_name, port_description, TCP)
+
+            # Stream the result (open ports are sent straight away)
+            batcher.add(result, urgent=state == OPEN)
+
+            # Identify the service on open ports (on the banner grabbing threads, next to the sweep  -  never waits
+            # for a free slot: that would hold up every connect of the event loop)
+            if state == OPEN and self.banners is not None:
+                self.banners.submit(host, address, port, wait=False)
+
+            # If the port is open, output to console
+            if state == OPEN and self.verbose:
+                print(f'{host}: Port {port} is open!')
+
+        # Start a probe for each (host, port) pair as soon as a slot is free (only 'limit' tasks exist at any time)
+        while True:
+            await limit.acquire()
+
+            # Stop handing out ports while paused / once cancelled
+            if not await self.async_wait_if_paused():
+                limit.release()
+                break
+
+            job = scheduler.next_job()
+            while job is BUSY:  # Every active host is at its limit  -  wait for a probe to finish
+                slot_freed.clear()
+                await slot_freed.wait()
+                job = scheduler.next_job()
+
+            if job is None:  # Every pair has been handed out
+                limit.release()
+                break
+
+            task = loop.create_task(probe(*job))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+
+        # Wait for the last probes to finish
+        if pending:
+            await asyncio.gather(*pending)
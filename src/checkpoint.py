@@ -0,0 +1,86 @@
+__all__ = ['Checkpoint']
+
+# Scan checkpoint file  -  records which (host, port) pairs are done & what they gave, so an interrupted scan
+# can be resumed where it stopped
+#
+# JSON Lines file:
+#     {"checkpoint": 1, "target": "10.0.0.0/24", "ports": "1-1024", "protocol": "tcp"}
+#                                                                       -  header (what is being scanned)
+#     [["10.0.0.1", 22, 1], ["10.0.0.1", 23, 0], ...]                   -  one line per batch of results
+#                                                                          ([host, port, state] each)
+
+# Import Libs
+import os
+import json
+import threading
+
+# Checkpoint file format version
+VERSION = 1
+
+
+class Checkpoint:
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+        self.lock = threading.Lock()
+
+    # Method to read the header of an existing checkpoint  -  None if there is no (valid) checkpoint
+    def read_header(self):
+        try:
+            with open(self.path) as f:
+                header = json.loads(f.readline())
+        except (OSError, ValueError):
+            return None
+
+        if not isinstance(header, dict) or header.get('checkpoint') != VERSION:
+            return None
+        header.setdefault('protocol', "tcp")  # (checkpoints from before UDP scans were added)
+        return header
+
+    # Method to load the results recorded so far  -  yields (host, port, state) tuples (one batch in memory at a time)
+    def load(self):
+        with open(self.path) as f:
+            f.readline()  # Skip the header
+            for line in f:
+                try:
+                    batch = json.loads(line)
+                except ValueError:  # Line cut short (scan was killed while writing)  -  ignore it
+                    continue
+                for host, port, state in batch:
+                    yield host, port, state
+
+    # Method to start a NEW checkpoint (overwrites any existing one)
+    def create(self, target, ports, protocol="tcp"):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.file = open(self.path, "w")
+        self.file.write(json.dumps({'checkpoint': VERSION, 'target': str(target), 'ports': str(ports),
+                                    'protocol': protocol}) + "\n")
+        self.file.flush()
+
+    # Method to continue an EXISTING checkpoint (new results are appended)
+    def reopen(self):
+        self.file = open(self.path, "a+")
+
+        # Make sure a line cut short by a killed scan doesn't run into the new lines
+        self.file.seek(0, os.SEEK_END)
+        if self.file.tell() > 0:
+            self.file.seek(self.file.tell() - 1)
+            if self.file.read(1) != "\n":
+                self.file.write("\n")
+
+    # Method to record a batch of (ip, port, state, name, description, protocol) results
+    def record(self, batch):
+        line = json.dumps([[row[0], row[1], row[2]] for row in batch]) + "\n"
+        with self.lock:
+            if self.file is not None:
+                self.file.write(line)
+                self.file.flush()
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
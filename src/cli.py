@@ -0,0 +1,341 @@
+__all__ = ['main']
+
+# Headless command line PortScanner  (no tkinter / PIL needed)
+#
+# Usage (from the repository root):
+#     python -m src 192.168.1.0/24 -p 1-1024 -c 256 -t 1.5
+
+# Import Libs
+import sys
+import time
+import queue
+import socket
+import sqlite3
+import threading
+import argparse
+
+from src.scanner import ThreadedPortScanner, SWEEP_RATE
+from src.async_scanner import AsyncPortScanner
+from src.selector_scanner import SelectorPortScanner
+from src.udp_scanner import UdpPortScanner
+from src.sharded_scanner import ShardedPortScanner, default_processes
+from src.results import SCAN_DONE, OPEN, TCP, UDP, ServiceBatch, status_text
+from src.targets import parse_targets
+from src.port_spec import parse_ports
+from src.rtt import MIN_TIMEOUT
+from src.resolver import get_resolver
+from src.checkpoint import Checkpoint
+from src.export import FORMATS, open_writer
+from src.diff import Baseline, ScanDiff
+from src.metrics import MetricsReporter
+from src.history import HistoryRecorder, DEFAULT_PATH as HISTORY_PATH
+
+# Scan engines that can be picked with --engine
+ENGINES = {'threads': ThreadedPortScanner, 'asyncio': AsyncPortScanner, 'selectors': SelectorPortScanner,
+           'processes': ShardedPortScanner}
+
+
+# Function to build the command line argument parser
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m src",
+                                     description="Scan target host(s) for open TCP (or UDP) ports.")
+
+    parser.add_argument("target", nargs="?",
+                        help="host, CIDR block, address range or comma-separated list "
+                             "(e.g. 'localhost', '10.0.0.0/24', '10.0.0.1-50')")
+    parser.add_argument("-p", "--ports", default=None,
+                        help="ports to scan  -  ports, ranges & 'top N' presets, comma-separated "
+                             "(e.g. 'top 100,8000-8100'; N up to the number of ports ranked; default: 1-1024)")
+    parser.add_argument("--sequential", action="store_false", dest="by_frequency",
+                        help="scan the ports in the order given (default: most-often-open ports first)")
+    parser.add_argument("-c", "--concurrency", type=int, default=None,
+                        help="max number of ports scanned at once (default: based on the fd limit & CPU count)")
+    parser.add_argument("--per-host", type=int, default=None, dest="per_host_limit",
+                        help="max number of ports scanned at once on any one host (default: no limit)")
+    parser.add_argument("--rate", type=float, default=None,
+                        help="max connects started per second across all hosts (default: no limit)")
+    parser.add_argument("--per-host-rate", type=float, default=None,
+                        help="max connects started per second to any one host (default: no limit)")
+    parser.add_argument("--no-backoff", action="store_false", dest="backoff",
+                        help="don't slow down automatically when timeouts / errors spike")
+    parser.add_argument("-t", "--timeout", type=float, default=3,
+                        help="max connect timeout in seconds (default: 3)")
+    parser.add_argument("--min-timeout", type=float, default=MIN_TIMEOUT,
+                        help=f"lowest adaptive connect timeout in seconds (default: {MIN_TIMEOUT})")
+    parser.add_argument("--no-adaptive", action="store_false", dest="adaptive",
+                        help="always use --timeout instead of deriving it from the measured RTT")
+    parser.add_argument("--retries", type=int, default=1,
+                        help="times a timed-out port is retried at the end of the scan (default: 1)")
+    parser.add_argument("-u", "--udp", action="store_true",
+                        help="scan UDP ports instead of TCP (one engine; -e processes still splits it between "
+                             "processes)")
+    parser.add_argument("-e", "--engine", choices=sorted(ENGINES), default="threads",
+                        help="scan engine (default: threads)  -  'selectors' runs every connect from one thread "
+                             "(epoll), 'processes' splits the scan between processes (only faster with several "
+                             "CPUs, on big scans)")
+    parser.add_argument("--processes", type=int, default=None,
+                        help=f"with -e processes: number of processes (default: {default_processes()}, one per CPU)")
+    parser.add_argument("--shard-engine", choices=('asyncio', 'selectors', 'threads'), default="threads",
+                        help="with -e processes: scan engine each process runs (default: threads)")
+    parser.add_argument("-a", "--all", action="store_true",
+                        help="also list closed ports")
+    parser.add_argument("-b", "--banners", action="store_true",
+                        help="grab the banners of open ports & identify their services (runs next to the scan)")
+    parser.add_argument("--banner-workers", type=int, default=16,
+                        help="max number of open ports fingerprinted at once (default: 16)")
+    parser.add_argument("--banner-timeout", type=float, default=1.0,
+                        help="seconds to wait for a service to answer (default: 1)")
+    parser.add_argument("-o", "--output", metavar="PATH",
+                        help="also save every result to this file (written as the results come in)")
+    parser.add_argument("--format", choices=sorted(FORMATS), default=None,
+                        help="format of --output (default: from its extension, CSV otherwise)")
+    parser.add_argument("--baseline", metavar="PATH",
+                        help="saved result of a previous scan  -  rescan its open ports first & list only the changes")
+    parser.add_argument("--sweep-rate", type=float, default=None,
+                        help="with --baseline: max connects per second for the ports that were not open last time "
+                             f"(default: half of --rate, at most {SWEEP_RATE})")
+    parser.add_argument("--history", metavar="PATH", nargs="?", const=HISTORY_PATH,
+                        help=f"also record the scan to the scan history database at PATH (default: {HISTORY_PATH})")
+    parser.add_argument("--checkpoint", metavar="PATH",
+                        help="record progress to this file (so an interrupted scan can be resumed)")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue the scan recorded in --checkpoint (target & ports default to the recorded ones)")
+    parser.add_argument("--rtt", action="store_true",
+                        help="print the measured round-trip time stats of each host at the end")
+    parser.add_argument("--progress", action="store_true",
+                        help="show the scan progress on stderr (once a second)")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="append the scan metrics (connects in flight, results by state, latency, queue depth) "
+                             "to this file as JSON lines while scanning")
+    parser.add_argument("--metrics-interval", type=float, default=1.0,
+                        help="seconds between two --metrics lines (default: 1)")
+
+    return parser
+
+
+# Function to print the progress of a scan on stderr until it is done (run in its own thread)
+def show_progress(scanner):
+    start = time.monotonic()
+    while scanner.is_alive():
+        time.sleep(1)
+        progress = scanner.progress
+        elapsed = time.monotonic() - start
+        shards = f"  shards {progress['shards_done']}/{progress['shards']}" if 'shards' in progress else ""
+        metrics = scanner.metrics.snapshot()
+        print(f"progress: {progress['scanned']}/{progress['total']} "
+              f"({100 * progress['scanned'] / max(1, progress['total']):.1f}%)  "
+              f"{progress['scanned'] / elapsed:.0f} ports/s  in flight {metrics['in_flight']}  "
+              f"latency p50 {metrics['latency']['p50_ms']}ms p99 {metrics['latency']['p99_ms']}ms{shards}",
+              file=sys.stderr, flush=True)
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    # Resuming  -  the target & ports default to the ones recorded in the checkpoint
+    if args.resume:
+        if not args.checkpoint:
+            parser.error("--resume needs --checkpoint")
+        header = Checkpoint(args.checkpoint).read_header()
+        if header is None:
+            print(f"error: no checkpoint to resume in '{args.checkpoint}'", file=sys.stderr)
+            return 2
+        if args.target not in (None, header['target']) or args.ports not in (None, header['ports']) or \
+                (args.udp and header['protocol'] != UDP):
+            print(f"error: checkpoint is for '{header['target']}' {header['protocol']} ports {header['ports']}",
+                  file=sys.stderr)
+            return 2
+        args.target, args.ports = header['target'], header['ports']
+        args.udp = header['protocol'] == UDP
+
+    if args.target is None:
+        parser.error("the following arguments are required: target")
+    if args.ports is None:
+        args.ports = "1-1024"
+
+    # Check the target & ports BEFORE scanning
+    try:
+        targets = parse_targets(args.target)
+        ports = parse_ports(args.ports, args.by_frequency)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+    # Resolve the target host names once, up front  -  fail right away on an invalid host
+    for host in targets.hostnames():
+        try:
+            get_resolver().resolve(host)
+        except socket.gaierror:
+            print(f"error: cannot resolve host '{host}'", file=sys.stderr)
+            return 2
+
+    if args.concurrency is not None and args.concurrency < 1:
+        print("error: --concurrency must be at least 1", file=sys.stderr)
+        return 2
+    if args.metrics_interval <= 0:
+        print("error: --metrics-interval must be more than 0", file=sys.stderr)
+        return 2
+    if args.processes is not None and args.processes < 1:
+        print("error: --processes must be at least 1", file=sys.stderr)
+        return 2
+    if args.banner_workers < 1:
+        print("error: --banner-workers must be at least 1", file=sys.stderr)
+        return 2
+    for option, rate in (("--rate", args.rate), ("--per-host-rate", args.per_host_rate),
+                         ("--sweep-rate", args.sweep_rate)):
+        if rate is not None and rate <= 0:
+            print(f"error: {option} must be more than 0", file=sys.stderr)
+            return 2
+
+    # Previous scan to compare against (incremental scan)
+    baseline = diff = None
+    if args.baseline:
+        try:
+            baseline = Baseline.load(args.baseline)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"error: cannot load baseline '{args.baseline}': {e}", file=sys.stderr)
+            return 2
+        diff = ScanDiff(baseline)
+
+    # File every result is saved to (as they come in)
+    writer = None
+    if args.output:
+        try:
+            writer = open_writer(args.output, args.format)
+        except OSError as e:
+            print(f"error: cannot write '{args.output}': {e.strerror}", file=sys.stderr)
+            return 2
+
+    # UDP scans have an engine of their own (also the one each process runs when the scan is split)
+    engine = ENGINES[args.engine]
+    if args.udp:
+        if args.engine == 'processes':
+            args.shard_engine = 'udp'
+        else:
+            engine = UdpPortScanner
+
+    # Scan history database the results are recorded to (as they come in)
+    history = None
+    if args.history:
+        try:
+            history = HistoryRecorder(args.history, args.target, args.ports, UDP if args.udp else TCP)
+        except (OSError, ValueError, sqlite3.Error) as e:
+            print(f"error: cannot open the history database '{args.history}': {e}", file=sys.stderr)
+            if writer is not None:
+                writer.close()
+            return 2
+        history.start()
+
+    # Start the scan (same queue contract as the GUI)
+    q = queue.Queue()
+    scanner = engine(q, args=(targets, ports),
+                     kwargs={'max_workers': args.concurrency, 'per_host_limit': args.per_host_limit,
+                             'timeout': args.timeout, 'min_timeout': args.min_timeout,
+                             'adaptive': args.adaptive, 'retries': args.retries,
+                             'rate': args.rate, 'per_host_rate': args.per_host_rate,
+                             'backoff': args.backoff,
+                             'baseline': baseline, 'sweep_rate': args.sweep_rate,
+                             'banners': args.banners, 'banner_workers': args.banner_workers,
+                             'banner_timeout': args.banner_timeout,
+                             'checkpoint': args.checkpoint, 'resume': args.resume,
+                             'processes': args.processes, 'shard_engine': args.shard_engine,
+                             'verbose': False})
+    scanner.start()
+
+    # Progress line on stderr (updated once a second until the scan is done)
+    if args.progress:
+        threading.Thread(target=show_progress, args=(scanner,), daemon=True).start()
+
+    # Metrics dump (JSON lines, until the scan is done)
+    reporter = None
+    if args.metrics:
+        try:
+            reporter = MetricsReporter(scanner.metrics, args.metrics_interval, path=args.metrics)
+        except OSError as e:
+            print(f"error: cannot write '{args.metrics}': {e.strerror}", file=sys.stderr)
+            scanner.cancel()
+            if history is not None:
+                history.close(cancelled=True)
+            return 2
+        reporter.start()
+
+    # Print the results as they are streamed back
+    scanned = open_count = 0
+    batches = iter(q.get, SCAN_DONE)
+    while True:
+        try:
+            batch = next(batches, None)
+        except KeyboardInterrupt:  # Ctrl+C  -  cancel the scan, but still print what was found
+            scanner.cancel()
+            continue
+        if batch is None:
+            break
+        scanner.metrics.record_queue_depth(q.qsize())
+
+        # Services identified on open ports (sent after the ports themselves)
+        if isinstance(batch, ServiceBatch):
+            for ip, port, service, detail in batch:
+                print(f"{ip}\t{port}\tService\t{service or 'Unknown'}\t{detail}", flush=True)
+            continue
+
+        if writer is not None:
+            writer.write(batch)
+        if history is not None:
+            history.add(batch)
+
+        for ip, port, state, name, description, protocol in batch:
+            scanned += 1
+            if state == OPEN:
+                open_count += 1
+            if diff is None and (state == OPEN or args.all):
+                print(f"{ip}\t{port}{'/udp' if protocol == UDP else ''}\t{status_text(state)}\t{name}", flush=True)
+
+        # Incremental scan  -  list the changes (instead of the open ports) as they are found
+        if diff is not None:
+            for change in diff.check_all(batch):
+                print(diff.describe(change), flush=True)
+
+    if writer is not None:
+        writer.close()
+    if reporter is not None:
+        reporter.stop()
+    if history is not None:
+        history.close(scanner.cancelled.is_set() or scanner.error is not None)
+
+    print(f"Scanned {scanned} port(s) on {len(targets)} host(s)  -  {open_count} open", file=sys.stderr)
+    if diff is not None:
+        print(f"Changes since the baseline: {diff.summary()}", file=sys.stderr)
+    if scanner.error is not None:
+        print(f"error: scan failed: {scanner.error}", file=sys.stderr)
+    elif scanner.cancelled.is_set():
+        print("Scan cancelled" + (f"  -  resume with --checkpoint {args.checkpoint} --resume"
+                                  if args.checkpoint else ""), file=sys.stderr)
+
+    # Hosts that were given up on (unreachable / unresolved)  -  their remaining ports were not scanned
+    for host, state in scanner.dead_hosts.items():
+        print(f"{host}\t{status_text(state)}  -  remaining ports not scanned", file=sys.stderr)
+
+    # The scan was slowed down by the automatic backoff
+    rate_stats = scanner.rate_stats
+    if rate_stats['backoffs']:
+        rate = f"{rate_stats['rate']:.0f}/s" if rate_stats['rate'] else "no limit"
+        print(f"Backed off {rate_stats['backoffs']} time(s) on timeout / error spikes  -  rate at the end: {rate}",
+              file=sys.stderr)
+
+    # Round-trip time stats (only hosts that answered at least once have any)
+    if args.rtt:
+        for host, stats in scanner.rtt_stats.items():
+            if stats['samples']:
+                print(f"{host}\tRTT srtt={stats['srtt'] * 1000:.2f}ms rttvar={stats['rttvar'] * 1000:.2f}ms "
+                      f"min={stats['min_rtt'] * 1000:.2f}ms max={stats['max_rtt'] * 1000:.2f}ms "
+                      f"samples={stats['samples']} timeout={stats['timeout']:.3f}s", file=sys.stderr)
+            else:
+                print(f"{host}\tRTT no answers (timeout={stats['timeout']:.3f}s)", file=sys.stderr)
+    if scanner.error is not None:
+        return 1
+    return 130 if scanner.cancelled.is_set() else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+__all__ = ['Baseline', 'ScanDiff', 'CHANGES']
+
+# Comparing a scan against a previous (saved) one
+# The previous results are the 'baseline'; each new result is checked against it as it comes in, so changes
+# show up straight away (not only once the scan is done)
+
+# Import Libs
+from array import array
+from bisect import bisect_left
+
+from src.results import CLOSED, OPEN, TCP, status_text
+from src.export import read_results
+
+# Kinds of change (in the order they are reported)
+CHANGES = ('opened', 'closed', 'filtered')
+
+
+# Previous states of the ports scanned on ONE host (& protocol)  -  only the ports that were scanned: their numbers
+# (sorted array, 2 bytes each) & states (1 byte each), looked up by binary search
+class PortStates:
+    __slots__ = ('ports', 'states', 'sorted')
+
+    def __init__(self):
+        self.ports = array('H')
+        self.states = bytearray()
+        self.sorted = True  # (ports come in scan order  -  sorted on the 1st lookup, if they need it)
+
+    # Method to add a port's state
+    def add(self, port, state):
+        if self.ports and port <= self.ports[-1]:
+            self.sorted = False
+        self.ports.append(port)
+        self.states.append(state)
+
+    # Method to sort the ports (a port added more than once keeps its last state)
+    def sort(self):
+        latest = dict(zip(self.ports, self.states))
+        self.ports = array('H', sorted(latest))
+        self.states = bytearray(latest[port] for port in self.ports)
+        self.sorted = True
+
+    # Method to get a port's state  -  None if it wasn't scanned
+    def get(self, port):
+        if not self.sorted:
+            self.sort()
+        index = bisect_left(self.ports, port)
+        if index < len(self.ports) and self.ports[index] == port:
+            return self.states[index]
+        return None
+
+
+# Results of a previous scan  -  the state of every port scanned, per host & protocol
+class Baseline:
+    def __init__(self, rows=()):
+        self.states = {}  # (host, protocol) -> PortStates
+        self.open_ports = {}  # protocol -> ports that were open on ANY host
+
+        for ip, port, state, name, description, protocol in rows:
+            self.add(ip, port, state, protocol)
+
+    # Method to load a baseline from a saved result file (CSV, JSON Lines or binary)
+    @classmethod
+    def load(cls, path):
+        return cls(read_results(path))
+
+    # Method to add a previous result
+    def add(self, host, port, state, protocol=TCP):
+        states = self.states.get((host, protocol))
+        if states is None:
+            states = self.states[host, protocol] = PortStates()
+        states.add(port, state)
+        if state == OPEN:
+            self.open_ports.setdefault(protocol, set()).add(port)
+
+    # Method to get the previous state of a port  -  None if it wasn't scanned
+    def state(self, host, port, protocol=TCP):
+        states = self.states.get((host, protocol))
+        if states is None:
+            return None
+        return states.get(port)
+
+    # Method to get the ports of 'ports' to scan first in an incremental scan  -  every port that was open on any
+    # host last time (the ports most likely to have changed, or to be open on the other hosts too)
+    def priority_ports(self, ports, protocol=TCP):
+        open_ports = self.open_ports.get(protocol, ())
+        return [port for port in ports if port in open_ports]
+
+    # Number of hosts in the baseline
+    def __len__(self):
+        return len({host for host, protocol in self.states})
+
+
+# Changes between a baseline & the results of a new scan
+class ScanDiff:
+    def __init__(self, baseline):
+        self.baseline = baseline
+        self.changes = []  # (kind, ip, port, old state, new state) in the order they were found
+        self.counts = dict.fromkeys(CHANGES, 0)
+
+    # Method to check a new (ip, port, state, name, description, protocol) result  -  returns the kind of change
+    # (None = unchanged)
+    def check(self, row):
+        ip, port, state = row[0], row[1], row[2]
+        old = self.baseline.state(ip, port, row[5])
+
+        if old == state or (old is None and state != OPEN):  # Same as before / nothing to compare it with
+            return None
+
+        if state == OPEN:
+            kind = 'opened'
+        elif state == CLOSED:
+            kind = 'closed'
+        else:  # Timed out / unreachable / error
+            kind = 'filtered'
+
+        self.changes.append((kind, ip, port, old, state))
+        self.counts[kind] += 1
+        return kind
+
+    # Method to check a batch of results  -  returns the changes found in it
+    def check_all(self, rows):
+        start = len(self.changes)
+        for row in rows:
+            self.check(row)
+        return self.changes[start:]
+
+    # Function to describe a change as text  ("opened  10.0.0.5:22  Closed -> Open")
+    @staticmethod
+    def describe(change):
+        kind, ip, port, old, state = change
+        old_text = status_text(old) if old is not None else 'Not scanned'
+        return f"{kind:<8} {ip}:{port}  {old_text} -> {status_text(state)}"
+
+    # Summary of the number of changes of each kind  ("2 opened, 0 closed, 1 filtered")
+    def summary(self):
+        return ", ".join(f"{self.counts[kind]} {kind}" for kind in CHANGES)
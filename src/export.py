@@ -0,0 +1,222 @@
+__all__ = ['FORMATS', 'CsvWriter', 'JsonLinesWriter', 'BinaryWriter', 'format_for', 'open_writer', 'read_results']
+
+# Saving scan results  -  CSV, JSON Lines or a compact binary format
+# Writers take the same batches of (ip, port, state, name, description, protocol) tuples the scanners put on their
+# queue, so results can be written out AS THEY COME IN (nothing has to be collected first)
+#
+# Binary format (little-endian):
+#     b"PSCN" + version byte
+#     then blocks of:
+#         b"H" + <uint32 count> + count x (<uint16 length> + UTF-8 host)    -  new hosts (numbered on from the last)
+#         b"R" + <uint32 count> + count x uint32 host number                 -  a batch of results, column by column
+#                               + count x uint16 port + count x uint8 state
+#                               + count x uint8 protocol (index in PROTOCOLS  -  version 2+; version 1 is all TCP)
+#     (names & descriptions are not saved  -  they come from the port catalog when the file is read)
+
+# Import Libs
+import os
+import sys
+import csv
+import json
+import struct
+from array import array
+
+from src.port_catalog import get_catalog
+from src.results import STATES, PROTOCOLS, TCP, status_text
+
+# Binary format header & version (& the versions that can still be read)
+MAGIC = b"PSCN"
+VERSION = 2
+READ_VERSIONS = (1, 2)
+
+# Column names written to CSV / JSON Lines files (in order)
+FIELDS = ('ip', 'port', 'status', 'name', 'description', 'protocol')
+
+
+# Base result writer  -  opens the file; subclasses write the batches
+class ResultWriter:
+    binary = False
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "wb") if self.binary else open(path, "w", newline="", encoding="utf-8")
+        self.count = 0  # Number of results written
+
+    # Method to write a batch of (ip, port, state, name, description, protocol) results
+    def write(self, rows):
+        raise NotImplementedError
+
+    # Method to write every result of an iterable in batches (e.g. a whole ResultStore)
+    def write_all(self, rows, size=4096):
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= size:
+                self.write(batch)
+                batch = []
+        if batch:
+            self.write(batch)
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# CSV  -  one header line, then one line per result (status as text)
+class CsvWriter(ResultWriter):
+    def __init__(self, path):
+        ResultWriter.__init__(self, path)
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(FIELDS)
+
+    def write(self, rows):
+        self.writer.writerows((ip, port, status_text(state), name, description, protocol)
+                              for ip, port, state, name, description, protocol in rows)
+        self.count += len(rows)
+
+
+# JSON Lines  -  one JSON object per result
+class JsonLinesWriter(ResultWriter):
+    def write(self, rows):
+        self.file.write("".join(json.dumps(dict(zip(FIELDS, (ip, port, status_text(state), name, description,
+                                                             protocol))))
+                                + "\n" for ip, port, state, name, description, protocol in rows))
+        self.count += len(rows)
+
+
+# Compact binary format  -  8 bytes per result + each host once (see the top of this file)
+class BinaryWriter(ResultWriter):
+    binary = True
+
+    def __init__(self, path):
+        ResultWriter.__init__(self, path)
+        self.host_ids = {}  # host -> its number in the file
+        self.file.write(MAGIC + bytes((VERSION,)))
+
+    def write(self, rows):
+        if not rows:
+            return
+
+        hosts, ports, states, protocols = array('I'), array('H'), array('B'), array('B')
+        new_hosts = []
+        for row in rows:
+            host_id = self.host_ids.get(row[0])
+            if host_id is None:
+                host_id = self.host_ids[row[0]] = len(self.host_ids)
+                new_hosts.append(row[0])
+            hosts.append(host_id)
+            ports.append(row[1])
+            states.append(row[2])
+            protocols.append(PROTOCOLS.index(row[5]))
+
+        if new_hosts:
+            self.file.write(b"H" + struct.pack("<I", len(new_hosts)))
+            for host in new_hosts:
+                data = host.encode("utf-8")
+                self.file.write(struct.pack("<H", len(data)) + data)
+
+        if sys.byteorder == "big":
+            hosts.byteswap()
+            ports.byteswap()
+        self.file.write(b"R" + struct.pack("<I", len(rows)) + hosts.tobytes() + ports.tobytes() + states.tobytes()
+                        + protocols.tobytes())
+        self.count += len(rows)
+
+
+# Format name -> writer
+FORMATS = {'csv': CsvWriter, 'jsonl': JsonLinesWriter, 'bin': BinaryWriter}
+
+# File extension -> format name
+EXTENSIONS = {'.csv': 'csv', '.jsonl': 'jsonl', '.json': 'jsonl', '.bin': 'bin', '.pscan': 'bin'}
+
+
+# Function to pick the format of a file from its extension (CSV if it isn't a known one)
+def format_for(path):
+    return EXTENSIONS.get(os.path.splitext(path)[1].lower(), 'csv')
+
+
+# Function to open a result writer  -  'fmt' is a FORMATS name (default: from the file extension)
+def open_writer(path, fmt=None):
+    return FORMATS[fmt or format_for(path)](path)
+
+
+# Function to read a saved result file back  -  yields (ip, port, state, name, description, protocol) tuples
+# The format is detected from the file itself (binary header) or its extension
+def read_results(path):
+    with open(path, "rb") as f:
+        binary = f.read(len(MAGIC)) == MAGIC
+
+    if binary:
+        yield from read_binary(path)
+        return
+
+    with open(path, newline="", encoding="utf-8") as f:
+        if format_for(path) == 'jsonl':
+            rows = (json.loads(line) for line in f if line.strip())
+        else:
+            rows = csv.DictReader(f)
+
+        for row in rows:
+            # (files saved before UDP scans were added have no protocol  -  TCP)
+            yield (row['ip'], int(row['port']), STATES.index(row['status']), row['name'], row['description'],
+                   row.get('protocol') or TCP)
+
+
+# Function to read exactly 'size' bytes of a binary result file  -  a file cut short (or damaged) is a ValueError
+def read_exact(f, size, path):
+    data = f.read(size)
+    if len(data) != size:
+        raise ValueError(f"Corrupt binary result file: '{path}'")
+    return data
+
+
+# Function to read a binary result file  -  yields (ip, port, state, name, description, protocol) tuples
+# (raises ValueError if the file is cut short or damaged)
+def read_binary(path):
+    catalog = get_catalog()
+    hosts = []
+
+    with open(path, "rb") as f:
+        header = f.read(len(MAGIC) + 1)
+        if header[:len(MAGIC)] != MAGIC or len(header) <= len(MAGIC) or header[len(MAGIC)] not in READ_VERSIONS:
+            raise ValueError(f"Not a (supported) binary result file: '{path}'")
+        version = header[len(MAGIC)]
+
+        while True:
+            tag = f.read(1)
+            if not tag:
+                break
+            count = struct.unpack("<I", read_exact(f, 4, path))[0]
+
+            if tag == b"H":
+                for _ in range(count):
+                    length = struct.unpack("<H", read_exact(f, 2, path))[0]
+                    try:
+                        hosts.append(read_exact(f, length, path).decode("utf-8"))
+                    except UnicodeDecodeError:
+                        raise ValueError(f"Corrupt binary result file: '{path}'") from None
+            elif tag == b"R":
+                host_ids, ports, states, protocols = array('I'), array('H'), array('B'), array('B')
+                host_ids.frombytes(read_exact(f, 4 * count, path))
+                ports.frombytes(read_exact(f, 2 * count, path))
+                states.frombytes(read_exact(f, count, path))
+                if version >= 2:
+                    protocols.frombytes(read_exact(f, count, path))
+                else:  # Version 1  -  TCP only
+                    protocols = bytes(count)
+                if sys.byteorder == "big":
+                    host_ids.byteswap()
+                    ports.byteswap()
+                # (numbers that point nowhere  -  damaged, not just cut short)
+                if count and (max(host_ids) >= len(hosts) or max(states) >= len(STATES)
+                              or max(protocols) >= len(PROTOCOLS)):
+                    raise ValueError(f"Corrupt binary result file: '{path}'")
+                for host_id, port, state, protocol in zip(host_ids, ports, states, protocols):
+                    yield (hosts[host_id], port, state) + catalog.lookup(port) + (PROTOCOLS[protocol],)
+            else:
+                raise ValueError(f"Corrupt binary result file: '{path}'")
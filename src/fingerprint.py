@@ -0,0 +1,270 @@
+__all__ = ['BannerGrabber', 'grab_banner', 'match_banner', 'SIGNATURES', 'PROBES']
+
+# Banner grabbing / service fingerprinting  -  runs on OPEN ports only, next to the port sweep (own worker pool)
+#
+# For each open port:
+#     1. connect (TLS first on the usual TLS ports)
+#     2. read what the service says on its own (SSH, SMTP, FTP, POP3, IMAP, ... greet first)  -  short read timeout
+#     3. greeted?  ->  send the port's probe (PROBES, e.g. EHLO / CAPA / FEAT) & check whether it offers STARTTLS
+#        nothing?  ->  send an HTTP request (most silent services are web servers) & read the answer
+#     4. still nothing (or a TLS alert)?  ->  try a TLS handshake on a new connection (TLS on an unusual port)
+#     5. match the (size-capped) answer against the signature table below
+
+# Import Libs
+import re
+import ssl
+import socket
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Max number of bytes read from a service (per port)
+MAX_BANNER = 4096
+# Max length of the detail text kept (server / version string)
+MAX_DETAIL = 80
+
+# Ports that speak TLS straight away (HTTPS, SMTPS, LDAPS, FTPS, IMAPS, POP3S, ...)
+TLS_PORTS = frozenset((443, 465, 636, 990, 993, 995, 8443))
+# Ports where the HTTP request is sent straight away (no point waiting for a web server to say something)
+HTTP_PORTS = frozenset((80, 81, 443, 591, 3000, 5000, 8000, 8008, 8080, 8081, 8443, 8888, 9000))
+
+# HTTP probe ('{host}' is filled in)
+HTTP_PROBE = "GET / HTTP/1.0\r\nHost: {host}\r\nUser-Agent: PertScan\r\nAccept: */*\r\n\r\n"
+
+# Start of a TLS alert record  -  what a TLS service sends back when it gets plain text
+TLS_ALERT = b"\x15\x03"
+
+
+# Probe of a service that greets first  -  'request' is sent once the greeting is read (None = nothing is sent) &
+# its answer is checked for 'starttls' (the service offers to switch the connection to TLS)
+class TcpProbe:
+    __slots__ = ('request', 'starttls')
+
+    def __init__(self, request=None, starttls=None):
+        self.request = request
+        self.starttls = starttls
+
+
+# Per-port probes (ports not in here get the HTTP request if they say nothing on their own)
+SMTP_PROBE = TcpProbe(b"EHLO pertscan.invalid\r\n", b"STARTTLS")
+PROBES = {
+    21: TcpProbe(b"FEAT\r\n", b"AUTH TLS"),  # FTP
+    22: TcpProbe(),  # SSH  -  the greeting says it all
+    25: SMTP_PROBE,  # SMTP
+    110: TcpProbe(b"CAPA\r\n", b"STLS"),  # POP3
+    143: TcpProbe(b"a1 CAPABILITY\r\n", b"STARTTLS"),  # IMAP
+    587: SMTP_PROBE,  # SMTP submission
+    2525: SMTP_PROBE,
+    3306: TcpProbe(),  # MySQL
+    5900: TcpProbe(),  # VNC
+}
+
+# Service signatures  -  (service, pattern), tried in order; group 1 (if any) is the detail (server / version)
+SIGNATURES = [(service, re.compile(pattern, flags)) for service, pattern, flags in (
+    ("SSH", rb"^SSH-[\d.]+-([^\r\n]+)", 0),
+    ("HTTP", rb"^HTTP/\d(?:\.\d)? \d{3}(?:.*?\r\nServer:[ \t]*([^\r\n]+))?", re.DOTALL | re.IGNORECASE),
+    ("SMTP", rb"^220[ -]([^\r\n]*SMTP[^\r\n]*)", re.IGNORECASE),
+    ("FTP", rb"^220[ -]([^\r\n]*FTP[^\r\n]*)", re.IGNORECASE),
+    ("FTP/SMTP", rb"^220[ -]([^\r\n]*)", 0),
+    ("POP3", rb"^\+OK ?([^\r\n]*)", 0),
+    ("IMAP", rb"^\* OK ?([^\r\n]*)", 0),
+    ("MySQL", rb"^.\x00\x00\x00\x0a(\d[^\x00]*)\x00", re.DOTALL),
+    ("VNC", rb"^RFB (\d{3}\.\d{3})", 0),
+    ("RTSP", rb"^RTSP/\d\.\d \d{3}(?:.*?\r\nServer:[ \t]*([^\r\n]+))?", re.DOTALL | re.IGNORECASE),
+    ("Redis", rb"^-ERR wrong number of arguments for 'get' command", 0),
+    ("Telnet", rb"^\xff[\xfb-\xfe]", 0),
+)]
+
+
+# Function to turn raw bytes into a short, printable text
+def printable(data):
+    text = data.decode("latin-1")
+    text = "".join(c if c.isprintable() else " " for c in text)
+    return " ".join(text.split())[:MAX_DETAIL]
+
+
+# Function to match a banner against the signature table  -  returns (service, detail), service is None if
+# nothing matched (the detail is then the start of the banner)
+def match_banner(data):
+    for service, pattern in SIGNATURES:
+        match = pattern.match(data)
+        if match:
+            detail = match.group(1) if pattern.groups and match.group(1) else b""
+            return service, printable(detail)
+    return None, printable(data)
+
+
+# Function to read from a socket until MAX_BANNER bytes, the end of the stream or a pause  -  returns the bytes read
+# (waits up to 'timeout' for the 1st bytes, much less for the rest)
+def read_banner(sock, timeout):
+    data = b""
+    sock.settimeout(timeout)
+    while len(data) < MAX_BANNER:
+        try:
+            chunk = sock.recv(MAX_BANNER - len(data))
+        except (socket.timeout, ssl.SSLError, OSError):
+            break
+        if not chunk:  # The service closed the connection
+            break
+        data += chunk
+        sock.settimeout(min(timeout, 0.2))
+    return data
+
+
+# Function to connect to a port (with a TLS handshake when 'tls' is set)  -  returns the socket, None if the
+# connect / handshake failed
+def open_connection(address, port, host, tls, connect_timeout):
+    try:
+        sock = socket.create_connection((address, port), timeout=connect_timeout)
+    except OSError:
+        return None
+    if not tls:
+        return sock
+
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE  # Only identifying the service  -  any certificate will do
+    try:
+        return context.wrap_socket(sock, server_hostname=host if host and host != address else None)
+    except (ssl.SSLError, OSError):  # Not TLS after all
+        sock.close()
+        return None
+
+
+# Function to talk to a service  -  returns (what it said, whether it offers STARTTLS)
+def converse(sock, address, port, host, read_timeout):
+    probe = PROBES.get(port)
+
+    # What does the service say on its own?  (skipped for web servers  -  they wait for a request)
+    data = b"" if port in HTTP_PORTS else read_banner(sock, read_timeout)
+
+    try:
+        if data:
+            # It greeted us  -  send the port's probe (if it has one) & look for the STARTTLS offer in the answer
+            if probe is not None and probe.request is not None:
+                sock.sendall(probe.request)
+                answer = read_banner(sock, read_timeout)
+                return data, probe.starttls is not None and probe.starttls in answer.upper()
+        elif probe is None or probe.request is not None:
+            # Nothing  -  ask it for a web page  (not on ports whose service always speaks first, e.g. SSH)
+            sock.sendall(HTTP_PROBE.format(host=host or address).encode("ascii", "replace"))
+            data = read_banner(sock, read_timeout)
+    except OSError:
+        pass
+    return data, False
+
+
+# Function to grab the banner of an open port & identify the service  -  returns (service, detail)
+# (service None = not recognised / nothing read); never raises for network errors
+def grab_banner(address, port, host=None, connect_timeout=3, read_timeout=1.0):
+    tls = port in TLS_PORTS
+    sock = open_connection(address, port, host, tls, connect_timeout)
+    if sock is None:
+        return None, ""
+    try:
+        data, starttls = converse(sock, address, port, host, read_timeout)
+    finally:
+        sock.close()
+
+    # Nothing (or a TLS alert back for the plain text)  -  maybe TLS on an unusual port: try a handshake
+    if not tls and (not data or data.startswith(TLS_ALERT)):
+        sock = open_connection(address, port, host, True, connect_timeout)
+        if sock is not None:
+            tls = True
+            try:
+                data, starttls = converse(sock, address, port, host, read_timeout)
+            finally:
+                sock.close()
+
+    if not data:
+        return ("TLS" if tls else None), ""
+
+    service, detail = match_banner(data)
+    if tls:
+        if service == "HTTP":
+            service = "HTTPS"
+        elif service:
+            service += "/TLS"
+        else:
+            service = "TLS"
+    elif starttls and service:
+        service += "+STARTTLS"
+    return service, detail
+
+
+# Banner grabbing stage of a scan  -  its own pool of worker threads (so it runs while the sweep goes on, without
+# taking connect slots from it); 'callback(host, port, service, detail)' is called from the workers
+class BannerGrabber:
+    # Max number of ports waiting for a worker, per worker  -  once they are all taken, submit() waits (a sweep
+    # that finds many open ports can't pile up jobs without limit), or parks the port if told not to wait
+    QUEUED_PER_WORKER = 4
+
+    def __init__(self, callback, workers=16, connect_timeout=3, read_timeout=1.0):
+        self.callback = callback
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="banner")
+        # Slots for ports queued or being fingerprinted (freed when a job is done, or dropped by close(cancel=True))
+        self.slots = threading.BoundedSemaphore(workers * (1 + self.QUEUED_PER_WORKER))
+
+        # Ports submitted without waiting while the queue was full  -  (host, address, port), queued as slots free up
+        self.parked = deque()
+        self.closing = False
+
+        # Open ports already submitted (each port is only fingerprinted once, even if it is reported twice)
+        self.seen = set()
+        self.lock = threading.Lock()
+
+    # Method to queue an open port for fingerprinting  -  waits while the queue is full ('wait' False: parks the
+    # port instead, for scan engines that must never block  -  asyncio / selectors event loops)
+    def submit(self, host, address, port, wait=True):
+        with self.lock:
+            if (host, port) in self.seen:
+                return
+            self.seen.add((host, port))
+
+        if self.slots.acquire(blocking=wait):
+            self.start(host, address, port)
+        else:
+            with self.lock:
+                self.parked.append((host, address, port))
+            # (the jobs running may all have finished in the meantime  -  nothing else would queue it then)
+            self.start_parked()
+
+    # Method to queue a port on the workers (its slot is taken)
+    def start(self, host, address, port):
+        future = self.executor.submit(self.grab, host, address, port)
+        future.add_done_callback(self.job_done)
+
+    # Method to queue the parked ports while there are free slots
+    def start_parked(self):
+        while self.slots.acquire(blocking=False):
+            with self.lock:
+                if self.closing or not self.parked:
+                    self.slots.release()
+                    return
+                job = self.parked.popleft()
+            self.start(*job)
+
+    # Method called when a job is done (or dropped)  -  frees its slot for the next parked port
+    def job_done(self, future):
+        self.slots.release()
+        self.start_parked()
+
+    # Method run by the workers
+    def grab(self, host, address, port):
+        service, detail = grab_banner(address, port, host, self.connect_timeout, self.read_timeout)
+        self.callback(host, port, service, detail)
+
+    # Method to wait for the queued ports to be done ('cancel' = drop the ones not started yet)
+    def close(self, cancel=False):
+        with self.lock:
+            self.closing = True
+            parked = list(self.parked)
+            self.parked.clear()
+
+        # (the sweep is over  -  the ports still parked are queued without a slot)
+        if not cancel:
+            for job in parked:
+                self.executor.submit(self.grab, *job)
+        self.executor.shutdown(wait=True, cancel_futures=cancel)
@@ -0,0 +1,221 @@
+__all__ = ['ScanHistory', 'HistoryRecorder', 'DEFAULT_PATH']
+
+# Scan history database (sqlite)  -  every scan & its results are kept across runs, so they can be looked up later:
+#
+#     open_hosts(port, days)      -  which hosts had port X open (over the last N days)
+#     host_history(host, days)    -  what was found on host Y, scan after scan
+#
+# Tables:
+#     scans    (id, started, finished, target, ports, protocol, cancelled)
+#     hosts    (id, host)                                 -  each host stored once (results only hold its id)
+#     results  (scan_id, host_id, port, protocol, state, time)
+#
+# Indexes (on results)  -  one per kind of query, so a query only reads the rows it returns:
+#     (port, protocol, state, time, host_id)   -  port queries (answered from the index alone)
+#     (host_id, state, time)                   -  host queries
+#
+# Results are added by a HistoryRecorder thread while the scan runs (many rows per transaction)
+
+# Import Libs
+import os
+import time
+import queue
+import sqlite3
+import threading
+
+from src.results import OPEN, TCP, PROTOCOLS, STATES
+
+# Default location of the history database
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".pertscan", "history.sqlite3")
+
+# Database schema version (kept in 'PRAGMA user_version')
+VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    id INTEGER PRIMARY KEY,
+    started REAL NOT NULL,
+    finished REAL,
+    target TEXT NOT NULL,
+    ports TEXT NOT NULL,
+    protocol TEXT NOT NULL,
+    cancelled INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS hosts (
+    id INTEGER PRIMARY KEY,
+    host TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS results (
+    scan_id INTEGER NOT NULL,
+    host_id INTEGER NOT NULL,
+    port INTEGER NOT NULL,
+    protocol INTEGER NOT NULL,
+    state INTEGER NOT NULL,
+    time REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_by_port ON results (port, protocol, state, time, host_id);
+CREATE INDEX IF NOT EXISTS results_by_host ON results (host_id, state, time);
+"""
+
+# Results written per transaction (at most) & max seconds results wait before being written
+COMMIT_ROWS = 50000
+COMMIT_INTERVAL = 1.0
+
+# Page cache of each connection (KiB)
+CACHE_KIB = 65536
+
+# Seconds in a day
+DAY = 86400
+
+
+# Scan history database  -  ONE connection, used by one thread at a time
+class ScanHistory:
+    def __init__(self, path=DEFAULT_PATH, check_same_thread=True):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.db = sqlite3.connect(path, check_same_thread=check_same_thread)
+        # WAL: the GUI can query while a scan is being recorded; NORMAL sync is safe with WAL (& much faster)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        # Bigger page cache (64 MiB)  -  index pages stay in memory while results pour in
+        self.db.execute(f"PRAGMA cache_size={-CACHE_KIB}")
+
+        version = self.db.execute("PRAGMA user_version").fetchone()[0]
+        if version > VERSION:
+            self.db.close()
+            raise ValueError(f"history database version {version} is newer than this app (version {VERSION})")
+        with self.db:
+            self.db.executescript(SCHEMA)
+            self.db.execute(f"PRAGMA user_version={VERSION}")
+
+        # Host -> id (filled as hosts are looked up / added)
+        self.host_ids = {}
+
+    # Method to record the start of a scan  -  returns its id
+    def start_scan(self, target, ports, protocol=TCP, started=None):
+        with self.db:
+            cursor = self.db.execute("INSERT INTO scans (started, target, ports, protocol) VALUES (?, ?, ?, ?)",
+                                     (started or time.time(), str(target), str(ports), protocol))
+        return cursor.lastrowid
+
+    # Method to record the end of a scan
+    def finish_scan(self, scan_id, cancelled=False, finished=None):
+        with self.db:
+            self.db.execute("UPDATE scans SET finished = ?, cancelled = ? WHERE id = ?",
+                            (finished or time.time(), int(cancelled), scan_id))
+
+    # Method to get the id of a host  -  None if it is not in the database (added when 'add' is set)
+    def host_id(self, host, add=False):
+        host_id = self.host_ids.get(host)
+        if host_id is None:
+            row = self.db.execute("SELECT id FROM hosts WHERE host = ?", (host,)).fetchone()
+            if row is None:
+                if not add:
+                    return None
+                row = (self.db.execute("INSERT INTO hosts (host) VALUES (?)", (host,)).lastrowid,)
+            host_id = self.host_ids[host] = row[0]
+        return host_id
+
+    # Method to add results (ip, port, state, name, description, protocol) of a scan  -  in ONE transaction
+    def add(self, scan_id, rows, found=None):
+        found = found or time.time()
+        protocols = {protocol: index for index, protocol in enumerate(PROTOCOLS)}
+        with self.db:
+            host_id = self.host_id
+            self.db.executemany("INSERT INTO results (scan_id, host_id, port, protocol, state, time) "
+                                "VALUES (?, ?, ?, ?, ?, ?)",
+                                [(scan_id, host_id(row[0], True), row[1], protocols[row[5]], row[2], found)
+                                 for row in rows])
+
+    # Function to turn "the last N days" into a start time (None = since the 1st scan)
+    @staticmethod
+    def since(days):
+        return time.time() - days * DAY if days is not None else 0.0
+
+    # Method to find the hosts that had a port open (over the last 'days' days)
+    # returns [(host, first seen open, last seen open, number of times seen open)], most recently seen first
+    def open_hosts(self, port, days=None, protocol=TCP):
+        return self.db.execute(
+            "SELECT hosts.host, MIN(results.time), MAX(results.time), COUNT(*) "
+            "FROM results JOIN hosts ON hosts.id = results.host_id "
+            "WHERE results.port = ? AND results.protocol = ? AND results.state = ? AND results.time >= ? "
+            "GROUP BY results.host_id ORDER BY MAX(results.time) DESC",
+            (port, PROTOCOLS.index(protocol), OPEN, self.since(days))).fetchall()
+
+    # Method to get the history of a host  -  its results in the given states (open ports by default; None = all)
+    # returns [(time, port, protocol, state, scan id)], most recent first (at most 'limit' of them)
+    def host_history(self, host, days=None, states=(OPEN,), limit=1000):
+        host_id = self.host_id(host)
+        if host_id is None:  # Never scanned
+            return []
+
+        # One query per state  -  each reads (at most) 'limit' rows straight off the index, in time order
+        rows = []
+        for state in states if states is not None else range(len(STATES)):
+            rows += self.db.execute("SELECT time, port, protocol, state, scan_id FROM results "
+                                    "WHERE host_id = ? AND state = ? AND time >= ? ORDER BY time DESC LIMIT ?",
+                                    (host_id, state, self.since(days), limit if limit is not None else -1)).fetchall()
+        rows.sort(key=lambda row: (-row[0], row[1]))
+        return [(found, port, PROTOCOLS[protocol], state, scan_id)
+                for found, port, protocol, state, scan_id in rows[:limit]]
+
+    # Method to list the recorded scans  -  [(id, started, finished, target, ports, protocol, cancelled)],
+    # most recent first
+    def scans(self, limit=100):
+        return self.db.execute("SELECT id, started, finished, target, ports, protocol, cancelled FROM scans "
+                               "ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+
+    # Number of results stored
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self):
+        self.db.close()
+
+
+# Thread recording the results of ONE scan to the history database as they come in (so the consumer of the results
+# never waits on the disk)  -  add() batches of results, close() once the scan is done
+class HistoryRecorder(threading.Thread):
+    def __init__(self, path, target, ports, protocol=TCP):
+        threading.Thread.__init__(self, daemon=True)
+        # (opened here, so a bad path fails right away  -  only used by the thread from then on)
+        self.history = ScanHistory(path, check_same_thread=False)
+        self.scan_id = self.history.start_scan(target, ports, protocol)
+        self.batches = queue.Queue()
+        self.cancelled = False
+
+    def run(self):
+        done = False
+        while not done:
+            rows = []
+            deadline = time.monotonic() + COMMIT_INTERVAL
+
+            # Gather results until there are COMMIT_ROWS of them, COMMIT_INTERVAL has passed, or the scan is done
+            while len(rows) < COMMIT_ROWS:
+                try:
+                    batch = self.batches.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if batch is None:
+                    done = True
+                    break
+                rows.extend(batch)
+
+            if rows:
+                self.history.add(self.scan_id, rows)
+
+        self.history.finish_scan(self.scan_id, self.cancelled)
+        self.history.close()
+
+    # Method to add a batch of results
+    def add(self, rows):
+        self.batches.put(rows)
+
+    # Method to write the last results & close the database (waits for it)
+    def close(self, cancelled=False):
+        self.cancelled = cancelled
+        self.batches.put(None)
+        self.join()
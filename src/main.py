@@ -1,25 +1,33 @@
 __all__ = ['Page', 'Page1', 'Page2', 'MainView']
 
-# NOTE:  Add an exception for checking VALID IP INPUT  (before actually running the IP)
 # NOTE:  Disable the ability to press scan while a scan is already ongoing
 # NOTE:  Add a refresh icon/animation while scan is ongoing?
 # NOTE:  Add details frame below the table & show info for when a port is selected (instead of the test popup window)
 
 # Import Libs
 import os
-import json
 import tkinter as tk
 from tkinter import ttk
 from tkinter import font
-from tkinter.messagebox import showinfo
-from PIL import ImageTk, Image
+from tkinter.messagebox import showinfo, showerror
+from tkinter.filedialog import asksaveasfilename, askopenfilename
+from tkinter.simpledialog import askinteger
 
+import time
 import socket
 import queue
 import threading
-from concurrent.futures import ThreadPoolExecutor
 
 from src import resource_dir
+from src.port_catalog import preload_catalog
+from src.results import (ResultStore, ServiceBatch, SCAN_DONE, CLOSED, OPEN, FILTERED, UNRESOLVED, OPEN_FILTERED, TCP,
+                         UDP, status_text)
+from src.targets import parse_targets
+from src.port_spec import parse_ports
+from src.checkpoint import Checkpoint
+from src.export import open_writer
+from src.diff import Baseline, ScanDiff
+from src.metrics import MetricsReporter
 
 
 # Default Page (structure that each Page inherits)
@@ -44,14 +52,25 @@ class Page(tk.Frame):
 
 # Page 1
 class Page1(Page):
+    # Number of rows the results table shows at once (ONLY these rows exist as Treeview items)
+    VISIBLE_ROWS = 10
+
+    # Details pane status colour for each port state (anything else is gray)
+    STATUS_COLORS = {status_text(OPEN): "red", status_text(CLOSED): "blue", status_text(FILTERED): "orange",
+                     status_text(OPEN_FILTERED): "dark orange"}
+
     def __init__(self, *args, **kwargs):
         Page.__init__(self, *args, **kwargs)
 
         """ ========================
              INITIALIZE VARIABLE(S)
             ======================== """
-        self.data = []  # For storing scanned port data
-        self.ports_info = json.load(open(os.path.join(resource_dir, "ports.json")))
+        self.data = ResultStore()  # For storing scanned port data
+        self.view = self.data.select()  # Row numbers (in 'data') shown in the table  -  filtered & sorted
+        self.first_row = 0  # Position (in 'view') of the top row of the table
+        self.sort_column = None  # Column the table is sorted by (None = scan order)
+        self.sort_reverse = False
+        self.selected_row = None  # Row number (in 'data') of the selected table row
 
         """ ====================
              PAGE CONFIGURATION
@@ -76,7 +95,7 @@ class Page1(Page):
         self.ip_default_checkbox.grid(row=0, column=3, padx=5, pady=5, sticky="w")
 
         # Port Range label
-        self.port_range_label = tk.Label(self, text="Port Range:", font=self.small_font)
+        self.port_range_label = tk.Label(self, text="Ports:", font=self.small_font)
         self.port_range_label.grid(row=0, column=4, padx=0, pady=5, sticky="w")
         # Port Range text input
         self.port_range_entry_text = tk.StringVar()
@@ -86,32 +105,41 @@ class Page1(Page):
 
 
 
-        # Result table
-        result_columns = ('ip', 'port_num', 'port_status', 'port_name', 'description')
-        self.scan_results = ttk.Treeview(self, columns=result_columns, show='headings')
+        # Result table  -  a "virtual" table: only VISIBLE_ROWS items exist, & they show whichever rows are scrolled to
+        result_columns = ('ip', 'port_num', 'protocol', 'port_status', 'port_name', 'description')
+        self.scan_results = ttk.Treeview(self, columns=result_columns, show='headings', height=self.VISIBLE_ROWS,
+                                         selectmode='browse')
 
         # Set column heading data (id, text, width)
         columns = (('ip', 'IP Address', 100),
                    ('port_num', 'Port', 50),
-                   ('port_status', 'Status', 80),
+                   ('protocol', 'Proto', 50),
+                   ('port_status', 'Status', 100),
                    ('port_name', 'Port Name', 120),
-                   ('description', 'Description', 340))
+                   ('description', 'Description', 270))
 
         # Set table heading names, column sizing, & data filtering command
         for col in columns:
             self.scan_results.heading(col[0], text=col[1], command=lambda _col=col[0]: self.filter_data(_col, True))
             self.scan_results.column(col[0], minwidth=0, width=col[2])
 
+        # Create the (empty) table rows that get re-used while scrolling
+        self.table_rows = [self.scan_results.insert('', tk.END, values=()) for _ in range(self.VISIBLE_ROWS)]
+
         # Set the action binding for when a table entry is clicked/selected
         self.scan_results.bind("<<TreeviewSelect>>", self.item_selected)
 
+        # Scroll the table with the mouse wheel (Windows/Mac & Linux)
+        self.scan_results.bind("<MouseWheel>", lambda event: self.scroll_table(-1 if event.delta > 0 else 1))
+        self.scan_results.bind("<Button-4>", lambda event: self.scroll_table(-1))
+        self.scan_results.bind("<Button-5>", lambda event: self.scroll_table(1))
+
         # Place/position the results table
         self.scan_results.grid(row=1, column=0, padx=(5, 0), pady=5, columnspan=60, sticky="nsew")
 
-        # Add a scrollbar to the results table
-        scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.scan_results.yview)
-        self.scan_results.configure(yscrollcommand=scrollbar.set)
-        scrollbar.grid(row=1, column=60, sticky="ns")
+        # Add a scrollbar to the results table (scrolls through 'view', not through Treeview items)
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.on_scrollbar)
+        self.scrollbar.grid(row=1, column=60, sticky="ns")
 
         # Details frame
         self.details = tk.Frame(self, background="white", highlightbackground="gray", highlightthickness=1)
@@ -147,51 +175,137 @@ class Page1(Page):
         # Place Details FRAME
         self.details.grid(row=2, column=0, columnspan=60, padx=(5, 0), pady=(15, 5), sticky="nsew")
 
+        # Scan progress label ("Scanned: x / y")
+        self.progress_label = tk.Label(self, text="", font=self.small_font)
+        self.progress_label.grid(row=3, column=0, columnspan=5, padx=5, pady=0, sticky="w")
+
+        # 'Open ports only' Checkbox  -  hides closed ports (without deleting them)
+        self.open_only_var = tk.IntVar()
+        self.open_only_checkbox = tk.Checkbutton(self, text="Open ports only", variable=self.open_only_var,
+                                                 onvalue=1, offvalue=0, command=self.update_table)
+        self.open_only_checkbox.grid(row=3, column=5, padx=5, pady=0, sticky="e")
+
+        # Status bar  -  live scan metrics (connects in flight, rate, latency, queue depth, table update time)
+        self.status_bar = tk.Label(self, text="", font=self.small_font, anchor="w", relief="sunken", bd=1)
+        self.status_bar.grid(row=4, column=0, columnspan=61, padx=(5, 0), pady=(5, 0), sticky="ew")
+
         # REMOVE FOCUS FROM WIDGET BY CLICKING OFF
         self.bind_all("<1>", lambda event: event.widget.focus_set())
 
     # Method for filtering result table data (runs when column header is clicked)
     def filter_data(self, column, reverse):
-        l = [(self.scan_results.set(k, column), k) for k in self.scan_results.get_children('')]
-
-        try:  # Numeric value
-            l.sort(reverse=reverse, key=lambda tup: float(tup[0]))
-        except ValueError:  # String value
-            l.sort(reverse=reverse)
+        self.sort_column = column
+        self.sort_reverse = reverse
 
-        # Rearrange items in sorted positions
-        for index, (val, k) in enumerate(l):
-            self.scan_results.move(k, '', index)
+        # Sort the row numbers using the stored data (the table only ever shows VISIBLE_ROWS rows)
+        self.view = self.data.sort(self.view, column, reverse)
+        self.first_row = 0
+        self.render_table()
 
         # Reverse the sort for the next run
         self.scan_results.heading(column, command=lambda _col=column: self.filter_data(_col, not reverse))
 
     # Method for deleting port 'data' variable
     def delete_data(self):
-        self.data = []
+        self.data.clear()
+        self.selected_row = None
 
     # Method for adding a port entry to the 'data' variable
-    def add_data(self, ip, port, is_open, name, description):
-        self.data.append((ip, port, is_open, name, description))
+    def add_data(self, ip, port, state, name, description, protocol=TCP):
+        self.data.append((ip, port, state, name, description, protocol))
 
     # Method to clear the results table
     def clear_table(self):
-        for item in self.scan_results.get_children():
-            self.scan_results.delete(item)
+        self.view = self.data.select(())
+        self.first_row = 0
+        self.render_table()
 
-    # Method to update the table with the stored data ('data' var)
+    # Method to update the table with the stored data ('data' var)  -  re-applies the filter & sort
     def update_table(self):
-        # Clear all current table data
-        self.clear_table()
-        # Add all new data
-        for item in self.data:
-            temp = [item[0],
-                    item[1],
-                    # Set status to 'Open'/'Closed' if is_open == True/False
-                    'Open' if item[2] else 'Closed',
-                    item[3],
-                    item[4]]
-            self.scan_results.insert('', tk.END, values=temp)
+        self.view = self.data.select(open_only=self.open_only_var.get() == 1)
+        if self.sort_column is not None:
+            self.view = self.data.sort(self.view, self.sort_column, self.sort_reverse)
+        self.render_table()
+
+    # Method to add NEW rows to the stored data & the table (existing rows are left alone)
+    def append_rows(self, rows):
+        new_rows = self.data.select(self.data.extend(rows), open_only=self.open_only_var.get() == 1)
+
+        if self.sort_column is not None:
+            # Keep the table sorted  -  only the new rows are sorted, then merged into the (already sorted) view
+            self.view = self.data.merge_sorted(self.view, new_rows, self.sort_column, self.sort_reverse)
+        else:
+            self.view.extend(new_rows)
+
+        self.render_table()
+
+    # Method to show the rows of 'view' that are scrolled to in the table
+    def render_table(self):
+        # Keep the top row within the view
+        self.first_row = max(0, min(self.first_row, len(self.view) - self.VISIBLE_ROWS))
+
+        for slot, item_id in enumerate(self.table_rows):
+            position = self.first_row + slot
+            if position < len(self.view):
+                row = self.data[self.view[position]]
+                self.scan_results.item(item_id, values=(row[0], row[1], row[5], status_text(row[2]), row[3],
+                                                            row[4]))
+            else:  # Past the end of the results  -  empty row
+                self.scan_results.item(item_id, values=())
+
+        # Keep the selection on the same result (if it is still visible)
+        selection = ()
+        if self.selected_row is not None:
+            visible = self.view[self.first_row:self.first_row + self.VISIBLE_ROWS]
+            if self.selected_row in visible:
+                selection = (self.table_rows[visible.index(self.selected_row)],)
+        if self.scan_results.selection() != selection:
+            self.scan_results.selection_set(selection)
+
+        # Update the scrollbar (position & size of the visible part of the view)
+        if self.view:
+            self.scrollbar.set(self.first_row / len(self.view),
+                               min(1.0, (self.first_row + self.VISIBLE_ROWS) / len(self.view)))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    # Method to scroll the table by a number of rows
+    def scroll_table(self, rows):
+        self.first_row += rows
+        self.render_table()
+
+    # Method run when the scrollbar is used ('moveto' fraction / 'scroll' n units|pages)
+    def on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.first_row = int(float(amount) * len(self.view))
+            self.render_table()
+        elif action == "scroll":
+            self.scroll_table(int(amount) * (self.VISIBLE_ROWS if unit == "pages" else 1))
+
+    # Method to update the scan progress label  (+ the average measured round-trip time once the scan is done)
+    # ('status' overrides the "Done" / "Scanning..." text, e.g. "Paused"; 'changes' = changes since the baseline)
+    def update_progress(self, scanned, total, open_count, done=False, rtt_stats=None, status=None, changes=None):
+        status = status or ("Done" if done else "Scanning...")
+        text = f"{status}  Scanned: {scanned} / {total}  -  Open: {open_count}"
+        if changes:
+            text += f"  -  Changes: {changes}"
+
+        srtts = [stats['srtt'] for stats in (rtt_stats or {}).values() if stats['samples']]
+        if srtts:
+            text += f"  -  RTT: {sum(srtts) / len(srtts) * 1000:.1f} ms"
+
+        self.progress_label.config(text=text)
+
+    # Method to show a metrics snapshot (ScanMetrics.snapshot()) in the status bar
+    def update_status_bar(self, metrics):
+        latency = metrics['latency']
+        text = f"In flight: {metrics['in_flight']}  -  {metrics['connects_per_s']:.0f} connects/s"
+        if latency['count']:
+            text += f"  -  Latency p50 {latency['p50_ms']:.1f} / p99 {latency['p99_ms']:.1f} ms"
+        text += f"  -  Queue: {metrics['queue_depth']} (max {metrics['peak_queue_depth']})"
+        if metrics['gui_updates']['count']:
+            text += f"  -  Table: {metrics['gui_updates']['mean_ms']:.1f} ms/update"
+        self.status_bar.config(text=text)
 
     def toggle_default_ip(self):
         if self.ip_default_checkbox_var.get() == 1:
@@ -200,10 +314,38 @@ class Page1(Page):
         elif self.ip_default_checkbox_var.get() == 0:
             self.ip_entry.config(state='normal')
 
+    # Method to get the text of the 'Service:' details line  -  the port & protocol ("22/tcp") (+ the service found
+    # on it, if any)
+    def service_text(self, row, port, protocol):
+        found = self.data.service(row)
+        if found is None:
+            return f"{port}/{protocol}"
+        service, detail = found
+        return f"{port}/{protocol}  -  {service or 'Unknown'}  {detail}".rstrip()
+
+    # Method to show the services found on open ports (banner grabbing)  -  refreshes the details if needed
+    def add_services(self, services):
+        for ip, port, service, detail in services:
+            self.data.set_service(ip, port, service, detail)
+
+        if self.selected_row is not None:
+            row = self.data[self.selected_row]
+            ip, port, protocol = row[0], row[1], row[5]
+            if any(found[0] == ip and found[1] == port for found in services):
+                self.details_port.config(text=self.service_text(self.selected_row, port, protocol))
+
     def item_selected(self, event):
         # record[n]
-        # 0=IP ; 1=port ; 2=Status ; 3=PortName ; 4=PortDescription
+        # 0=IP ; 1=port ; 2=Protocol ; 3=Status ; 4=PortName ; 5=PortDescription
         for selected_item in self.scan_results.selection():
+            # Which result is shown in the selected table row?
+            position = self.first_row + self.table_rows.index(selected_item)
+            if position >= len(self.view):  # Empty row
+                continue
+            if self.selected_row == self.view[position]:  # Same result (e.g. after scrolling)
+                continue
+            self.selected_row = self.view[position]
+
             item = self.scan_results.item(selected_item)
             record = item['values']
             print(record[0])
@@ -213,10 +355,10 @@ class Page1(Page):
             print(record[4])
 
             # Update details
-            self.details_port.config(text=record[1])
-            self.details_desc.config(text=record[3] if record[3] != "N/A" else "")
-            self.details_extended.config(text=record[4] if record[4] != "N/A" else "")
-            self.details_status.config(text=record[2].upper(), foreground="red" if record[2] == "Open" else "blue")
+            self.details_port.config(text=self.service_text(self.selected_row, record[1], record[2]))
+            self.details_desc.config(text=record[4] if record[4] != "N/A" else "")
+            self.details_extended.config(text=record[5] if record[5] != "N/A" else "")
+            self.details_status.config(text=record[3].upper(), foreground=self.STATUS_COLORS.get(record[3], "gray"))
 
             # show a message
             # showinfo(title='Information', message=''.join(str(record)))
@@ -262,6 +404,8 @@ class Page3(Page):
         # Initialize logo image
         # Create an object of tkinter ImageTk
         # Using this to include the picture of Grab the Axe in the about screen.
+        # (PIL is imported HERE  -  the 1st time the About page is opened, not when the app starts)
+        from PIL import ImageTk, Image
         logo_im = Image.open(os.path.join(resource_dir, "GrabTheAxe.jpg"))
         logo_resize = logo_im.resize((150, 150))
         self.logo_img = ImageTk.PhotoImage(logo_resize)
@@ -319,8 +463,205 @@ class Page3(Page):
         self.frame_right.grid(row=0, column=1, sticky="e")
 
 
+# Page 4  -  Scan History (results of past scans, from the scan history database)
+class Page4(Page):
+    # Max number of rows a host history query shows
+    MAX_ROWS = 1000
+
+    def __init__(self, *args, **kwargs):
+        Page.__init__(self, *args, **kwargs)
+
+        """ ========================
+             INITIALIZE VARIABLE(S)
+            ======================== """
+        # Location of the history database (set by MainView) & the database, opened on the 1st query
+        self.path = None
+        self.history = None
+
+        """ ====================
+             PAGE CONFIGURATION
+            ==================== """
+        # Back button
+        self.back_button = tk.Button(self, text="Back", font=self.small_font)
+
+        # LabelFrame
+        self.frame = tk.LabelFrame(self, text="Scan History", font=self.title_font)
+
+        # "Which hosts had port X open?"  -  Port text input, UDP checkbox & query button
+        self.port_label = tk.Label(self.frame, text="Port:", font=self.small_font)
+        self.port_entry_text = tk.StringVar()
+        self.port_entry_text.set("22")
+        self.port_entry = tk.Entry(self.frame, textvariable=self.port_entry_text, font=self.small_font, width=8)
+        self.udp_var = tk.IntVar()
+        self.udp_checkbox = tk.Checkbutton(self.frame, text="UDP", variable=self.udp_var, onvalue=1, offvalue=0)
+        self.port_button = tk.Button(self.frame, text="Hosts With Port Open", font=self.small_font,
+                                     command=self.query_port)
+
+        # "History of host Y"  -  Host text input, 'All states' checkbox & query button
+        self.host_label = tk.Label(self.frame, text="Host:", font=self.small_font)
+        self.host_entry_text = tk.StringVar()
+        self.host_entry_text.set("127.0.0.1")
+        self.host_entry = tk.Entry(self.frame, textvariable=self.host_entry_text, font=self.small_font, width=16)
+        self.all_states_var = tk.IntVar()
+        self.all_states_checkbox = tk.Checkbutton(self.frame, text="All states (not just open ports)",
+                                                  variable=self.all_states_var, onvalue=1, offvalue=0)
+        self.host_button = tk.Button(self.frame, text="Host History", font=self.small_font, command=self.query_host)
+
+        # "Over the last N days"  -  applies to both queries (empty = every scan)
+        self.days_label = tk.Label(self.frame, text="Last N days:", font=self.small_font)
+        self.days_entry_text = tk.StringVar()
+        self.days_entry_text.set("30")
+        self.days_entry = tk.Entry(self.frame, textvariable=self.days_entry_text, font=self.small_font, width=8)
+
+        # Query results table (its columns depend on the query)
+        self.results = ttk.Treeview(self, show='headings', height=12, selectmode='browse')
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.results.yview)
+        self.results.configure(yscrollcommand=self.scrollbar.set)
+
+        # Query status label ("N host(s)  -  X ms")
+        self.status_label = tk.Label(self, text="", font=self.small_font)
+
+        # Place / position everything
+        self.back_button.grid(row=0, column=0, padx=5, pady=5, sticky="w")
+        self.frame.grid(row=1, column=0, columnspan=2, padx=5, pady=5, sticky="ew")
+
+        # Queries (in the LabelFrame)
+        self.port_label.grid(row=0, column=0, padx=5, pady=2, sticky="w")
+        self.port_entry.grid(row=0, column=1, padx=0, pady=2, sticky="w")
+        self.udp_checkbox.grid(row=0, column=2, padx=5, pady=2, sticky="w")
+        self.port_button.grid(row=0, column=3, padx=5, pady=2, sticky="ew")
+        self.host_label.grid(row=1, column=0, padx=5, pady=2, sticky="w")
+        self.host_entry.grid(row=1, column=1, padx=0, pady=2, sticky="w")
+        self.all_states_checkbox.grid(row=1, column=2, padx=5, pady=2, sticky="w")
+        self.host_button.grid(row=1, column=3, padx=5, pady=2, sticky="ew")
+        self.days_label.grid(row=0, column=4, padx=(20, 5), pady=2, sticky="w")
+        self.days_entry.grid(row=0, column=5, padx=0, pady=2, sticky="w")
+
+        # Results table & status
+        self.results.grid(row=2, column=0, padx=(5, 0), pady=5, sticky="nsew")
+        self.scrollbar.grid(row=2, column=1, pady=5, sticky="ns")
+        self.status_label.grid(row=3, column=0, columnspan=2, padx=5, pady=0, sticky="w")
+
+    # Method to open the history database (once)  -  returns None (after showing why) if it can't be opened
+    def open_history(self):
+        if self.history is None:
+            # (imported here  -  sqlite is only needed once the history is looked at / recorded)
+            import sqlite3
+            from src.history import ScanHistory
+            try:
+                self.history = ScanHistory(self.path)
+            except (OSError, ValueError, sqlite3.Error) as e:
+                showerror(title='Scan History', message=f"Cannot open the history database '{self.path}': {e}")
+        return self.history
+
+    # Method to read the 'Last N days' textbox  -  returns (ok, days); days is None when the box is empty
+    def get_days(self):
+        text = self.days_entry_text.get().strip()
+        if not text:
+            return True, None
+        try:
+            days = float(text)
+        except ValueError:
+            days = -1
+        if days < 0:
+            showerror(title='Invalid Days', message=f"'{text}' is not a number of days")
+            return False, None
+        return True, days
+
+    # Method to show query results in the table  -  'columns' = ((id, heading text, width), ...)
+    def show_rows(self, columns, rows):
+        self.results.delete(*self.results.get_children())
+        self.results.configure(columns=[column[0] for column in columns])
+        for column, text, width in columns:
+            self.results.heading(column, text=text)
+            self.results.column(column, minwidth=0, width=width)
+        for row in rows:
+            self.results.insert('', tk.END, values=row)
+
+    # Function to show a time stamp as local date & time
+    @staticmethod
+    def format_time(stamp):
+        return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(stamp))
+
+    # Method to list the hosts that had the port open (over the last N days)
+    def query_port(self):
+        text = self.port_entry_text.get().strip()
+        if not text.isdigit() or not 0 <= int(text) <= 65535:
+            showerror(title='Invalid Port', message=f"'{text}' is not a port number (0-65535)")
+            return
+        ok, days = self.get_days()
+        history = self.open_history() if ok else None
+        if history is None:
+            return
+
+        protocol = UDP if self.udp_var.get() == 1 else TCP
+        start = time.perf_counter()
+        rows = history.open_hosts(int(text), days, protocol)
+        elapsed = (time.perf_counter() - start) * 1000
+
+        self.show_rows((('host', 'Host', 160), ('first', 'First Seen Open', 170), ('last', 'Last Seen Open', 170),
+                        ('count', 'Times Seen Open', 120)),
+                       [(host, self.format_time(first), self.format_time(last), count)
+                        for host, first, last, count in rows])
+        self.status_label.config(text=f"{len(rows)} host(s) had port {text}/{protocol} open  -  {elapsed:.1f} ms")
+
+    # Method to list what was found on the host, most recent first (over the last N days)
+    def query_host(self):
+        host = self.host_entry_text.get().strip()
+        ok, days = self.get_days()
+        history = self.open_history() if ok and host else None
+        if history is None:
+            return
+
+        start = time.perf_counter()
+        rows = history.host_history(host, days, None if self.all_states_var.get() == 1 else (OPEN,), self.MAX_ROWS)
+        elapsed = (time.perf_counter() - start) * 1000
+
+        self.show_rows((('time', 'Found', 170), ('port', 'Port', 60), ('protocol', 'Proto', 50),
+                        ('state', 'Status', 100), ('scan', 'Scan #', 60)),
+                       [(self.format_time(found), port, protocol, status_text(state), scan_id)
+                        for found, port, protocol, state, scan_id in rows])
+        limit = f" (the last {self.MAX_ROWS})" if len(rows) == self.MAX_ROWS else ""
+        self.status_label.config(text=f"{len(rows)} result(s) for {host}{limit}  -  {elapsed:.1f} ms")
+
+
+# Function to import the scan engine picked in 'Settings -> Scan Engine'  -  done on the 1st scan, not when the
+# app starts (the engines pull in asyncio / multiprocessing / ...)
+# UDP scans have an engine of their own (split between processes when "processes" is picked)
+def load_engine(name, udp=False):
+    if udp and name != "processes":
+        from src.udp_scanner import UdpPortScanner
+        return UdpPortScanner
+    if name == "asyncio":
+        from src.async_scanner import AsyncPortScanner
+        return AsyncPortScanner
+    if name == "selectors":
+        from src.selector_scanner import SelectorPortScanner
+        return SelectorPortScanner
+    if name == "processes":
+        from src.sharded_scanner import ShardedPortScanner
+        return ShardedPortScanner
+    from src.scanner import ThreadedPortScanner
+    return ThreadedPortScanner
+
+
 # Main Controller class - primary window container - contains, controls & views Page(s)
 class MainView(tk.Frame):
+    # Max number of results added to the table per process_queue() tick
+    MAX_ROWS_PER_TICK = 500
+
+    # Progress of the last scan is recorded here (File -> Resume Last Scan continues it)
+    CHECKPOINT_PATH = os.path.join(os.path.expanduser("~"), ".pertscan", "checkpoint.jsonl")
+
+    # Every scan is recorded here when 'Settings -> Record History' is on (View -> Scan History looks it up)
+    HISTORY_PATH = os.path.join(os.path.expanduser("~"), ".pertscan", "history.sqlite3")
+
+    # Scan metrics are logged here (JSON lines, once a second) when 'Settings -> Log Metrics' is on
+    METRICS_PATH = os.path.join(os.path.expanduser("~"), ".pertscan", "metrics.jsonl")
+
+    # Seconds between two status bar updates
+    STATUS_BAR_INTERVAL = 0.25
+
     def __init__(self, *args, **kwargs):
         tk.Frame.__init__(self, *args, **kwargs)
 
@@ -329,10 +670,56 @@ class MainView(tk.Frame):
         """ ========================
              INITIALIZE VARIABLE(S)
             ======================== """
-        self.machine_ip = socket.gethostbyname(socket.gethostname())
-
-        # Initialize host target
-        self.target = self.machine_ip
+        # IP address of this machine  -  looked up in the background (slow DNS mustn't hold up the window)
+        self.machine_ip = None
+        threading.Thread(target=self.lookup_machine_ip, name="machine-ip", daemon=True).start()
+
+        # Initialize host target (this machine, once its IP is known)
+        self.target = None
+
+        # Load the port metadata in the background (ready by the time the 1st results come in)
+        preload_catalog()
+
+        # Max number of ports scanned at once (None = pick a default from the fd limit & CPU count)
+        self.max_workers = None
+        # Max number of ports scanned at once on any one host (None = no per-host limit)  ('Settings -> Per-Host Limit')
+        self.per_host_limit = None
+        # Max connects started per second across all hosts / to any one host (None = no limit)
+        self.rate = None
+        self.per_host_rate = None
+
+        # Running (or last) scan engine thread & whether its results are still coming in
+        self.scanner = None
+        self.scanning = False
+
+        # File the results are saved to ('Save' re-uses it) & the writer still adding results to it while
+        # a scan is running (None once the scan is done)
+        self.save_path = None
+        self.export = None
+
+        # Results of a previous scan to compare against (None = full scan, no diff) & the changes found so far
+        self.baseline = None
+        self.diff = None
+        # Max connects per second for the ports that were not open in the baseline (None = the scanner's default)
+        self.sweep_rate = None
+
+        # Scan engine to use ("threads" = ThreadedPortScanner, "asyncio" = AsyncPortScanner,
+        # "selectors" = SelectorPortScanner  -  every connect from one thread,
+        # "processes" = ShardedPortScanner  -  the scan split between one process per CPU)
+        self.scan_engine = tk.StringVar(self, value="threads")
+        # Grab the banners of open ports & identify their services?  ('Settings -> Grab Banners')
+        self.grab_banners = tk.BooleanVar(self, value=False)
+        # Scan UDP ports instead of TCP?  ('Settings -> UDP Scan')
+        self.udp_scan = tk.BooleanVar(self, value=False)
+        # Record every scan to the history database at HISTORY_PATH?  ('Settings -> Record History')
+        self.record_history = tk.BooleanVar(self, value=True)
+        # History recorder of the running scan (None when not recording)
+        self.history = None
+        # Log the scan metrics to METRICS_PATH?  ('Settings -> Log Metrics')
+        self.log_metrics = tk.BooleanVar(self, value=False)
+        # Metrics logger of the running scan (if logging) & when the status bar was last updated
+        self.metrics_reporter = None
+        self.status_updated = 0
 
 
 
@@ -345,28 +732,41 @@ class MainView(tk.Frame):
         """ ======================
              WINDOW CONFIGURATION
             ====================== """
-        # Create object for each Page
-        self.p1 = Page1(self)
-        self.p2 = Page2(self)
-        self.p3 = Page3(self)
-
         # Create container to hold all content  -  CONTAINS Page(s)
-        container = tk.Frame(self)
-        container.pack(side="top", fill="both", expand=True)
+        self.container = tk.Frame(self)
+        self.container.pack(side="top", fill="both", expand=True)
 
-        # Place all pages (stacked atop one another) in the 'container' Frame
-        self.p1.place(in_=container, x=0, y=0, relwidth=1, relheight=1)
-        self.p2.place(in_=container, x=0, y=0, relwidth=1, relheight=1)
-        self.p3.place(in_=container, x=0, y=0, relwidth=1, relheight=1)
+        # Pages are built the 1st time they are shown (see page())  -  only the main page is needed right away
+        self.pages = {}
+        self.p1 = self.page(Page1)
 
         # BUTTON CONFIGURATION
         self.p1.scan_button.config(command=self.start_scan)
-        self.p2.back_button.config(command=self.goto_main_page)
-        self.p3.back_button.config(command=self.goto_main_page)
 
         # Display the 1st page!
         self.p1.show()
 
+    # Method to get a Page  -  builds it & places it (atop the others) in the 'container' Frame the 1st time
+    def page(self, page_class):
+        page = self.pages.get(page_class)
+        if page is None:
+            page = self.pages[page_class] = page_class(self)
+            page.place(in_=self.container, x=0, y=0, relwidth=1, relheight=1)
+
+            # Every page but the main one has a 'Back' button
+            if hasattr(page, "back_button"):
+                page.back_button.config(command=self.goto_main_page)
+        return page
+
+    # Method to look up the IP address of this machine (runs in its own thread  -  no tkinter calls here)
+    def lookup_machine_ip(self):
+        try:
+            self.machine_ip = socket.gethostbyname(socket.gethostname())
+        except OSError:  # No DNS / unknown host name  -  fall back to loopback
+            self.machine_ip = "127.0.0.1"
+        if self.target is None:
+            self.target = self.machine_ip
+
     # Method to initialize the menubar  -  returns instance of Menubar
     def initialize_menubar(self):
         menubar = tk.Menu(self)
@@ -375,15 +775,31 @@ class MainView(tk.Frame):
         file_menu = tk.Menu(menubar, tearoff=0)
 
         file_menu.add_command(label='Scan', command=self.start_scan)
+        file_menu.add_command(label='Pause', command=self.pause_scan)
+        file_menu.add_command(label='Resume', command=self.resume_scan)
+        file_menu.add_command(label='Cancel Scan', command=self.cancel_scan)
+        file_menu.add_command(label='Resume Last Scan', command=self.resume_last_scan)
+        file_menu.add_separator()
+        file_menu.add_command(label='Load Baseline...', command=self.load_baseline)
+        file_menu.add_command(label='Clear Baseline', command=self.clear_baseline)
         file_menu.add_separator()
-        file_menu.add_command(label='Save')
-        file_menu.add_command(label='Save As...')
+        file_menu.add_command(label='Save', command=self.save)
+        file_menu.add_command(label='Save As...', command=self.save_as)
         file_menu.add_separator()
-        file_menu.add_command(label='Exit', command=self.master.destroy)
+        file_menu.add_command(label='Exit', command=self.exit)
 
         # VIEW
         view_menu = tk.Menu(menubar, tearoff=0)
 
+        view_menu.add_command(label='Scan History', command=self.goto_history_page)
+
+        # SCAN ENGINE
+        engine_menu = tk.Menu(menubar, tearoff=0)
+        engine_menu.add_radiobutton(label='Threads', variable=self.scan_engine, value="threads")
+        engine_menu.add_radiobutton(label='Asyncio', variable=self.scan_engine, value="asyncio")
+        engine_menu.add_radiobutton(label='Selectors (epoll)', variable=self.scan_engine, value="selectors")
+        engine_menu.add_radiobutton(label='Processes', variable=self.scan_engine, value="processes")
+
         # SETTINGS
         settings_menu = tk.Menu(menubar, tearoff=0)
 
@@ -400,6 +816,12 @@ class MainView(tk.Frame):
         # ADD SUB-MENU CASCADES TO MENU OPTIONS
         preferences_menu.add_cascade(label='Font Preferences', menu=font_preferences)
         settings_menu.add_cascade(label='Preferences', menu=preferences_menu)
+        settings_menu.add_cascade(label='Scan Engine', menu=engine_menu)
+        settings_menu.add_command(label='Per-Host Limit...', command=self.set_per_host_limit)
+        settings_menu.add_checkbutton(label='UDP Scan', variable=self.udp_scan)
+        settings_menu.add_checkbutton(label='Grab Banners', variable=self.grab_banners)
+        settings_menu.add_checkbutton(label='Record History', variable=self.record_history)
+        settings_menu.add_checkbutton(label='Log Metrics', variable=self.log_metrics)
 
         # HELP
         help_menu = tk.Menu(menubar, tearoff=0)
@@ -421,25 +843,158 @@ class MainView(tk.Frame):
 
     # Method for lifting Page2 to the top of the stack
     def goto_welcome_page(self):
-        self.p2.show()
+        self.page(Page2).show()
 
     def goto_about_page(self):
-        self.p3.show()
+        self.page(Page3).show()
+
+    # Method for lifting Page4 (Scan History) to the top of the stack
+    def goto_history_page(self):
+        page = self.page(Page4)
+        page.path = self.HISTORY_PATH
+        page.show()
+
+    # Method to set the max number of ports scanned at once on any one host (used from the next scan on)
+    def set_per_host_limit(self):
+        limit = askinteger(title='Per-Host Limit', parent=self, minvalue=0, initialvalue=self.per_host_limit or 0,
+                           prompt="Max ports scanned at once on any one host (0 = no limit):")
+        if limit is not None:  # (None = the dialog was cancelled)
+            self.per_host_limit = limit or None
+
+    # Method to check if a scan is running right now (or its last results are still being added to the table)
+    def is_scanning(self):
+        return self.scanning
+
+    # Method to pause the running scan
+    def pause_scan(self):
+        if self.is_scanning():
+            self.scanner.pause()
+
+    # Method to resume the paused scan
+    def resume_scan(self):
+        if self.is_scanning():
+            self.scanner.resume()
+
+    # Method to cancel the running scan  -  the results so far are kept (& can be continued with 'Resume Last Scan')
+    def cancel_scan(self):
+        if self.is_scanning():
+            self.scanner.cancel()
+
+    # Method to continue the last (cancelled / unfinished) scan from its checkpoint
+    def resume_last_scan(self):
+        if self.is_scanning():
+            return
+
+        header = Checkpoint(self.CHECKPOINT_PATH).read_header()
+        if header is None:
+            showinfo(title='Resume Last Scan', message="There is no scan to resume")
+            return
+
+        # Put the recorded target & ports back in the textboxes, then scan only what is left
+        self.p1.ip_default_checkbox_var.set(0)
+        self.p1.toggle_default_ip()
+        self.p1.ip_entry_text.set(header['target'])
+        self.p1.port_range_entry_text.set(header['ports'])
+        self.udp_scan.set(header['protocol'] == UDP)
+        self.start_scan(resume=True)
+
+    # Method to close the app  -  cancels the running scan first (it is checkpointed, so it can be resumed)
+    def exit(self):
+        if self.is_scanning():
+            self.scanner.cancel()
+            self.scanner.join(timeout=1)
+        if self.export is not None:
+            self.export.close()
+        if self.history is not None:
+            self.history.close(cancelled=True)
+        self.master.destroy()
+
+    # Method to load the saved results of a previous scan  -  the next scans are incremental & show the changes
+    def load_baseline(self):
+        path = askopenfilename(title='Load Baseline',
+                               filetypes=[('Scan Results', '*.csv *.jsonl *.bin'), ('All Files', '*.*')])
+        if not path:
+            return
+
+        try:
+            self.baseline = Baseline.load(path)
+        except (OSError, ValueError, KeyError) as e:
+            showerror(title='Load Baseline Failed', message=str(e))
+            return
+        showinfo(title='Load Baseline', message=f"Loaded {len(self.baseline)} host(s)  -  the next scans will "
+                                                f"rescan their open ports first & show what changed")
+
+    # Method to go back to full scans (no baseline)
+    def clear_baseline(self):
+        self.baseline = None
+
+    # Method to show the changes found by an incremental scan
+    def show_changes(self):
+        changes = self.diff.changes
+        lines = [ScanDiff.describe(change) for change in changes[:20]]
+        if len(changes) > 20:
+            lines.append(f"... and {len(changes) - 20} more")
+        showinfo(title='Changes Since Baseline', message=self.diff.summary() + "\n\n" + "\n".join(lines))
+
+    # Method to save the results to the last used file (asks for one the first time)
+    def save(self):
+        if self.save_path is None:
+            self.save_as()
+        else:
+            self.save_results(self.save_path)
+
+    # Method to save the results to a new file  (CSV, JSON Lines or binary  -  picked by the file extension)
+    def save_as(self):
+        path = asksaveasfilename(title='Save Results', defaultextension='.csv',
+                                 filetypes=[('CSV', '*.csv'), ('JSON Lines', '*.jsonl'), ('Binary', '*.bin')])
+        if path:
+            self.save_path = path
+            self.save_results(path)
+
+    # Method to write the results so far to a file  -  while a scan is running, the new results are added to the
+    # file as they come in (see process_queue())
+    def save_results(self, path):
+        if self.export is not None:  # Already streaming to a file  -  switch to the new one
+            self.export.close()
+            self.export = None
 
-    # Method for starting the Port Scanning process
-    def start_scan(self):
-        # Update the target host with IP address FROM THE TEXTBOX
+        try:
+            writer = open_writer(path)
+            writer.write_all(self.p1.data)
+        except OSError as e:
+            showerror(title='Save Failed', message=str(e))
+            return
+
+        if self.is_scanning():
+            self.export = writer
+        else:
+            writer.close()
+
+    # Method for starting the Port Scanning process  ('resume' = continue the scan in the checkpoint)
+    def start_scan(self, resume=False):
+        if self.is_scanning():
+            return
+
+        # Update the target host(s) with IP address / CIDR block / range / list FROM THE TEXTBOX
         self.target = self.p1.ip_entry_text.get()
+        try:
+            self.targets = parse_targets(self.target)
+        except ValueError as e:
+            showerror(title='Invalid Target', message=str(e))
+            return
+
+        # (host names are resolved by the scanner thread  -  a slow DNS server never holds up the window; names that
+        # can't be resolved show up as Unresolved)
 
         # Update the range of ports to scan with PORT RANGE FROM THE TEXTBOX
         self.port_range = self.p1.port_range_entry_text.get()
 
-        # Spit range into start and end of range
-        self.port_range_start = int(self.port_range.split("-")[0])
-        self.port_range_end = int(self.port_range.split("-")[1])
-
         # Initialize list of ports to scan using 'port list' input
-        self.port_list = range(self.port_range_start, self.port_range_end + 1)
+        try:
+            self.port_list = parse_ports(self.port_range)
+        except ValueError as e:
+            showerror(title='Invalid Port Range', message=str(e))
+            return
 
         # DISABLE SCAN BUTTON
         self.p1.scan_button["state"] = "disabled"
@@ -449,121 +1004,142 @@ class MainView(tk.Frame):
         # Clear the table (so it shows empty WHILE it scans!!!)
         self.p1.update_table()
 
+        # Reset the scan progress
+        self.p1.update_progress(0, len(self.targets) * len(self.port_list), 0)
+
         # Initialize queue
         self.queue = queue.Queue()
 
+        # Compare the results with the baseline (if one is loaded)
+        self.diff = ScanDiff(self.baseline) if self.baseline is not None else None
+
+        # Record the scan to the history database (if enabled)
+        if self.record_history.get():
+            # (imported here  -  sqlite is only needed once the history is recorded / looked at)
+            import sqlite3
+            from src.history import HistoryRecorder
+            try:
+                self.history = HistoryRecorder(self.HISTORY_PATH, self.target, self.port_range,
+                                               UDP if self.udp_scan.get() else TCP)
+                self.history.start()
+            except (OSError, ValueError, sqlite3.Error) as e:
+                self.history = None
+                showerror(title="Error", message=f"Cannot record the scan to '{self.HISTORY_PATH}': {e}")
+
+        # Pick the scan engine selected in 'Settings -> Scan Engine'
+        scanner = load_engine(self.scan_engine.get(), self.udp_scan.get())
+
         # Start the PortScanner thread  (send the parameters: target ip & range of ports)
-        ThreadedPortScanner(self.queue, args=(self.target, self.port_list)).start()
+        self.scanner = scanner(self.queue, args=(self.targets, self.port_list),
+                               kwargs={'max_workers': self.max_workers, 'per_host_limit': self.per_host_limit,
+                                       'rate': self.rate, 'per_host_rate': self.per_host_rate,
+                                       'baseline': self.baseline, 'sweep_rate': self.sweep_rate,
+                                       'banners': self.grab_banners.get(),
+                                       'shard_engine': 'udp' if self.udp_scan.get() else 'threads',
+                                       'checkpoint': self.CHECKPOINT_PATH, 'resume': resume})
+        self.scanner.start()
+        self.scanning = True
+
+        # Log the scan metrics (if enabled)
+        if self.log_metrics.get():
+            try:
+                os.makedirs(os.path.dirname(self.METRICS_PATH), exist_ok=True)
+                self.metrics_reporter = MetricsReporter(self.scanner.metrics, path=self.METRICS_PATH)
+                self.metrics_reporter.start()
+            except OSError as e:
+                showerror(title="Error", message=f"Cannot log the metrics to '{self.METRICS_PATH}': {e.strerror}")
 
         # Check the progress (run self.process_queue() method) after 100ms passes
         self.master.after(100, self.process_queue)
 
-    # Method for checking the progress of the PortScanning thread (for checking completion)
+    # Method for checking the progress of the PortScanning thread (adds new results to the table as they arrive)
     def process_queue(self):
-        try:  # If the thread process has completed (when 'data' has been added to the queue)
-            msg = self.queue.get_nowait()  # Retrieving data from PortScanner thread queue
-            self.p1.data = msg  # Updating the 'data' variable
-            self.p1.update_table()  # Updating the result table
+        rows = []
+        done = False
+        metrics = self.scanner.metrics
+
+        # Results waiting in the queue (batches)  -  grows when the table can't keep up with the scan
+        metrics.record_queue_depth(self.queue.qsize())
+
+        # Drain (at most) MAX_ROWS_PER_TICK results  -  keeps each tick short so the GUI stays responsive
+        while len(rows) < self.MAX_ROWS_PER_TICK:
+            try:
+                msg = self.queue.get_nowait()  # Retrieving results from PortScanner thread queue
+            except queue.Empty:  # Nothing more for now...
+                break
+
+            if msg is SCAN_DONE:  # The thread process has completed
+                done = True
+                break
+            if isinstance(msg, ServiceBatch):  # Services found on open ports
+                self.p1.add_services(msg)
+                continue
+            rows.extend(msg)
+
+        # Add ONLY the new results to the table (& the file the results are being saved to)
+        if rows:
+            start = time.perf_counter()
+            self.p1.append_rows(rows)
+            metrics.record_gui_update(time.perf_counter() - start)
+            if self.export is not None:
+                self.export.write(rows)
+            if self.history is not None:
+                self.history.add(rows)
+            if self.diff is not None:
+                self.diff.check_all(rows)
+
+        if done and self.scanner.error is not None:
+            status = "Failed"
+        elif self.scanner.cancelled.is_set():
+            status = "Cancelled" if done else "Cancelling..."
+        else:
+            status = "Paused" if self.scanner.is_paused() and not done else None
+        self.p1.update_progress(len(self.p1.data), len(self.targets) * len(self.port_list), self.p1.data.open_count,
+                                done, self.scanner.rtt_stats if done else None, status,
+                                self.diff.summary() if self.diff is not None else None)
+
+        # Status bar (a few times a second at most  -  this tick can run every 1ms while results pour in)
+        if done or time.monotonic() - self.status_updated >= self.STATUS_BAR_INTERVAL:
+            self.p1.update_status_bar(metrics.snapshot())
+            self.status_updated = time.monotonic()
+
+        if done:
+            self.scanning = False
+
+            # Last metrics line
+            if self.metrics_reporter is not None:
+                self.metrics_reporter.stop()
+                self.metrics_reporter = None
+
             # RE-ENABLE SCAN BUTTON
             self.p1.scan_button["state"] = "normal"
-        except queue.Empty:  # Otherwise...
+
+            # The saved file is complete now
+            if self.export is not None:
+                self.export.close()
+                self.export = None
+
+            # So is the scan's history
+            if self.history is not None:
+                self.history.close(self.scanner.cancelled.is_set() or self.scanner.error is not None)
+                self.history = None
+
+            # Incremental scan  -  show what changed
+            if self.diff is not None and self.diff.changes:
+                self.show_changes()
+
+            # The scan stopped on an error  -  the results so far are kept
+            if self.scanner.error is not None:
+                showerror(title='Scan Failed', message=f"The scan stopped early: {self.scanner.error}")
+
+            # Host names that could not be resolved (their ports are listed as Unresolved)
+            unresolved = [host for host, state in self.scanner.dead_hosts.items() if state == UNRESOLVED]
+            if unresolved:
+                showerror(title='Invalid Target', message=f"Cannot resolve host(s): {', '.join(unresolved[:10])}"
+                                                          + (" ..." if len(unresolved) > 10 else ""))
+        elif len(rows) >= self.MAX_ROWS_PER_TICK:
+            # More results are (probably) waiting  -  check again as soon as Tk is idle
+            self.master.after(1, self.process_queue)
+        else:
             # Re-check (run the method again) after another 100ms
             self.master.after(100, self.process_queue)
-
-
-# PortScanner thread (runs separately from the main tkinter GUI thread)
-class ThreadedPortScanner(threading.Thread):
-    def __init__(self, q, args=(), kwargs=None):
-        threading.Thread.__init__(self, args=(), kwargs=None)
-
-        self.queue = q  # Set the queue
-
-        # Retrieve the given parameters (convert the Iterable to a list)
-        params = []
-        for x in args:
-            params.append(x)
-
-        self.target = params[0]  # Set the 1st parameter (target ip) as a variable
-        self.port_list = params[1]  # Set the 2nd parameter (port range) as a variable
-
-        # Initialize the 'data' list
-        self.data = []
-
-    # What happens during the thread process
-    def run(self):
-        print("\nSCANNING...")
-
-        # Start the port scan
-        self.scan()
-
-        # (after the port scan is done)
-        # Send the 'data' to the queue (which is caught in the Tkinter GUI thread, and retrieved there)
-        self.queue.put(self.data)
-
-    # Method to check if a port is open
-    def is_port_open(self, target, port):
-        # Define socket with exceptions
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-            sock.settimeout(3)  # Set timeout to 3 seconds max
-
-            try:  # Is the socket able to be connected?  (port open)
-                sock.connect((target, port))
-                return True  # port is open
-            except:  # If an exception is caught  (port closed)
-                return False  # port is not open
-
-    def scan(self):
-        # Create Thread Pool (as 'executor')
-        with ThreadPoolExecutor(len(self.port_list)) as executor:
-            # Call map() to run and execute the is_port_open() method over all ports in the 'port_list'
-            result = executor.map(self.is_port_open, [self.target]*len(self.port_list), self.port_list)
-
-            # Iterate the results + port numbers
-            for port, is_open in zip(self.port_list, result):
-                # ADD PORT ENTRY to 'data' variable
-                self.data.append((
-                    self.target, port, is_open, self.get_port_name(port), self.get_port_description(port)
-                ))
-
-                # If the port is open, output to console
-                if is_open:
-                    print(f'Port {port} is open!')
-
-    def get_port_name(self, port):
-        f = open(os.path.join(resource_dir, "ports.json"))
-        ports_info = json.load(f)
-
-        #Create a check to catch keyerror if higher than avalible
-
-        try:
-            port_name = ports_info["data"][str(port)][0]
-        except KeyError:
-            port_name = "N/A"
-
-       
-
-        if port_name == "NA":
-            port_name = "N/A"
-
-        f.close()
-
-        return port_name
-        # return f'Port {port} NAME'  # placeholder
-
-    def get_port_description(self, port):
-        f = open(os.path.join(resource_dir, "ports.json"))
-        ports_info = json.load(f)
-
-        try:
-            port_description = ports_info["data"][str(port)][1]
-        except KeyError:
-            port_description = "N/A"
-
-        if port_description == "NA":
-            port_description = "N/A"
-
-        f.close()
-
-        return port_description
-        # return f'Port {port} DESCRIPTION'  # placeholder
-
@@ -0,0 +1,259 @@
+__all__ = ['Histogram', 'ScanMetrics', 'MetricsReporter']
+
+# Scan metrics  -  cheap counters & histograms updated on the hot path (every connect), read by the GUI / CLI
+#
+#     connects in flight (& the peak), completed connects by state, connect latency,
+#     depth of the result queue between the scanner & its consumer, time spent updating the GUI table
+#
+# snapshot() gives a plain dict (JSON-ready); MetricsReporter calls a callback / appends a JSON line with it
+# every few seconds
+#
+# The hot path takes NO lock: each connect only appends to a deque (atomic); the deques are folded into the
+# counters & histograms in bulk (by whichever thread finds them long, or by snapshot())
+# The in-flight gauge (& its peak) is the exception  -  kept up to date by every start / finish, from two
+# itertools counters (next() is atomic)
+
+# Import Libs
+import json
+import time
+import threading
+from array import array
+from itertools import count
+from collections import deque
+
+from src.results import STATES
+
+# Number of histogram buckets  -  4 per power of 2 microseconds (so within ~19%), up to ~70 minutes
+BUCKETS = 128
+
+# Number of finished connects waiting to be counted before they are folded into the metrics
+DRAIN_SIZE = 1024
+
+
+# Function to get the histogram bucket of a value in microseconds (no search  -  from its bit length)
+def bucket_of(us):
+    if us < 4:
+        return us
+    bits = us.bit_length()
+    return min(BUCKETS - 1, 4 * (bits - 2) + (us >> (bits - 3)) - 4)
+
+
+# Function to get the lower bound (microseconds) of a histogram bucket
+def bucket_floor(index):
+    if index < 4:
+        return index
+    return (index % 4 + 4) << (index // 4 - 1)
+
+
+# Histogram of durations (seconds)  -  fixed log-scale buckets, constant memory & time per value
+# (NOT locked  -  the caller holds a lock if several threads add to it)
+class Histogram:
+    def __init__(self):
+        self.counts = array('Q', bytes(8 * BUCKETS))
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    # Method to add a duration (seconds)
+    def add(self, seconds):
+        self.counts[bucket_of(int(seconds * 1000000))] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    # Method to add all the values of another histogram (or of an exported one  -  see export())
+    def merge(self, other):
+        counts = other['counts'] if isinstance(other, dict) else other.counts
+        for index, count in enumerate(counts):
+            self.counts[index] += count
+        self.count += other['count'] if isinstance(other, dict) else other.count
+        self.total += other['total'] if isinstance(other, dict) else other.total
+        self.max = max(self.max, other['max'] if isinstance(other, dict) else other.max)
+
+    # Method to get a percentile (seconds)  -  the middle of the bucket it falls in (None if empty)
+    def percentile(self, p):
+        if not self.count:
+            return None
+        rank = max(1, -(-self.count * p // 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                middle = (bucket_floor(index) + bucket_floor(index + 1)) / 2
+                return min(middle / 1000000, self.max)
+        return self.max
+
+    # Summary in milliseconds  -  {'count', 'mean_ms', 'p50_ms', 'p90_ms', 'p99_ms', 'max_ms'}
+    def stats(self):
+        stats = {'count': self.count,
+                 'mean_ms': round(self.total / self.count * 1000, 3) if self.count else None,
+                 'max_ms': round(self.max * 1000, 3) if self.count else None}
+        for p in (50, 90, 99):
+            value = self.percentile(p)
+            stats[f'p{p}_ms'] = round(value * 1000, 3) if value is not None else None
+        return stats
+
+    # Raw values (picklable / JSON)  -  e.g. to send to another process
+    def export(self):
+        return {'counts': list(self.counts), 'count': self.count, 'total': self.total, 'max': self.max}
+
+
+# Metrics of one scan  -  updated by the scan engine (connects) & the result consumer (queue depth, GUI updates)
+class ScanMetrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+
+        # Connects  -  finished ones not counted yet (see drain())
+        self.finished = deque()  # (state, seconds)
+        self.cancelled_count = 0
+
+        # Connects started / finished so far (any result or cancelled) & the peak number in flight
+        # (with several scanning threads, a count stored late can be a few behind for a moment)
+        self.start_ids = count(1)
+        self.finish_ids = count(1)
+        self.started_count = 0
+        self.finished_count = 0
+        self.peak_in_flight = 0
+        self.completed = [0] * len(STATES)  # Indexed by state
+        self.latency = Histogram()
+
+        # Result queue (between the scanner & whatever shows / saves the results)
+        self.queue_depth = 0
+        self.peak_queue_depth = 0
+
+        # Time spent updating the GUI table (per update)
+        self.gui_updates = Histogram()
+
+        # Metrics exported by other processes (sharded scans)  -  {key: export()}, added into the snapshot
+        self.children = {}
+
+    # Method called when a connect starts
+    def connect_started(self):
+        self.started_count = started = next(self.start_ids)
+        # (the only moment the number in flight goes up  -  so the only place to check the peak)
+        in_flight = started - self.finished_count
+        if in_flight > self.peak_in_flight:
+            self.peak_in_flight = in_flight
+
+    # Method called when a connect is done (any result)  -  'seconds' is how long it took
+    def connect_done(self, state, seconds):
+        self.finished_count = next(self.finish_ids)
+        self.finished.append((state, seconds))
+        # Fold them in every DRAIN_SIZE connects (skipped if another thread is at it  -  never waits)
+        if len(self.finished) >= DRAIN_SIZE and self.lock.acquire(blocking=False):
+            try:
+                self.drain()
+            finally:
+                self.lock.release()
+
+    # Method called when a connect is given up without a result (cancelled)
+    def connect_cancelled(self):
+        self.finished_count = next(self.finish_ids)
+        self.finished.append((None, 0.0))
+
+    # Method to fold the finished connects into the counters & histogram (with the lock held)
+    def drain(self):
+        finished = self.finished
+        for _ in range(len(finished)):
+            state, seconds = finished.popleft()
+            if state is None:
+                self.cancelled_count += 1
+            else:
+                self.completed[state] += 1
+                self.latency.add(seconds)
+
+    # Connects in flight right now
+    @property
+    def in_flight(self):
+        return max(0, self.started_count - self.finished_count)
+
+    # Method to record the depth of the result queue (called by the consumer as it takes results)
+    def record_queue_depth(self, depth):
+        self.queue_depth = depth
+        if depth > self.peak_queue_depth:
+            self.peak_queue_depth = depth
+
+    # Method to record the time one GUI table update took (seconds)
+    def record_gui_update(self, seconds):
+        with self.lock:
+            self.gui_updates.add(seconds)
+
+    # Method to add (or replace) the metrics of another process
+    def set_child(self, key, exported):
+        with self.lock:
+            self.children[key] = exported
+
+    # Raw connect metrics (picklable)  -  what a shard process sends to the parent
+    def export(self):
+        with self.lock:
+            self.drain()
+            return {'in_flight': self.in_flight, 'peak_in_flight': self.peak_in_flight,
+                    'completed': list(self.completed), 'latency': self.latency.export()}
+
+    # All the metrics right now (a JSON-ready dict)
+    def snapshot(self):
+        with self.lock:
+            self.drain()
+            elapsed = time.monotonic() - self.started
+            in_flight, peak_in_flight = self.in_flight, self.peak_in_flight
+            completed = list(self.completed)
+            latency = Histogram()
+            latency.merge(self.latency)
+            gui_updates = self.gui_updates.stats()
+
+            # Add in the other processes' connects
+            for child in self.children.values():
+                in_flight += child['in_flight']
+                peak_in_flight += child['peak_in_flight']  # (peaks of different processes  -  an upper bound)
+                completed = [a + b for a, b in zip(completed, child['completed'])]
+                latency.merge(child['latency'])
+
+        connects = sum(completed)
+        return {
+            'time': time.time(),
+            'elapsed_s': round(elapsed, 3),
+            'in_flight': in_flight,
+            'peak_in_flight': peak_in_flight,
+            'connects': connects,
+            'connects_per_s': round(connects / elapsed, 1) if elapsed > 0 else 0.0,
+            'completed': {STATES[state]: count for state, count in enumerate(completed) if count},
+            'latency': latency.stats(),
+            'queue_depth': self.queue_depth,
+            'peak_queue_depth': self.peak_queue_depth,
+            'gui_updates': gui_updates,
+        }
+
+
+# Thread reporting the metrics of a scan every 'interval' seconds (until stop())  -  calls 'callback(snapshot)'
+# and / or appends the snapshot as a JSON line to the file at 'path'; a last report is made when it stops
+class MetricsReporter(threading.Thread):
+    def __init__(self, metrics, interval=1.0, callback=None, path=None):
+        threading.Thread.__init__(self, daemon=True)
+        self.metrics = metrics
+        self.interval = interval
+        self.callback = callback
+        self.file = open(path, "a", encoding="utf-8") if path else None
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.report()
+        self.report()
+        if self.file is not None:
+            self.file.close()
+
+    # Method to report the metrics once
+    def report(self):
+        snapshot = self.metrics.snapshot()
+        if self.callback is not None:
+            self.callback(snapshot)
+        if self.file is not None:
+            self.file.write(json.dumps(snapshot) + "\n")
+            self.file.flush()
+
+    # Method to stop reporting (after one last report)
+    def stop(self):
+        self.stopped.set()
+        self.join()
@@ -0,0 +1,122 @@
+__all__ = ['PortCatalog', 'get_catalog', 'preload_catalog', 'get_port_name', 'get_port_description', 'MAX_PORT',
+           'UNKNOWN']
+
+# Shared, in-memory port metadata catalog
+# 'ports.json' is parsed ONCE (the first time any lookup is made) and every scanner/page shares the same catalog
+
+# Import Libs
+import os
+import json
+import threading
+from array import array
+
+from src import resource_dir
+
+# Highest valid TCP/UDP port number
+MAX_PORT = 65535
+
+# Value shown when a port has no (known) name/description
+UNKNOWN = "N/A"
+
+
+# Port metadata catalog  -  integer-keyed lookup table covering ports 0-65535
+class PortCatalog:
+    def __init__(self, path=None):
+        # Location of the port metadata file (defaults to the bundled 'ports.json')
+        self.path = path if path is not None else os.path.join(resource_dir, "ports.json")
+
+        # Table of UNIQUE (name, description) pairs  -  entry 0 is always the "unknown" entry
+        self.entries = [(UNKNOWN, UNKNOWN)]
+
+        # Compact index: one unsigned short per port number pointing into 'entries' (0 = unknown)
+        self.index = array('H', bytes(2 * (MAX_PORT + 1)))
+
+        # Ports ordered by how often they are found open (most often first)  -  from the 'frequency' list
+        self.ranked = array('H')
+
+        self.load()
+
+    # Method to parse the port metadata file & build the lookup table
+    def load(self):
+        with open(self.path) as f:
+            ports_info = json.load(f)
+
+        # Re-use the same entry for identical (name, description) pairs
+        seen = {(UNKNOWN, UNKNOWN): 0}
+
+        for key, value in ports_info["data"].items():
+            port = int(key)
+            # Skip anything that is not a real port number
+            if not 0 <= port <= MAX_PORT:
+                continue
+
+            # Normalise "NA" -> "N/A" here (once) instead of on every lookup
+            name = value[0] if value[0] != "NA" else UNKNOWN
+            description = value[1] if value[1] != "NA" else UNKNOWN
+
+            entry = (name, description)
+            if entry not in seen:
+                seen[entry] = len(self.entries)
+                self.entries.append(entry)
+
+            self.index[port] = seen[entry]
+
+        # Port frequency ranking (optional)  -  skip invalid & repeated ports
+        ranked = set()
+        for port in ports_info.get("frequency", ()):
+            if isinstance(port, int) and 0 <= port <= MAX_PORT and port not in ranked:
+                ranked.add(port)
+                self.ranked.append(port)
+
+    # Method to look up the (name, description) pair for a port
+    def lookup(self, port):
+        if 0 <= port <= MAX_PORT:
+            return self.entries[self.index[port]]
+        return self.entries[0]  # Port outside of 0-65535
+
+    # Method to look up the name of a port
+    def name(self, port):
+        return self.lookup(port)[0]
+
+    # Method to look up the description of a port
+    def description(self, port):
+        return self.lookup(port)[1]
+
+    # Method to check if the catalog has (any) info for a port
+    def __contains__(self, port):
+        return self.lookup(port) is not self.entries[0]
+
+
+# Shared catalog instance (built lazily by get_catalog())
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+# Function to get the shared catalog  -  loads 'ports.json' on the first call only
+def get_catalog():
+    global _catalog
+
+    if _catalog is None:
+        # Lock so that scanner threads starting at the same time don't each parse the file
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = PortCatalog()
+
+    return _catalog
+
+
+# Function to start loading the shared catalog in a background thread  -  returns right away, so the catalog can
+# be ready by the time it's needed without holding up the caller (e.g. the GUI window showing up)
+def preload_catalog():
+    if _catalog is None:
+        threading.Thread(target=get_catalog, name="catalog", daemon=True).start()
+
+
+# Function to get the name of a port (from the shared catalog)
+def get_port_name(port):
+    return get_catalog().name(port)
+
+
+# Function to get the description of a port (from the shared catalog)
+def get_port_description(port):
+    return get_catalog().description(port)
@@ -0,0 +1,188 @@
+__all__ = ['PortSet', 'PortsExcept', 'parse_ports', 'format_port_range']
+
+# Port specs  -  any comma-separated mix of:
+#     "80"               a single port
+#     "1-1024"           a range of ports
+#     "top 100"          the 100 ports most often found open (from the port catalog's frequency ranking  -  N can't
+#                        be more than the number of ports it ranks)
+#     "all"              every port (1-65535)
+# e.g. "top 100, 8000-8100, 9200"
+#
+# Ports are scanned most-often-open first (so the most valuable results show up first), then the rest in the
+# order they were given. Each port is only scanned once, however many items it is in
+
+# Import Libs
+import re
+from array import array
+
+from src.port_catalog import MAX_PORT, get_catalog
+
+# "top N" preset
+TOP_PATTERN = re.compile(r"top\s*-?\s*(\d+)$", re.IGNORECASE)
+
+
+# Set of ports parsed from a spec  -  kept as a few disjoint runs (ranges, or arrays of single ports) in scan
+# order instead of a list of every port
+class PortSet:
+    def __init__(self, spec, by_frequency=True):
+        self.spec = spec
+
+        # Which ports are in the set  -  one bit per port
+        self.bitmap = bytearray((MAX_PORT + 1 + 7) // 8)
+        # Ports in scan order: ranges & arrays of ports (no port is in more than one part)
+        self.parts = []
+        self.count = 0
+
+        items = [item.strip() for item in spec.split(",") if item.strip()]
+        if not items:
+            raise ValueError("No ports given")
+
+        # Parse every item first (so an invalid spec fails before anything is built)
+        parsed = [self.parse_item(item) for item in items]
+
+        # Most-often-open ports first (the ranked ports of the set, in rank order)
+        if by_frequency:
+            wanted = bytearray(len(self.bitmap))
+            for ports in parsed:
+                self.mark(wanted, ports)
+            self.add(array('H', (port for port in get_catalog().ranked if wanted[port >> 3] & (1 << (port & 7)))))
+
+        # Then the rest, in the order given
+        for ports in parsed:
+            self.add(ports)
+
+    # Method to parse one comma-separated item  -  returns a range or an array of ports
+    @staticmethod
+    def parse_item(item):
+        if item.lower() == "all":
+            return range(1, MAX_PORT + 1)
+
+        match = TOP_PATTERN.match(item)
+        if match:
+            return top_ports(int(match.group(1)))
+
+        # Split range into start and end of range (a single port is a range of 1)
+        parts = item.split("-")
+        if len(parts) > 2:
+            raise ValueError(f"Invalid port range: '{item}'")
+
+        try:
+            start = int(parts[0])
+            end = int(parts[-1])
+        except ValueError:
+            raise ValueError(f"Invalid port range: '{item}'") from None
+
+        if not 0 <= start <= end <= MAX_PORT:
+            raise ValueError(f"Port range must be within 0-{MAX_PORT} (start <= end): '{item}'")
+
+        return range(start, end + 1)
+
+    # Function to set the bits of 'ports' in a bitmap
+    @staticmethod
+    def mark(bitmap, ports):
+        for port in ports:
+            bitmap[port >> 3] |= 1 << (port & 7)
+
+    # Method to add the ports of 'ports' that are not in the set yet (as runs, in the same order)
+    def add(self, ports):
+        bitmap = self.bitmap
+        if isinstance(ports, range):
+            # Split the range around the ports already in the set
+            start = None
+            for port in ports:
+                if bitmap[port >> 3] & (1 << (port & 7)):
+                    if start is not None:
+                        self.add_part(range(start, port))
+                        start = None
+                elif start is None:
+                    start = port
+            if start is not None:
+                self.add_part(range(start, ports[-1] + 1))
+        else:
+            new = array('H', (port for port in ports if not bitmap[port >> 3] & (1 << (port & 7))))
+            self.mark(bitmap, new)
+            if new:
+                self.parts.append(new)
+                self.count += len(new)
+
+    # Method to add a run of ports  -  joined onto the previous run when it carries straight on from it
+    def add_part(self, ports):
+        self.mark(self.bitmap, ports)
+        last = self.parts[-1] if self.parts else None
+        if isinstance(last, range) and last.stop == ports.start:
+            self.parts[-1] = range(last.start, ports.stop)
+        else:
+            self.parts.append(ports)
+        self.count += len(ports)
+
+    # Iterate the ports in scan order
+    def __iter__(self):
+        for part in self.parts:
+            yield from part
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, port):
+        return 0 <= port <= MAX_PORT and bool(self.bitmap[port >> 3] & (1 << (port & 7)))
+
+    def __str__(self):
+        return self.spec
+
+
+# Ports of a port set except a few of them (e.g. the ones already scanned first)  -  filtered as they are iterated,
+# so nothing is copied  ('excluded' must be a set of ports that are all in 'ports')
+class PortsExcept:
+    def __init__(self, ports, excluded):
+        self.ports = ports
+        self.excluded = excluded
+        self.count = len(ports) - len(excluded)
+
+    # Iterate the ports in scan order
+    def __iter__(self):
+        excluded = self.excluded
+        return (port for port in self.ports if port not in excluded)
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, port):
+        return port not in self.excluded and port in self.ports
+
+
+# Function to get the 'n' ports most often found open  -  the first 'n' of the catalog's ranked ports
+# (only as many as it ranks: past them, there is no telling which ports are open most often)
+def top_ports(n):
+    ranked = get_catalog().ranked
+    if not 0 < n <= len(ranked):
+        raise ValueError(f"Invalid number of top ports (1-{len(ranked)}, the ports ranked): 'top {n}'")
+    return ranked[:n]
+
+
+# Function to parse a port spec  -  raises ValueError for an invalid spec
+# ('by_frequency' = scan the most-often-open ports first; False = exactly the order given)
+def parse_ports(spec, by_frequency=True):
+    if isinstance(spec, PortSet):
+        return spec
+    return PortSet(spec, by_frequency)
+
+
+# Function to turn a set (or list) of ports back into a spec  ("1-1024", "22,80-81")  -  raises ValueError if empty
+def format_port_range(ports):
+    if isinstance(ports, PortSet):
+        return str(ports)
+    if not len(ports):
+        raise ValueError("No ports given")
+
+    # Runs of consecutive ports, in the order given
+    items = []
+    start = end = None
+    for port in ports:
+        if end is not None and port == end + 1:
+            end = port
+            continue
+        if start is not None:
+            items.append(f"{start}-{end}" if end > start else str(start))
+        start = end = port
+    items.append(f"{start}-{end}" if end > start else str(start))
+    return ",".join(items)
@@ -0,0 +1,165 @@
+__all__ = ['TokenBucket', 'RateLimiter']
+
+# Scan pacing  -  token buckets limiting how many connects per second are started (across all hosts & per host),
+# slowed down automatically when timeouts / errors spike (firewalls rate limiting / SYN-flood protection kicking in)
+
+# Import Libs
+import time
+import threading
+
+from src.results import FILTERED, ERROR
+
+
+# Token bucket  -  'rate' tokens per second, up to 'burst' tokens saved up
+# Tokens are RESERVED ahead of time (each caller is told when its connect may start) instead of polled for,
+# so waiting callers never spin & the rate holds however late they wake up
+class TokenBucket:
+    def __init__(self, rate, burst=1):
+        self.rate = rate  # Tokens per second
+        self.burst = max(1, burst)  # Max tokens used back-to-back (after the bucket has been idle)
+
+        # Time the bucket would be empty again if every token so far had been used on schedule
+        self.tat = 0.0
+
+    # Method to reserve a token  -  returns the time (time.monotonic()) it can be used at, never before 'now'
+    def reserve(self, now):
+        interval = 1 / self.rate
+        start = max(now, self.tat - (self.burst - 1) * interval)
+        self.tat = max(self.tat, start) + interval
+        return start
+
+
+# Global & per-host connect rate limits, with automatic backoff (shared by all the workers of a scan)
+class RateLimiter:
+    # Number of results per window the timeout / error rate is measured over
+    WINDOW = 100
+    # Timeout / error rate (of a window) that counts as a spike  -  if it is also 2x the usual rate
+    SPIKE = 0.25
+    # Lowest connect rate (per second) backoff goes down to
+    MIN_RATE = 1.0
+    # Rate is divided by this on a spike & multiplied by RECOVERY per clean window
+    BACKOFF = 2.0
+    RECOVERY = 1.25
+
+    def __init__(self, rate=None, per_host_rate=None, backoff=True):
+        self.rate = rate  # Max connects per second across ALL hosts (None = no limit)
+        self.per_host_rate = per_host_rate  # Max connects per second to any ONE host (None = no limit)
+        self.backoff = backoff  # Slow down when timeouts / errors spike?
+
+        self.bucket = TokenBucket(rate) if rate else None  # Global bucket (None = no global limit right now)
+        self.host_buckets = {}  # host -> TokenBucket
+
+        # Backoff state
+        self.scale = 1.0  # Per-host rates are multiplied by this (< 1 after a backoff)
+        self.ceiling = rate  # Rate recovered up to  -  the set rate, or the rate the scan had before backing off
+        self.backoffs = 0  # Number of times the scan was slowed down
+
+        # Timeout / error rate of the current window & the usual rate (moving average of the past windows)
+        self.window_total = 0
+        self.window_bad = 0
+        self.window_start = time.monotonic()
+        self.usual_bad = None
+
+        self.lock = threading.Lock()
+
+    # Method to change the global rate limit (None = no limit)  -  e.g. for a slower part of the scan
+    def set_rate(self, rate):
+        with self.lock:
+            self.rate = self.ceiling = rate
+            if not rate:
+                self.bucket = None
+            elif self.bucket is None:
+                self.bucket = TokenBucket(rate)
+            else:
+                self.bucket.rate = rate
+
+    # Method to reserve a connect to a host  -  returns the number of seconds to wait before starting it
+    def reserve(self, host):
+        # Nothing to pace (the usual case)  -  skip the lock
+        if self.bucket is None and not self.per_host_rate:
+            return 0
+
+        now = time.monotonic()
+        with self.lock:
+            start = now
+
+            if self.per_host_rate:
+                bucket = self.host_buckets.get(host)
+                if bucket is None:
+                    if len(self.host_buckets) >= 4096:
+                        self.prune(now)
+                    bucket = self.host_buckets[host] = TokenBucket(self.per_host_rate)
+                bucket.rate = self.per_host_rate * self.scale
+                start = bucket.reserve(start)
+
+            if self.bucket is not None:
+                start = self.bucket.reserve(start)
+                # The global limit may have pushed the connect back  -  keep the host's next one a full interval later
+                if self.per_host_rate:
+                    bucket.tat = max(bucket.tat, start + 1 / bucket.rate)
+
+        return start - now
+
+    # Method to drop the buckets of hosts that have been idle long enough to be full again (keeps memory flat)
+    def prune(self, now):
+        for host in [host for host, bucket in self.host_buckets.items() if bucket.tat <= now]:
+            del self.host_buckets[host]
+
+    # Method to report the state a connect ended in (drives the automatic backoff)
+    def report(self, state):
+        if not self.backoff:
+            return
+
+        with self.lock:
+            self.window_total += 1
+            if state == FILTERED or state == ERROR:
+                self.window_bad += 1
+            if self.window_total >= self.WINDOW:
+                self.end_window(time.monotonic())
+
+    # Method to slow down / speed back up at the end of each window
+    def end_window(self, now):
+        bad = self.window_bad / self.window_total
+        observed = self.window_total / max(now - self.window_start, 1e-6)  # Connects per second (this window)
+
+        if self.usual_bad is not None and bad > self.SPIKE and bad > 2 * self.usual_bad:
+            self.slow_down(observed)
+        elif self.scale < 1 or (self.bucket is not None and self.bucket.rate < self.ceiling):
+            self.speed_up()
+
+        # Targets that always time out (e.g. firewalled hosts) raise the usual rate, so they only cause a
+        # backoff while the rate is still climbing
+        self.usual_bad = bad if self.usual_bad is None else self.usual_bad + (bad - self.usual_bad) / 8
+
+        self.window_total = self.window_bad = 0
+        self.window_start = now
+
+    # Method to back off  -  halves the global & per-host rates
+    def slow_down(self, observed):
+        self.backoffs += 1
+        self.scale = max(self.scale / self.BACKOFF, 1 / 64)
+
+        if self.bucket is None:
+            # No global limit yet  -  start from the rate the scan was going at
+            self.ceiling = observed
+            self.bucket = TokenBucket(observed)
+        self.bucket.rate = max(self.MIN_RATE, min(self.bucket.rate, observed) / self.BACKOFF)
+
+    # Method to recover from a backoff  -  back to the set rate (or no global limit) once it gets there
+    def speed_up(self):
+        self.scale = min(1.0, self.scale * self.RECOVERY)
+
+        if self.bucket is not None:
+            self.bucket.rate *= self.RECOVERY
+            if self.bucket.rate >= self.ceiling:
+                if self.rate:
+                    self.bucket.rate = self.rate
+                else:
+                    self.bucket = None
+
+    # Current limits & number of backoffs (for reporting)
+    def stats(self):
+        with self.lock:
+            return {'rate': self.bucket.rate if self.bucket is not None else None,
+                    'per_host_rate': self.per_host_rate * self.scale if self.per_host_rate else None,
+                    'backoffs': self.backoffs}
@@ -0,0 +1,108 @@
+__all__ = ['Resolver', 'get_resolver']
+
+# Host name resolver with a small, TTL-bounded cache  -  shared by every scan (& every target in a scan)
+# so a host name is looked up ONCE, not once per port
+
+# Import Libs
+import time
+import socket
+import threading
+from collections import OrderedDict
+
+
+class Resolver:
+    def __init__(self, ttl=300, negative_ttl=30, max_size=1024):
+        self.ttl = ttl  # Seconds a resolved address is cached for
+        self.negative_ttl = negative_ttl  # Seconds a failed lookup is cached for
+        self.max_size = max_size  # Max number of cached host names (oldest are dropped first)
+
+        # host -> (address OR socket.gaierror, expiry time)
+        self.cache = OrderedDict()
+        # host -> Event set when the lookup in progress for it is done (so each host is only looked up once)
+        self.pending = {}
+
+        self.lock = threading.Lock()
+
+    # Method to resolve a host to an IPv4 address  -  raises socket.gaierror if it can't be resolved
+    def resolve(self, host):
+        # IPv4 address already  -  nothing to look up
+        try:
+            socket.inet_aton(host)
+            return host
+        except OSError:
+            pass
+
+        while True:
+            with self.lock:
+                entry = self.cache.get(host)
+                if entry is not None and entry[1] > time.monotonic():
+                    result = entry[0]
+                    break
+
+                # Somebody else is already looking it up  -  wait for them
+                event = self.pending.get(host)
+                if event is None:
+                    event = self.pending[host] = threading.Event()
+                    lookup = True
+                else:
+                    lookup = False
+
+            if not lookup:
+                event.wait()
+                continue
+
+            # Look the host up (outside the lock, this can be slow)
+            # (whatever happens, the lookup is taken off 'pending' & the hosts waiting on it are woken up)
+            result = None
+            try:
+                try:
+                    result = socket.getaddrinfo(host, None, socket.AF_INET, socket.SOCK_STREAM)[0][4][0]
+                    ttl = self.ttl
+                except socket.gaierror as e:
+                    result = e
+                    ttl = self.negative_ttl
+                except (UnicodeError, ValueError) as e:  # Not a valid host name at all (empty / too long label)
+                    result = socket.gaierror(socket.EAI_NONAME, f"invalid host name '{host}': {e}")
+                    ttl = self.negative_ttl
+            finally:
+                with self.lock:
+                    if result is not None:
+                        self.cache[host] = (result, time.monotonic() + ttl)
+                        self.cache.move_to_end(host)
+                        while len(self.cache) > self.max_size:
+                            self.cache.popitem(last=False)
+                    del self.pending[host]
+                event.set()
+            break
+
+        if isinstance(result, socket.gaierror):
+            raise result
+        return result
+
+    # Method to get a host's address ONLY if it is already known (no lookup)  -  None otherwise
+    def cached(self, host):
+        try:
+            socket.inet_aton(host)
+            return host
+        except OSError:
+            pass
+
+        with self.lock:
+            entry = self.cache.get(host)
+            if entry is not None and entry[1] > time.monotonic() and not isinstance(entry[0], socket.gaierror):
+                return entry[0]
+        return None
+
+    # Method to empty the cache
+    def clear(self):
+        with self.lock:
+            self.cache.clear()
+
+
+# Shared resolver instance
+_resolver = Resolver()
+
+
+# Function to get the shared resolver
+def get_resolver():
+    return _resolver
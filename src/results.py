@@ -0,0 +1,227 @@
+__all__ = ['ResultBatcher', 'ResultStore', 'ServiceBatch', 'SCAN_DONE', 'COLUMNS', 'status_text',
+           'CLOSED', 'OPEN', 'FILTERED', 'UNREACHABLE', 'UNRESOLVED', 'ERROR', 'OPEN_FILTERED', 'STATES',
+           'TCP', 'UDP', 'PROTOCOLS']
+
+# Helpers for streaming scan results to the GUI (or any other consumer of the scanner queue)
+#
+# Queue contract (what the scanners put on their queue):
+#     [ (ip, port, state, name, description, protocol), ... ]
+#                                                        -  a batch of NEW results (in the order they resolved)
+#     ServiceBatch([ (ip, port, service, detail), ... ]) -  services identified on open ports (banner grabbing
+#                                                          only  -  sent some time after the port's result)
+#     SCAN_DONE                                          -  the scan has finished (nothing more will be sent)
+
+# Import Libs
+import time
+import threading
+from array import array
+
+from src.port_catalog import get_catalog
+
+# Sent on the queue once a scan has finished
+SCAN_DONE = None
+
+# Result tuple columns (in order)  -  same ids as the GUI results table
+COLUMNS = ('ip', 'port_num', 'port_status', 'port_name', 'description', 'protocol')
+
+# Protocols (the 'protocol' in a result tuple)
+TCP = "tcp"
+UDP = "udp"
+PROTOCOLS = (TCP, UDP)
+
+
+# Port states (the 'state' in a result tuple)
+CLOSED = 0  # The host refused the connection
+OPEN = 1  # The connection was accepted
+FILTERED = 2  # No answer before the timeout (dropped by a firewall?)
+UNREACHABLE = 3  # The host / network is unreachable
+UNRESOLVED = 4  # The host name could not be resolved
+ERROR = 5  # Any other error
+OPEN_FILTERED = 6  # UDP: no answer  -  open (the service ignored the probe) OR dropped by a firewall
+
+# Text shown for each port state (indexed by state)
+STATES = ('Closed', 'Open', 'Filtered', 'Unreachable', 'Unresolved', 'Error', 'Open|Filtered')
+
+
+# Function to get the text shown for a port's state
+def status_text(state):
+    return STATES[state]
+
+
+# Batch of (ip, port, service, detail) banner grabbing results  -  tells them apart from port results on the queue
+# (service is None when the service wasn't recognised; detail is then the start of its banner, if any)
+class ServiceBatch(list):
+    pass
+
+
+# Collects results into small batches & puts them on the queue
+# One batcher per producer (worker thread / event loop), so no locking is needed
+class ResultBatcher:
+    def __init__(self, q, size=64, interval=0.1, checkpoint=None, store=None):
+        self.queue = q  # Set the queue
+        self.checkpoint = checkpoint  # Checkpoint each batch is also recorded to (None = no checkpoint)
+        self.store = store  # ResultStore each batch is also added to (None = only the queue)
+        self.size = size  # Max number of results per batch
+        self.interval = interval  # Max number of seconds a result waits in the batch
+
+        self.batch = []
+        self.last_flush = time.monotonic()
+
+    # Method to add a result  -  'urgent' results (e.g. open ports) are sent straight away
+    def add(self, result, urgent=False):
+        self.batch.append(result)
+
+        if urgent or len(self.batch) >= self.size or time.monotonic() - self.last_flush >= self.interval:
+            self.flush()
+
+    # Method to send the current batch to the queue
+    def flush(self):
+        if self.batch:
+            if self.checkpoint is not None:
+                self.checkpoint.record(self.batch)
+            if self.store is not None:
+                self.store.extend(self.batch)
+            self.queue.put(self.batch)
+            self.batch = []
+        self.last_flush = time.monotonic()
+
+
+# In-memory store of scan results  -  column arrays instead of a list of tuples (8 bytes per result):
+#     hosts          -  each target host string stored ONCE; rows point at it by number
+#     host / port / state / protocol columns  -  typed arrays (unsigned int / unsigned short / unsigned char x 2)
+# Port names & descriptions are NOT stored  -  they are read from the shared port catalog (by port number)
+# whenever a row is read. Rows are only ever appended; views over them are arrays of row numbers
+class ResultStore:
+    def __init__(self):
+        self.hosts = []  # Unique target hosts (in the order they were first seen)
+        self.host_ids = {}  # host -> its number in 'hosts'
+
+        self.host_column = array('I')  # Row -> host number
+        self.port_column = array('H')  # Row -> port number
+        self.state_column = array('B')  # Row -> port state
+        self.protocol_column = array('B')  # Row -> protocol (index in PROTOCOLS)
+
+        self.open_count = 0  # Number of open ports stored
+
+        # Services identified on open ports (banner grabbing)  -  (ip, port) -> (service, detail)
+        self.services = {}
+
+        # Scan worker threads add their batches at the same time  -  keep the columns lined up
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.port_column)
+
+    # Iterate the rows as (ip, port, state, name, description, protocol) tuples  -  built one at a time
+    def __iter__(self):
+        for i in range(len(self.port_column)):
+            yield self[i]
+
+    # Get a row as an (ip, port, state, name, description, protocol) tuple
+    def __getitem__(self, index):
+        port = self.port_column[index]
+        return ((self.hosts[self.host_column[index]], port, self.state_column[index]) + get_catalog().lookup(port)
+                + (PROTOCOLS[self.protocol_column[index]],))
+
+    # Method to remove all results
+    def clear(self):
+        with self.lock:
+            self.hosts = []
+            self.host_ids = {}
+            self.host_column = array('I')
+            self.port_column = array('H')
+            self.state_column = array('B')
+            self.protocol_column = array('B')
+            self.open_count = 0
+            self.services = {}
+
+    # Method to add a single result
+    def append(self, row):
+        self.extend((row,))
+
+    # Method to add new (ip, port, state, name, description, protocol) results  -  returns the range of row numbers
+    # they were stored at
+    def extend(self, rows):
+        with self.lock:
+            start = len(self.port_column)
+            host_ids = self.host_ids
+            for row in rows:
+                host_id = host_ids.get(row[0])
+                if host_id is None:
+                    host_id = host_ids[row[0]] = len(self.hosts)
+                    self.hosts.append(row[0])
+                self.host_column.append(host_id)
+                self.port_column.append(row[1])
+                self.state_column.append(row[2])
+                self.protocol_column.append(PROTOCOLS.index(row[5]))
+                if row[2] == OPEN:
+                    self.open_count += 1
+            return range(start, len(self.port_column))
+
+    # Method to store the service identified on an open port
+    def set_service(self, ip, port, service, detail):
+        self.services[ip, port] = (service, detail)
+
+    # Method to get the service identified on a row's port  -  (service, detail), or None if there is none (yet)
+    def service(self, index):
+        return self.services.get((self.hosts[self.host_column[index]], self.port_column[index]))
+
+    # Method to get the row numbers in 'indices' (default: all rows) that pass the filter
+    def select(self, indices=None, open_only=False):
+        if indices is None:
+            indices = range(len(self.port_column))
+
+        if open_only:
+            states = self.state_column
+            return array('I', (i for i in indices if states[i] == OPEN))
+        return array('I', indices)
+
+    # Method to get the sort key of a column  -  a function of a row number (the stored values, not the text)
+    def sort_key(self, column):
+        ports = self.port_column
+
+        if column == 'ip':
+            # Sort the (few) hosts once, then each row by its host's place in that order
+            rank = [0] * len(self.hosts)
+            for place, host_id in enumerate(sorted(range(len(self.hosts)), key=self.hosts.__getitem__)):
+                rank[host_id] = place
+            hosts = self.host_column
+            key = lambda i: rank[hosts[i]]
+        elif column == 'port_num':
+            key = ports.__getitem__
+        elif column == 'port_status':
+            key = self.state_column.__getitem__
+        elif column == 'protocol':
+            key = self.protocol_column.__getitem__
+        else:  # Port name / description  -  from the catalog
+            catalog = get_catalog()
+            field = COLUMNS.index(column) - 3
+            key = lambda i: catalog.entries[catalog.index[ports[i]]][field]
+        return key
+
+    # Method to sort row numbers by a column (sorts on the stored values, not on text)
+    def sort(self, indices, column, reverse=False):
+        return array('I', sorted(indices, key=self.sort_key(column), reverse=reverse))
+
+    # Method to add NEW row numbers to row numbers already sorted by a column  -  same order as sort() on them all,
+    # but only the new ones are sorted (each is then placed by a binary search): for rows streamed into a sorted table
+    def merge_sorted(self, indices, new_indices, column, reverse=False):
+        key = self.sort_key(column)
+        merged = array('I')
+        start = 0
+        for index in sorted(new_indices, key=key, reverse=reverse):
+            # After the rows that sort before it & the ones equal to it (like a stable sort of the rows in order)
+            value = key(index)
+            low, high = start, len(indices)
+            while low < high:
+                middle = (low + high) // 2
+                before = key(indices[middle])
+                if before >= value if reverse else before <= value:
+                    low = middle + 1
+                else:
+                    high = middle
+            merged.extend(indices[start:low])
+            merged.append(index)
+            start = low
+        merged.extend(indices[start:])
+        return merged
@@ -0,0 +1,58 @@
+__all__ = ['RttEstimator', 'MIN_TIMEOUT']
+
+# Round-trip time (RTT) estimation per target host  -  used to pick connect timeouts
+# Same idea as nmap / TCP (RFC 6298): smoothed RTT + 4x the RTT variance, kept between a floor & a ceiling
+
+# Import Libs
+import threading
+
+# Default lowest connect timeout (seconds)  -  never wait less than this, however fast the host answers
+MIN_TIMEOUT = 0.1
+
+
+class RttEstimator:
+    def __init__(self, max_timeout, min_timeout=MIN_TIMEOUT):
+        self.max_timeout = max_timeout  # Ceiling (also the timeout used until the 1st RTT sample comes in)
+        self.min_timeout = min(min_timeout, max_timeout)  # Floor
+
+        self.samples = 0  # Number of RTT samples (completed handshakes / refusals)
+        self.srtt = None  # Smoothed RTT (seconds)
+        self.rttvar = None  # RTT variance (seconds)
+        self.min_rtt = None  # Lowest RTT seen
+        self.max_rtt = None  # Highest RTT seen
+
+        self.lock = threading.Lock()
+
+    # Method to add an RTT sample (seconds)  -  ONLY for connects that got an answer (not for timeouts)
+    def add(self, rtt):
+        with self.lock:
+            if self.samples == 0:
+                self.srtt = rtt
+                self.rttvar = rtt / 2
+                self.min_rtt = self.max_rtt = rtt
+            else:
+                delta = rtt - self.srtt
+                self.srtt += delta / 8
+                self.rttvar += (abs(delta) - self.rttvar) / 4
+                self.min_rtt = min(self.min_rtt, rtt)
+                self.max_rtt = max(self.max_rtt, rtt)
+            self.samples += 1
+
+    # Method to get the connect timeout to use for this host right now
+    def timeout(self):
+        if self.samples == 0:
+            return self.max_timeout
+        return max(self.min_timeout, min(self.srtt + 4 * self.rttvar, self.max_timeout))
+
+    # Method to get the (longer) timeout used when retrying ports that timed out
+    def retry_timeout(self):
+        return min(2 * self.timeout(), 2 * self.max_timeout)
+
+    # Method to get the RTT stats (for reporting)
+    def stats(self):
+        return {'samples': self.samples,
+                'srtt': self.srtt,
+                'rttvar': self.rttvar,
+                'min_rtt': self.min_rtt,
+                'max_rtt': self.max_rtt,
+                'timeout': self.timeout()}
@@ -0,0 +1,504 @@
+__all__ = ['BasePortScanner', 'ThreadedPortScanner', 'default_max_workers', 'error_state']
+
+# Threaded PortScanner  -  the scan engine (no GUI code here, so it can be used without tkinter/PIL)
+
+# Import Libs
+import os
+import time
+import errno
+import socket
+import queue
+import threading
+
+try:  # 'resource' (fd limits) is only available on Unix
+    import resource
+except ImportError:
+    resource = None
+
+from src.port_catalog import get_catalog
+from src.results import (ResultBatcher, ResultStore, ServiceBatch, SCAN_DONE, CLOSED, OPEN, FILTERED, UNREACHABLE,
+                         UNRESOLVED, ERROR, TCP)
+from src.targets import parse_targets
+from src.scheduler import ScanScheduler
+from src.rtt import RttEstimator, MIN_TIMEOUT
+from src.resolver import get_resolver
+from src.checkpoint import Checkpoint
+from src.rate_limit import RateLimiter
+from src.port_spec import PortsExcept, format_port_range
+from src.metrics import ScanMetrics
+
+
+# Function to pick a default number of scanner worker threads
+# Each worker holds one socket (fd) open at a time, so stay well below the fd limit & scale with the CPU count
+def default_max_workers():
+    workers = (os.cpu_count() or 1) * 64
+
+    if resource is not None:
+        soft_limit = resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+        if soft_limit != resource.RLIM_INFINITY:
+            # Leave some fds free for the GUI, the resource files, etc.
+            workers = min(workers, soft_limit - 64)
+
+    # Never less than 1, never more than 1024 threads
+    return max(1, min(workers, 1024))
+
+
+# Default max connects per second for the sweep of an incremental scan (the ports that were not open last time)
+SWEEP_RATE = 1000
+
+
+# Function to pick the sweep rate of an incremental scan  -  half the scan's rate (if it has one), never faster
+# than SWEEP_RATE
+def default_sweep_rate(rate):
+    return min(rate / 2, SWEEP_RATE) if rate else SWEEP_RATE
+
+
+# errno values that mean the host (or its network) can't be reached  (+ the Windows socket error versions)
+UNREACHABLE_ERRNOS = {getattr(errno, name) for name in ('EHOSTUNREACH', 'ENETUNREACH', 'EHOSTDOWN', 'ENETDOWN',
+                                                         'WSAEHOSTUNREACH', 'WSAENETUNREACH', 'WSAEHOSTDOWN',
+                                                         'WSAENETDOWN')
+                      if hasattr(errno, name)}
+
+
+# Function to get the port state for an exception raised by connect()  -  no extra round-trips needed
+def error_state(e):
+    if isinstance(e, ConnectionRefusedError):  # The host answered with a reset
+        return CLOSED
+    if isinstance(e, (socket.timeout, TimeoutError)):  # No answer at all
+        return FILTERED
+    if isinstance(e, socket.gaierror):  # The host name could not be resolved
+        return UNRESOLVED
+    if e.errno in UNREACHABLE_ERRNOS or getattr(e, 'winerror', None) in UNREACHABLE_ERRNOS:
+        return UNREACHABLE
+    return ERROR
+
+
+# Base PortScanner thread  -  settings & state shared by every scan engine
+# Engines take args=(target(s), port_list), stream batches of (ip, port, state, name, description, protocol)
+# tuples to the queue & put SCAN_DONE on it when the scan is done
+class BasePortScanner(threading.Thread):
+    # Protocol scanned by the engine
+    protocol = TCP
+
+    def __init__(self, q, args=(), kwargs=None):
+        threading.Thread.__init__(self, args=(), kwargs=None)
+
+        # Don't keep the app alive just for a scan (e.g. when the window is closed mid-scan)
+        self.daemon = True
+
+        self.queue = q  # Set the queue
+
+        # Retrieve the given parameters (convert the Iterable to a list)
+        params = []
+        for x in args:
+            params.append(x)
+
+        self.target = params[0]  # Set the 1st parameter (target host(s) spec) as a variable
+        self.port_list = params[1]  # Set the 2nd parameter (port range) as a variable
+
+        # Target hosts  -  a single host, CIDR block, address range or comma-separated list of them
+        self.targets = parse_targets(self.target)
+
+        # Retrieve the optional settings
+        kwargs = kwargs or {}
+        # Max number of ports scanned at once (across ALL hosts)
+        self.max_workers = kwargs.get('max_workers') or self.default_workers()
+        # Max number of ports scanned at once on any ONE host (None = no per-host limit)
+        self.per_host_limit = kwargs.get('per_host_limit')
+        # Connect timeout (seconds)  -  with adaptive timeouts this is the ceiling
+        self.timeout = kwargs.get('timeout', 3)
+        # Lowest connect timeout (seconds) adaptive timeouts can go down to
+        self.min_timeout = kwargs.get('min_timeout', MIN_TIMEOUT)
+        # Derive each host's connect timeout from its measured round-trip time?
+        self.adaptive = kwargs.get('adaptive', True)
+        # Number of times a port that timed out is retried (at the end of the scan, with a longer timeout)
+        self.retries = kwargs.get('retries', 1)
+        # Print progress ("Port X is open!") to the console?
+        self.verbose = kwargs.get('verbose', True)
+        # Host name resolver (shared cache by default, so names are looked up once across scans)
+        self.resolver = kwargs.get('resolver') or get_resolver()
+        # Connect pacing  -  max connects per second across all hosts / to any one host (None = no limit), and
+        # whether to slow down automatically when timeouts & errors spike
+        self.rate_limiter = RateLimiter(kwargs.get('rate'), kwargs.get('per_host_rate'), kwargs.get('backoff', True))
+        # Results of a previous scan (diff.Baseline)  -  when given, the scan is incremental: the ports that were open
+        # last time are scanned first, then the rest at 'sweep_rate' connects per second (default: a lower rate)
+        self.baseline = kwargs.get('baseline')
+        self.sweep_rate = kwargs.get('sweep_rate') or default_sweep_rate(kwargs.get('rate'))
+        # Grab the banners of open ports & identify their services  -  on its own pool of 'banner_workers' threads
+        # (runs next to the sweep), waiting up to 'banner_timeout' seconds for a service to say something
+        self.grab_banners = kwargs.get('banners', False)
+        self.banner_workers = kwargs.get('banner_workers', 16)
+        self.banner_timeout = kwargs.get('banner_timeout', 1.0)
+        # Checkpoint file progress is recorded to (None = no checkpoint)
+        self.checkpoint = Checkpoint(kwargs['checkpoint']) if kwargs.get('checkpoint') else None
+        # Continue the scan recorded in the checkpoint (instead of starting over)?
+        self.resume_checkpoint = kwargs.get('resume', False)
+
+        # Cleared while the scan is paused
+        self.running = threading.Event()
+        self.running.set()
+        # Set once the scan is cancelled
+        self.cancelled = threading.Event()
+
+        # Ports already done (loaded from the checkpoint when resuming, or given by a ShardedPortScanner)
+        # {host: set of ports}
+        self.done = kwargs.get('done') or {}
+
+        # Results of the scan (in the order they came in)
+        self.data = ResultStore()
+
+        # Counters & histograms of the scan (connects in flight, results by state, latency, ...)
+        self.metrics = ScanMetrics()
+
+        # Round-trip time estimator per host
+        self.rtt = {}
+
+        # Hosts given up on (unreachable / unresolved)  -  {host: state}; their remaining ports are not scanned
+        # (reported with the host's state)
+        self.dead_hosts = {}
+
+        # Banner grabbing stage (while the scan runs, if enabled)
+        self.banners = None
+
+        # Exception that ended the scan early (None = the scan ran to the end / was cancelled)
+        self.error = None
+
+    # Method to pause the scan  -  no new ports are handed out until resume() is called
+    def pause(self):
+        self.running.clear()
+
+    # Method to resume a paused scan
+    def resume(self):
+        self.running.set()
+
+    # Method to cancel the scan  -  ports in flight finish, no new ones are started
+    def cancel(self):
+        self.cancelled.set()
+        self.running.set()  # Wake up anything waiting on a pause
+
+    # Method to stop the scan on an error  -  the 1st error is kept in 'error' for the GUI / command line
+    def fail(self, error):
+        if self.error is None:
+            self.error = error
+        self.cancel()
+
+    def is_paused(self):
+        return not self.running.is_set()
+
+    # Method to wait while the scan is paused  -  returns False once the scan has been cancelled
+    def wait_if_paused(self):
+        self.running.wait()
+        return not self.cancelled.is_set()
+
+    # Method to open the checkpoint  -  when resuming, sends the recorded results to the queue & marks their
+    # ports as done (so they are not scanned again)
+    def open_checkpoint(self):
+        if self.checkpoint is None:
+            return
+
+        if self.resume_checkpoint and self.checkpoint.read_header() is not None:
+            # Previous results go to the queue (& 'data') in batches, like any other result
+            batcher = ResultBatcher(self.queue, size=512, interval=float("inf"), store=self.data)
+            catalog = get_catalog()
+            for host, port, state in self.checkpoint.load():
+                self.done.setdefault(host, set()).add(port)
+                batcher.add((host, port, state) + catalog.lookup(port) + (self.protocol,))
+            batcher.flush()
+
+            self.checkpoint.reopen()
+        else:
+            self.checkpoint.create(self.target, format_port_range(self.port_list), self.protocol)
+
+    # Method to start the banner grabbing stage (if enabled)
+    def start_banners(self):
+        if self.grab_banners:
+            # (imported here  -  it pulls in ssl, which scans without banner grabbing don't need)
+            from src.fingerprint import BannerGrabber
+            self.banners = BannerGrabber(self.found_service, self.banner_workers, self.timeout, self.banner_timeout)
+
+    # Method to wait for the banner grabbing stage to finish (drops the ports not started yet if cancelled)
+    def stop_banners(self):
+        if self.banners is not None:
+            self.banners.close(cancel=self.cancelled.is_set())
+            self.banners = None
+
+    # Method called (by the banner grabbing workers) with the service found on an open port
+    def found_service(self, host, port, service, detail):
+        if service is None and not detail:  # Nothing to show
+            return
+        self.data.set_service(host, port, service, detail)
+        self.queue.put(ServiceBatch([(host, port, service, detail)]))
+
+    # Method to get the default max number of ports scanned at once (for this engine)
+    def default_workers(self):
+        return default_max_workers()
+
+    # Method to plan the 1st pass over the targets  -  yields a ScanScheduler per part of the pass
+    # Full scan: all the ports at once. Incremental scan (with a baseline): the priority ports first, then the rest
+    # at the sweep rate
+    def first_pass(self, workers):
+        if self.baseline is None:
+            yield ScanScheduler(self.targets, self.port_list, workers, self.per_host_limit, self.done)
+            return
+
+        priority = self.baseline.priority_ports(self.port_list, self.protocol)
+        if priority:
+            yield ScanScheduler(self.targets, priority, workers, self.per_host_limit, self.done)
+
+        rest = PortsExcept(self.port_list, set(priority))
+        if len(rest) and not self.cancelled.is_set():
+            if self.sweep_rate:
+                self.rate_limiter.set_rate(self.sweep_rate)
+            yield ScanScheduler(self.targets, rest, workers, self.per_host_limit, self.done)
+
+    # Method to get the RTT estimator for a host (created on first use)
+    def get_rtt(self, host):
+        estimator = self.rtt.get(host)
+        if estimator is None:
+            estimator = self.rtt.setdefault(host, RttEstimator(self.timeout, self.min_timeout))
+        return estimator
+
+    # Method to pick the connect timeout for a host (from its measured RTT, longer when retrying)
+    def connect_timeout(self, rtt, attempt):
+        if not self.adaptive:
+            return self.timeout if attempt == 0 else 2 * self.timeout
+        return rtt.timeout() if attempt == 0 else rtt.retry_timeout()
+
+    # Method to wait until the rate limiter lets a connect to 'host' start  -  returns False if the scan is
+    # cancelled meanwhile
+    def pace(self, host):
+        delay = self.rate_limiter.reserve(host)
+        if delay > 0:
+            return not self.cancelled.wait(delay)
+        return True
+
+    # Method to resolve the host names of the targets ONCE, before scanning  -  returns the names that failed
+    # (they are given up on right away: their ports are reported as unresolved without any connect attempts)
+    def resolve_targets(self):
+        failed = []
+        for host in self.targets.hostnames():
+            try:
+                self.resolver.resolve(host)
+            except socket.gaierror:
+                failed.append(host)
+                self.dead_hosts[host] = UNRESOLVED
+        return failed
+
+    # Method to give up on a host (e.g. unreachable)  -  stops handing out its remaining ports, which are reported
+    # with the host's state (so every port still gets a result & a resumed scan doesn't scan them again)
+    def give_up(self, host, state, scheduler, catalog, batcher):
+        if host not in self.dead_hosts:
+            self.dead_hosts[host] = state
+            self.skip_ports(host, scheduler.drop(host), catalog, batcher)
+
+    # Method to report ports of a host given up on without scanning them  -  each gets the host's state
+    def skip_ports(self, host, ports, catalog, batcher):
+        state = self.dead_hosts[host]
+        for port in ports:
+            batcher.add((host, port, state) + catalog.lookup(port) + (self.protocol,))
+
+    # Method to take the hosts given up on out of the ports to retry ({host: ports})  -  their ports are reported
+    # with the host's state
+    def skip_dead_hosts(self, ports, catalog, batcher):
+        for host in [host for host in ports if host in self.dead_hosts]:
+            self.skip_ports(host, ports.pop(host), catalog, batcher)
+
+    # Current rate limits & number of backoffs  -  {'rate', 'per_host_rate', 'backoffs'}
+    @property
+    def rate_stats(self):
+        return self.rate_limiter.stats()
+
+    # Scan progress  -  {'scanned': results so far, 'total': number of (host, port) pairs}
+    @property
+    def progress(self):
+        return {'scanned': len(self.data), 'total': len(self.targets) * len(self.port_list)}
+
+    # RTT stats per host  -  {host: {'samples', 'srtt', 'rttvar', 'min_rtt', 'max_rtt', 'timeout'}}
+    @property
+    def rtt_stats(self):
+        return {host: estimator.stats() for host, estimator in self.rtt.items()}
+
+    def get_port_name(self, port):
+        return get_catalog().name(port)
+
+    def get_port_description(self, port):
+        return get_catalog().description(port)
+
+
+# PortScanner thread (runs separately from the main tkinter GUI thread)
+class ThreadedPortScanner(BasePortScanner):
+    # What happens during the thread process
+    def run(self):
+        try:
+            if self.verbose:
+                print("\nSCANNING...")
+
+            # Resolve the target host names once (up front)
+            self.resolve_targets()
+
+            # Load / start the checkpoint (if any)
+            self.open_checkpoint()
+
+            self.start_banners()
+            try:
+                # Start the port scan (results are streamed to the queue as they come in)
+                self.scan()
+            finally:
+                self.stop_banners()
+                if self.checkpoint is not None:
+                    self.checkpoint.close()
+        except Exception as e:
+            # The scan failed  -  kept for the GUI / command line to report (the traceback is still printed)
+            self.fail(e)
+            raise
+        finally:
+            # (after the port scan is done  -  or has failed)
+            # Tell the Tkinter GUI thread that there are no more results coming
+            self.queue.put(SCAN_DONE)
+
+    # Method to check if a port is open
+    def is_port_open(self, target, port):
+        return self.connect(target, port, self.timeout)[0] == OPEN
+
+    # Method to try to connect to a port  -  returns (state, rtt)
+    # 'rtt' is the time (seconds) until the host answered (handshake OR refusal), None if it didn't answer
+    def connect(self, target, port, timeout):
+        # Define socket with exceptions
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            self.metrics.connect_started()
+            start = time.monotonic()
+
+            try:  # Is the socket able to be connected?  (port open)
+                sock.connect((target, port))
+                state, rtt = OPEN, time.monotonic() - start
+            except OSError as e:  # Refused / timed out / unreachable / ...
+                state = error_state(e)
+                rtt = time.monotonic() - start if state == CLOSED else None
+
+        self.metrics.connect_done(state, time.monotonic() - start)
+        return state, rtt
+
+    def scan(self):
+        # Shared port metadata catalog (loaded once, constant-time lookups)
+        catalog = get_catalog()
+
+        # Number of worker threads  -  capped, and never more than there are ports to scan
+        workers = max(1, min(self.max_workers, len(self.targets) * len(self.port_list)))
+
+        # 1st pass: every (host, port) pair of all the targets  (incremental scan: priority ports first)
+        # (ports that time out are collected in 'retry' & retried at the end with a longer timeout)
+        retry = {}
+        for scheduler in self.first_pass(workers):
+            self.scan_pass(scheduler, workers, catalog, retry, 0)
+
+        # Retry passes: only the ports that timed out (per host)
+        for attempt in range(1, self.retries + 1):
+            if not retry or self.cancelled.is_set():
+                break
+            ports, retry = retry, {}
+            batcher = ResultBatcher(self.queue, checkpoint=self.checkpoint, store=self.data)
+            self.skip_dead_hosts(ports, catalog, batcher)
+            batcher.flush()
+            self.scan_pass(ScanScheduler(list(ports), ports, workers, self.per_host_limit),
+                           workers, catalog, retry, attempt)
+
+    # Method to scan all the (host, port) pairs handed out by 'scheduler' with a pool of worker threads
+    def scan_pass(self, scheduler, workers, catalog, retry, attempt):
+        # Bounded queue of (host, port) pairs  -  workers take the next pair as they free up
+        # (memory stays flat for any range)
+        port_queue = queue.Queue(maxsize=workers * 2)
+
+        # Start the worker threads
+        threads = [threading.Thread(target=self.scan_worker,
+                                    args=(port_queue, catalog, scheduler, retry, attempt), daemon=True)
+                   for _ in range(min(workers, scheduler.total))]
+        for thread in threads:
+            thread.start()
+
+        # Feed the (host, port) pairs to the workers (blocks while the queue is full / the hosts are at their limit)
+        for job in scheduler:
+            # Stop handing out ports while paused / once cancelled
+            if not self.wait_if_paused():
+                break
+            port_queue.put(job)
+
+        # Tell each worker to stop once the queue is drained
+        for _ in threads:
+            port_queue.put(None)
+
+        # Wait for all the workers to finish
+        for thread in threads:
+            thread.join()
+
+    # Method run by each worker thread  -  scans (host, port) pairs from the queue until it gets 'None'
+    def scan_worker(self, port_queue, catalog, scheduler, retry, attempt):
+        # Streams this worker's results to the queue (& the checkpoint & 'data') in small batches
+        batcher = ResultBatcher(self.queue, checkpoint=self.checkpoint, store=self.data)
+
+        while True:
+            job = port_queue.get()
+            if job is None:
+                # Send whatever is left in the batch
+                batcher.flush()
+                break
+
+            host, port = job
+
+            # Host already given up on  -  report the (already queued) port without scanning it
+            if host in self.dead_hosts:
+                scheduler.done(host)
+                self.skip_ports(host, (port,), catalog, batcher)
+                continue
+
+            # Scan cancelled  -  skip the port (otherwise wait for the rate limiter to let the connect start)
+            if not self.wait_if_paused() or not self.pace(host):
+                scheduler.done(host)
+                continue
+
+            try:  # Host name -> address (cached, so only the 1st lookup of a host costs anything)
+                address = self.resolver.resolve(host)
+            except socket.gaierror:
+                state, sample = UNRESOLVED, None
+            else:
+                try:
+                    # Pick the connect timeout (from the host's measured RTT, longer when retrying)
+                    rtt = self.get_rtt(host)
+                    state, sample = self.connect(address, port, self.connect_timeout(rtt, attempt))
+                except Exception as e:
+                    # Not a port state  -  a bug / bad setting: stop the scan (this worker drains the queue with
+                    # the others, so the feeder never waits on a dead worker)
+                    self.fail(e)
+                    scheduler.done(host)
+                    continue
+                if sample is not None:
+                    rtt.add(sample)
+                self.rate_limiter.report(state)
+
+            # Free up the host's slot for the scheduler
+            scheduler.done(host)
+
+            # Timed out  -  retry it at the end of the scan (no result yet)
+            if state == FILTERED and attempt < self.retries:
+                retry.setdefault(host, []).append(port)
+                continue
+
+            # Unreachable / unresolved  -  no point trying the rest of the host's ports
+            if state in (UNREACHABLE, UNRESOLVED):
+                self.give_up(host, state, scheduler, catalog, batcher)
+
+            # Look up the port's name & description
+            port_name, port_description = catalog.lookup(port)
+
+            result = (host, port, state, port_name, port_description, TCP)
+
+            # Stream the result (open ports are sent straight away)
+            batcher.add(result, urgent=state == OPEN)
+
+            # Identify the service on open ports (next to the sweep)
+            if state == OPEN and self.banners is not None:
+                self.banners.submit(host, address, port)
+
+            # If the port is open, output to console
+            if state == OPEN and self.verbose:
+                print(f'{host}: Port {port} is open!')
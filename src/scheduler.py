@@ -0,0 +1,124 @@
+__all__ = ['ScanScheduler', 'BUSY']
+
+# Host x Port work scheduler  -  hands out (host, port) pairs to the scan workers
+# Hosts are taken from the target set a few at a time (never all up front), their ports are interleaved
+# round-robin, & no host ever has more than 'per_host_limit' connects in flight
+
+# Import Libs
+import threading
+from itertools import chain
+from collections import deque
+
+# Returned by next_job() when every active host is at its per-host limit (try again after a done() call)
+BUSY = object()
+
+
+class ScanScheduler:
+    def __init__(self, targets, ports, workers, per_host_limit=None, skip=None):
+        self.targets = iter(targets)  # Hosts that have not been started yet
+
+        # Ports already done (e.g. in a resumed scan) that must not be handed out again  -  {host: set of ports}
+        self.skip = skip or {}
+
+        # Ports to scan on EVERY host (must be re-iterable, e.g. a range)
+        # OR a dict of {host: ports} when each host has its own ports (e.g. ports to retry)
+        if isinstance(ports, dict):
+            self.ports_for = ports.__getitem__
+            self.total = sum(len(host_ports) for host_ports in ports.values())
+        else:
+            self.ports_for = lambda host: ports
+            self.total = len(targets) * len(ports)
+
+        if per_host_limit:
+            # Max connects in flight per host
+            self.per_host_limit = max(1, min(per_host_limit, workers))
+            # Max number of hosts being scanned at once  -  enough hosts to keep every worker busy (x2 for slack)
+            self.active_hosts = 2 * -(-workers // self.per_host_limit)
+        else:
+            # No per-host limit  -  only the shared worker budget applies
+            self.per_host_limit = float("inf")
+            self.active_hosts = 8
+
+        # Hosts being scanned: [host, iterator of ports left]  -  rotated for round-robin
+        self.active = deque()
+        # Connects in flight per host
+        self.in_flight = {}
+
+        self.condition = threading.Condition()
+        self.fill()
+
+    # Method to start new hosts (until 'active_hosts' hosts are being scanned or there are none left)
+    def fill(self):
+        while len(self.active) < self.active_hosts:
+            host = next(self.targets, None)
+            if host is None:
+                break
+            ports = iter(self.ports_for(host))
+            if host in self.skip:
+                done = self.skip[host]
+                ports = (port for port in ports if port not in done)
+            self.active.append([host, ports])
+            self.in_flight.setdefault(host, 0)
+
+    # Method to get the next (host, port) pair  -  returns BUSY if every active host is at its limit,
+    # or None once every pair has been handed out
+    def next_job(self):
+        with self.condition:
+            # Try each active host once (round-robin)
+            for _ in range(len(self.active)):
+                entry = self.active[0]
+                self.active.rotate(-1)
+                host = entry[0]
+
+                if self.in_flight[host] >= self.per_host_limit:
+                    continue
+
+                port = next(entry[1], None)
+                if port is None:  # No ports left for this host  -  swap it for the next one
+                    self.active.remove(entry)
+                    self.forget(host)
+                    self.fill()
+                    return self.next_job()
+
+                self.in_flight[host] += 1
+                return host, port
+
+            return BUSY if self.active else None
+
+    # Method to call once the connect for a (host, port) pair has completed
+    def done(self, host):
+        with self.condition:
+            self.in_flight[host] -= 1
+            self.forget(host)
+            self.condition.notify()
+
+    # Method to stop handing out the (remaining) ports of a host  -  e.g. when the host is unreachable
+    # returns the ports that were not handed out (an iterator)
+    def drop(self, host):
+        with self.condition:
+            dropped = [entry for entry in self.active if entry[0] == host]
+            for entry in dropped:
+                self.active.remove(entry)
+            if host in self.in_flight:
+                self.forget(host)
+            self.fill()
+            self.condition.notify()
+        return chain.from_iterable(entry[1] for entry in dropped)
+
+    # Method to drop the in-flight counter of a finished host (keeps memory flat for large target sets)
+    def forget(self, host):
+        if self.in_flight[host] == 0 and not any(entry[0] == host for entry in self.active):
+            del self.in_flight[host]
+
+    # Iterate the (host, port) pairs  -  blocks (instead of returning BUSY) until a host has a free slot
+    def __iter__(self):
+        while True:
+            with self.condition:
+                job = self.next_job()
+                while job is BUSY:
+                    self.condition.wait()
+                    job = self.next_job()
+
+            if job is None:
+                return
+            yield job
@@ -0,0 +1,352 @@
+__all__ = ['SelectorPortScanner', 'default_max_sockets']
+
+# Selector PortScanner  -  the low-level scan engine: ONE thread, no event loop framework
+# Non-blocking connects are started in batches & watched by epoll (Linux  -  or the 'selectors' module's best pick
+# elsewhere: kqueue on BSD / macOS, select on Windows); each one is reaped as soon as its socket turns writable
+# (SO_ERROR gives the result) & its fd is closed straight away, so it is free for the next connect
+#
+# Timeouts are kept on a timer wheel (no per-socket timeout, no timer per connect): every tick only the connects
+# due in that tick are looked at, & a connect that finishes is taken off the wheel straight away
+
+# Import Libs
+import os
+import time
+import errno
+import socket
+import select
+import struct
+import selectors
+
+try:  # 'resource' (fd limits) is only available on Unix
+    import resource
+except ImportError:
+    resource = None
+
+from src.port_catalog import get_catalog
+from src.results import ResultBatcher, SCAN_DONE, CLOSED, OPEN, FILTERED, UNREACHABLE, UNRESOLVED, TCP
+from src.scheduler import ScanScheduler, BUSY
+from src.scanner import BasePortScanner, error_state
+from src.timer_wheel import TimerWheel
+
+# connect_ex() results that mean "connecting"  (+ the Windows socket error version)
+IN_PROGRESS = {errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EAGAIN, getattr(errno, 'WSAEWOULDBLOCK', 10035)}
+
+# errno values that mean the process / system ran out of fds (wait for connects to finish, then go on)
+NO_FDS = {errno.EMFILE, errno.ENFILE}
+
+# Max number of connects started in a row before the sockets are polled again
+BATCH_SIZE = 256
+
+# Timer wheel resolution (seconds) & size  -  1024 ticks of 10ms (deadlines further away wait another turn)
+WHEEL_TICK = 0.01
+WHEEL_SLOTS = 1024
+
+# SO_LINGER {on, 0 seconds}  -  closing a connected socket resets it instead of leaving it in TIME_WAIT (which would
+# tie up a local port for a minute)
+LINGER_RESET = struct.pack("ii", 1, 0)
+
+
+# Function to pick a default number of connects in flight  -  every pending connect holds one fd, so the fd limit is
+# the real cap
+def default_max_sockets():
+    sockets = 4096
+
+    if resource is not None:
+        soft_limit = resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+        if soft_limit != resource.RLIM_INFINITY:
+            # Leave some fds free for the GUI, the resource files, etc.
+            sockets = soft_limit - 64
+    elif os.name == "nt":
+        # select() can only watch 512 sockets at once on Windows
+        sockets = 500
+
+    # Never less than 1, never more than 8192 connects in flight
+    return max(1, min(sockets, 8192))
+
+
+# Sockets watched with epoll (by fd)  -  closing a socket takes it out of the epoll set, so there is nothing to undo
+# per connect
+class EpollPoller:
+    def __init__(self):
+        self.epoll = select.epoll()
+
+    # Method to watch a connecting socket (until it turns writable)
+    def watch(self, fd):
+        self.epoll.register(fd, select.EPOLLOUT)
+
+    # Method to stop watching a socket  -  called right before it is closed
+    def forget(self, fd):
+        pass
+
+    # Method to wait (up to 'timeout' seconds) for sockets to turn writable  -  returns their fds
+    def poll(self, timeout):
+        return [fd for fd, _ in self.epoll.poll(timeout)]
+
+    def close(self):
+        self.epoll.close()
+
+
+# Sockets watched with the 'selectors' module (where there is no epoll)
+class SelectorPoller:
+    def __init__(self):
+        self.selector = selectors.DefaultSelector()
+
+    def watch(self, fd):
+        self.selector.register(fd, selectors.EVENT_WRITE)
+
+    def forget(self, fd):
+        self.selector.unregister(fd)
+
+    def poll(self, timeout):
+        return [key.fd for key, _ in self.selector.select(timeout)]
+
+    def close(self):
+        self.selector.close()
+
+
+# Function to get a poller for the connecting sockets (epoll when there is one)
+def open_poller():
+    if hasattr(select, 'epoll'):
+        return EpollPoller()
+    return SelectorPoller()
+
+
+# Connect in flight
+class PendingConnect:
+    __slots__ = ('sock', 'fd', 'host', 'address', 'port', 'started')
+
+    def __init__(self, sock, host, address, port, started):
+        self.sock = sock  # (None once the connect is done)
+        self.fd = sock.fileno()
+        self.host = host
+        self.address = address
+        self.port = port
+        self.started = started
+
+
+# Selector PortScanner thread (runs separately from the main tkinter GUI thread)
+# Same contract as ThreadedPortScanner: args=(target, port_list), streams batches of
+# (ip, port, state, name, description, protocol) tuples to the queue, then SCAN_DONE when the scan is done
+class SelectorPortScanner(BasePortScanner):
+    # Method to get the default max number of connects in flight
+    def default_workers(self):
+        return default_max_sockets()
+
+    # What happens during the thread process
+    def run(self):
+        try:
+            if self.verbose:
+                print("\nSCANNING...")
+
+            # Resolve the target host names once (up front)
+            self.resolve_targets()
+
+            # Load / start the checkpoint (if any)
+            self.open_checkpoint()
+
+            self.start_banners()
+            try:
+                # Start the port scan (results are streamed to the queue as they come in)
+                self.scan()
+            finally:
+                self.stop_banners()
+                if self.checkpoint is not None:
+                    self.checkpoint.close()
+        except Exception as e:
+            # The scan failed  -  kept for the GUI / command line to report (the traceback is still printed)
+            self.fail(e)
+            raise
+        finally:
+            # (after the port scan is done  -  or has failed)
+            # Tell the Tkinter GUI thread that there are no more results coming
+            self.queue.put(SCAN_DONE)
+
+    def scan(self):
+        # Shared port metadata catalog (loaded once, constant-time lookups)
+        catalog = get_catalog()
+
+        # Number of connects in flight  -  capped, and never more than there are ports to scan
+        workers = max(1, min(self.max_workers, len(self.targets) * len(self.port_list)))
+
+        # Streams the results to the queue (& the checkpoint & 'data') in small batches
+        batcher = ResultBatcher(self.queue, checkpoint=self.checkpoint, store=self.data)
+
+        poller = open_poller()
+        try:
+            # 1st pass: every (host, port) pair of all the targets  (incremental scan: priority ports first)
+            # (ports that time out are collected in 'retry' & retried at the end with a longer timeout)
+            retry = {}
+            for scheduler in self.first_pass(workers):
+                self.scan_pass(poller, scheduler, workers, catalog, batcher, retry, 0)
+
+            # Retry passes: only the ports that timed out (per host)
+            for attempt in range(1, self.retries + 1):
+                if not retry or self.cancelled.is_set():
+                    break
+                ports, retry = retry, {}
+                self.skip_dead_hosts(ports, catalog, batcher)
+                self.scan_pass(poller, ScanScheduler(list(ports), ports, workers, self.per_host_limit),
+                               workers, catalog, batcher, retry, attempt)
+        finally:
+            poller.close()
+
+        # Send whatever is left in the batch
+        batcher.flush()
+
+    # Method to scan all the (host, port) pairs handed out by 'scheduler'  -  starts connects while there are free
+    # slots, reaps the ones that completed & times out the rest
+    def scan_pass(self, poller, scheduler, workers, catalog, batcher, retry, attempt):
+        wheel = TimerWheel(time.monotonic(), WHEEL_TICK, WHEEL_SLOTS)
+        pending = {}  # fd -> connect in flight (watched by the poller)
+        held = None  # Next connect to start  -  (host, address, port, time it may start at)
+        handed_out = False  # Every pair has been handed out by the scheduler
+        metrics = self.metrics
+
+        # Function to end a connect  -  closes its socket & reports the result
+        def finish(connect, state, now, registered=True):
+            sock = connect.sock
+            connect.sock = None
+            if registered:
+                del pending[connect.fd]
+                poller.forget(connect.fd)
+                wheel.remove(connect)
+            if state == OPEN:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, LINGER_RESET)
+            sock.close()
+
+            metrics.connect_done(state, now - connect.started)
+            if state == OPEN or state == CLOSED:  # The host answered  -  an RTT sample
+                self.get_rtt(connect.host).add(now - connect.started)
+            self.rate_limiter.report(state)
+            scheduler.done(connect.host)
+            add_result(connect.host, connect.address, connect.port, state)
+
+        # Function to stream the result of a (host, port) pair
+        def add_result(host, address, port, state):
+            # Timed out  -  retry it at the end of the scan (no result yet)
+            if state == FILTERED and attempt < self.retries:
+                retry.setdefault(host, []).append(port)
+                return
+
+            # Unreachable / unresolved  -  no point trying the rest of the host's ports
+            if state in (UNREACHABLE, UNRESOLVED):
+                self.give_up(host, state, scheduler, catalog, batcher)
+
+            # Look up the port's name & description
+            port_name, port_description = catalog.lookup(port)
+
+            # Stream the result (open ports are sent straight away)
+            batcher.add((host, port, state, port_name, port_description, TCP), urgent=state == OPEN)
+
+            # Identify the service on open ports (on the banner grabbing threads, next to the sweep  -  never waits
+            # for a free slot: that would hold up every connect of the event loop)
+            if state == OPEN and self.banners is not None:
+                self.banners.submit(host, address, port, wait=False)
+
+            # If the port is open, output to console
+            if state == OPEN and self.verbose:
+                print(f'{host}: Port {port} is open!')
+
+        # Function to start the held connect  -  returns False if it can't be started right now (out of fds)
+        def start(now):
+            nonlocal held
+            host, address, port, _ = held
+            try:
+                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            except OSError as e:
+                if e.errno in NO_FDS and pending:  # Wait for connects in flight to free some fds
+                    return False
+                # No socket for this port (out of fds with nothing in flight to wait for, or any other error)  -
+                # reported like a connect that failed, & the scan goes on
+                held = None
+                state = error_state(e)
+                metrics.connect_started()
+                metrics.connect_done(state, 0.0)
+                self.rate_limiter.report(state)
+                scheduler.done(host)
+                add_result(host, address, port, state)
+                return True
+            held = None
+            sock.setblocking(False)
+            metrics.connect_started()
+
+            connect = PendingConnect(sock, host, address, port, now)
+            error = sock.connect_ex((address, port))
+            if error in IN_PROGRESS:
+                pending[connect.fd] = connect
+                poller.watch(connect.fd)
+                wheel.add(now + self.connect_timeout(self.get_rtt(host), attempt), connect)
+            else:  # Done already (connected / refused / unreachable / ...)
+                finish(connect, OPEN if error == 0 else error_state(OSError(error, os.strerror(error))), now, False)
+            return True
+
+        while True:
+            now = time.monotonic()
+
+            # Cancelled  -  drop the connects in flight (no result) & stop
+            if self.cancelled.is_set():
+                for connect in pending.values():
+                    poller.forget(connect.fd)
+                    connect.sock.close()
+                    connect.sock = None
+                    scheduler.done(connect.host)
+                    metrics.connect_cancelled()
+                if held is not None:
+                    scheduler.done(held[0])
+                break
+
+            # Start a batch of connects (while there are free slots & not paused)
+            started = 0
+            while started < BATCH_SIZE and len(pending) < workers and self.running.is_set():
+                if held is None:
+                    job = scheduler.next_job()
+                    if job is BUSY:  # Every active host is at its limit  -  wait for connects to finish
+                        break
+                    if job is None:  # Every pair has been handed out
+                        handed_out = True
+                        break
+
+                    host, port = job
+                    if host in self.dead_hosts:  # Host already given up on  -  report the port without scanning it
+                        scheduler.done(host)
+                        self.skip_ports(host, (port,), catalog, batcher)
+                        continue
+                    try:  # Host name -> address (cached, so only the 1st lookup of a host costs anything)
+                        address = self.resolver.resolve(host)
+                    except socket.gaierror:
+                        scheduler.done(host)
+                        add_result(host, None, port, UNRESOLVED)
+                        continue
+
+                    # Book the connect with the rate limiter (held until its time comes  -  the loop never sleeps)
+                    held = (host, address, port, now + self.rate_limiter.reserve(host))
+
+                if held[3] > now or not start(now):
+                    break
+                started += 1
+
+            if handed_out and held is None and not pending:
+                break
+
+            # Poll the sockets  -  without waiting if more connects can start right away, otherwise until the next
+            # tick of the wheel / the held connect may start
+            if started == BATCH_SIZE:
+                wait = 0
+            else:
+                wait = WHEEL_TICK
+                if held is not None and len(pending) < workers:
+                    wait = min(wait, max(0.0, held[3] - now))
+            if not pending:  # Nothing to poll (paused / waiting on the rate limiter)
+                time.sleep(wait)
+            else:
+                for fd in poller.poll(wait):
+                    connect = pending[fd]
+                    error = connect.sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                    now = time.monotonic()
+                    finish(connect, OPEN if error == 0 else error_state(OSError(error, os.strerror(error))), now)
+
+            # Connects nobody answered in time
+            now = time.monotonic()
+            # (connects that finished were taken off the wheel  -  every one left here is still pending)
+            for connect in wheel.expire(now):
+                finish(connect, FILTERED, now)
@@ -0,0 +1,329 @@
+__all__ = ['ShardedPortScanner', 'shard_targets', 'shard_ports', 'default_processes']
+
+# Multi-process PortScanner  -  splits the (host x port) space into shards & scans each shard in its own process
+# (own GIL, own fd limit, own scan engine), then merges their results into ONE stream on the queue
+#
+# Shards are blocks of hosts (so each host is only ever scanned by one process, keeping its RTT estimate,
+# per-host limits & unreachable detection in one place); with fewer hosts than processes, the PORTS are split instead
+#
+# When to use it: only with several CPUs, on scans big enough that ONE engine keeps a CPU busy (many hosts x many
+# ports, fast network). Each shard costs ~0.2 s to start (a fresh interpreter) & every result is passed between
+# processes  -  on one CPU, or on a scan one engine finishes in a few seconds, it is slower than a single engine
+# (try '-e selectors' first: tens of thousands of ports/s from one CPU). 'selectors' is the best engine to run in
+# each shard ('--shard-engine selectors')
+
+# Import Libs
+import os
+import time
+import queue
+import signal
+import ipaddress
+import threading
+import multiprocessing
+from array import array
+
+from src.results import SCAN_DONE, ServiceBatch
+from src.scanner import BasePortScanner, ThreadedPortScanner
+from src.async_scanner import AsyncPortScanner
+from src.selector_scanner import SelectorPortScanner
+from src.udp_scanner import UdpPortScanner
+
+# Scan engine run inside each shard process
+ENGINES = {'threads': ThreadedPortScanner, 'asyncio': AsyncPortScanner, 'selectors': SelectorPortScanner,
+           'udp': UdpPortScanner}
+
+# Settings NOT passed on to the shards (handled by the parent / not picklable)
+PARENT_ONLY = ('checkpoint', 'resume', 'resolver', 'processes', 'shard_engine', 'verbose')
+
+# Max number of results a shard sends to the parent in one message
+MAX_ROWS_PER_MESSAGE = 4096
+
+# Seconds between two metrics updates sent by a shard to the parent
+METRICS_INTERVAL = 0.5
+
+
+# Function to pick a default number of shard processes  -  one per CPU
+def default_processes():
+    return max(1, os.cpu_count() or 1)
+
+
+# Function to split a TargetSet into (at most) 'count' target specs of about the same number of hosts
+# (contiguous address blocks  -  nothing is expanded)
+def shard_targets(targets, count):
+    size = -(-len(targets) // count)  # Hosts per shard (rounded up)
+    shards = [[]]
+    filled = 0
+
+    for part in targets.parts:
+        if isinstance(part, str):  # Host name
+            first, last = 0, 0
+        else:
+            first, last = part
+
+        while first <= last:
+            take = min(size - filled, last - first + 1)
+            if isinstance(part, str):
+                shards[-1].append(part)
+            elif take == 1:
+                shards[-1].append(str(ipaddress.IPv4Address(first)))
+            else:
+                shards[-1].append(f"{ipaddress.IPv4Address(first)}-{ipaddress.IPv4Address(first + take - 1)}")
+
+            first += take
+            filled += take
+            if filled == size:
+                shards.append([])
+                filled = 0
+
+    return [",".join(items) for items in shards if items]
+
+
+# Function to split ports into 'count' interleaved shards (each gets its share of the ports scanned first)
+def shard_ports(ports, count):
+    ports = array('H', ports)
+    return [ports[i::count] for i in range(count) if ports[i::count]]
+
+
+# What runs in each shard process  -  scans its shard with a normal scan engine & sends the results to the parent:
+#     ('rows', shard, [results])      ('services', shard, [services])      ('metrics', shard, metrics)
+#     ('done', shard, stats)
+def run_shard(shard, engine, target, ports, kwargs, results, running, cancelled):
+    # Ctrl+C reaches every process of the terminal  -  only the parent handles it (& cancels the shards)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    q = queue.Queue()
+    scanner = ENGINES[engine](q, args=(target, ports), kwargs=kwargs)
+
+    # Mirror the parent's pause / resume / cancel onto this shard's scanner
+    # (polled  -  NOT cancelled.wait(): set() waits for every process asleep on the event to wake up, so a shard
+    # killed while waiting would hang the parent as it cancels the scan)
+    def watch():
+        while not cancelled.is_set():
+            if running.is_set():
+                scanner.resume()
+            else:
+                scanner.pause()
+            time.sleep(0.1)
+        scanner.cancel()
+
+    threading.Thread(target=watch, daemon=True).start()
+    scanner.start()
+
+    # Pass the results on  -  whatever has piled up is sent together (fewer, bigger messages between processes)
+    done = False
+    metrics_sent = time.monotonic()
+    while not done:
+        # The shard's metrics (every METRICS_INTERVAL, results or not)
+        if time.monotonic() - metrics_sent >= METRICS_INTERVAL:
+            results.put(('metrics', shard, scanner.metrics.export()))
+            metrics_sent = time.monotonic()
+
+        rows = []
+        try:
+            msg = q.get(timeout=METRICS_INTERVAL)
+        except queue.Empty:
+            continue
+        while True:
+            if msg is SCAN_DONE:
+                done = True
+                break
+            if isinstance(msg, ServiceBatch):
+                results.put(('services', shard, list(msg)))
+            else:
+                rows.extend(msg)
+            if len(rows) >= MAX_ROWS_PER_MESSAGE:
+                break
+            try:
+                msg = q.get_nowait()
+            except queue.Empty:
+                break
+        if rows:
+            results.put(('rows', shard, rows))
+
+    results.put(('metrics', shard, scanner.metrics.export()))
+    results.put(('done', shard, {'dead_hosts': scanner.dead_hosts,
+                                 'rtt': scanner.rtt_stats,
+                                 'rate': scanner.rate_stats,
+                                 'error': str(scanner.error) if scanner.error is not None else None}))
+
+
+# Sharded PortScanner thread (runs separately from the main tkinter GUI thread)
+# Same contract as the other engines: args=(target, port_list), streams batches to the queue, then SCAN_DONE
+class ShardedPortScanner(BasePortScanner):
+    def __init__(self, q, args=(), kwargs=None):
+        BasePortScanner.__init__(self, q, args, kwargs)
+        kwargs = kwargs or {}
+
+        # Number of shard processes & the scan engine each of them runs ("threads" / "asyncio" / "selectors" / "udp")
+        self.processes = kwargs.get('processes') or default_processes()
+        self.shard_engine = kwargs.get('shard_engine', 'threads')
+        self.protocol = ENGINES[self.shard_engine].protocol
+
+        # Settings passed on to each shard
+        self.shard_kwargs = {key: value for key, value in kwargs.items() if key not in PARENT_ONLY}
+        self.shard_kwargs['verbose'] = False
+        # (the sweep rate is for the whole scan  -  split between the shards like the other rates)
+        self.shard_kwargs['sweep_rate'] = self.sweep_rate
+
+        # Progress of each shard (number of results) & number of shards done
+        self.shard_scanned = []
+        self.shards_done = 0
+
+        # Stats sent back by the shards
+        self.shard_rtt = {}
+        self.shard_rates = []
+
+    # What happens during the thread process
+    def run(self):
+        try:
+            if self.verbose:
+                print("\nSCANNING...")
+
+            # Resolve the target host names once (up front  -  invalid names fail here, not in every shard)
+            self.resolve_targets()
+
+            # Load / start the checkpoint (if any)
+            self.open_checkpoint()
+
+            try:
+                self.scan()
+            finally:
+                if self.checkpoint is not None:
+                    self.checkpoint.close()
+        except Exception as e:
+            # The scan failed  -  kept for the GUI / command line to report (the traceback is still printed)
+            self.fail(e)
+            raise
+        finally:
+            # (after the port scan is done  -  or has failed)
+            # Tell the Tkinter GUI thread that there are no more results coming
+            self.queue.put(SCAN_DONE)
+
+    # Method to split the scan into shards  -  returns [(target spec, ports, settings), ...]
+    def plan_shards(self):
+        count = self.processes
+        kwargs = dict(self.shard_kwargs)
+
+        if len(self.targets) >= count:
+            # Blocks of hosts  -  every shard scans all the ports
+            targets = shard_targets(self.targets, count)
+            ports = [self.port_list] * len(targets)
+        else:
+            # Few hosts  -  every shard scans all the hosts, on its slice of the ports
+            ports = shard_ports(self.port_list, count)
+            targets = [str(self.target)] * len(ports)
+
+            # Each host is now scanned by every shard at once  -  split its limits between them
+            if kwargs.get('per_host_limit'):
+                kwargs['per_host_limit'] = max(1, kwargs['per_host_limit'] // len(ports))
+            if kwargs.get('per_host_rate'):
+                kwargs['per_host_rate'] = kwargs['per_host_rate'] / len(ports)
+
+        # Limits across ALL hosts are split between the shards
+        for key in ('rate', 'sweep_rate'):
+            if kwargs.get(key):
+                kwargs[key] = kwargs[key] / len(targets)
+        if kwargs.get('max_workers'):
+            kwargs['max_workers'] = max(1, kwargs['max_workers'] // len(targets))
+
+        # Ports done already (resumed scan)  -  every shard skips them
+        if self.done:
+            kwargs['done'] = self.done
+
+        return list(zip(targets, ports, [kwargs] * len(targets)))
+
+    def scan(self):
+        # 'spawn'  -  a clean interpreter per shard (forking a process that runs GUI / scanner threads isn't safe)
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue()
+        running = context.Event()
+        running.set()
+        cancelled = context.Event()
+
+        shards = self.plan_shards()
+        self.shard_scanned = [0] * len(shards)
+        processes = [context.Process(target=run_shard, daemon=True,
+                                     args=(shard, self.shard_engine, target, ports, kwargs, results, running,
+                                           cancelled))
+                     for shard, (target, ports, kwargs) in enumerate(shards)]
+        for process in processes:
+            process.start()
+
+        # Merge the shards' results into one stream (until every shard is done)
+        finished = set()
+        while len(finished) < len(processes):
+            # Pass pause / resume / cancel on to the shards
+            if self.cancelled.is_set():
+                cancelled.set()
+            if self.running.is_set():
+                running.set()
+            else:
+                running.clear()
+
+            try:
+                kind, shard, payload = results.get(timeout=0.1)
+            except queue.Empty:
+                # A shard that died without saying it was done (crashed / killed) won't send anything more  -  its
+                # hosts / ports are missing: the scan failed (& the other shards are stopped)
+                # (only once nothing is left to read: a shard that has exited has sent everything it ever will)
+                for shard, process in enumerate(processes):
+                    if shard not in finished and process.exitcode is not None and results.empty():
+                        finished.add(shard)
+                        if self.error is None:
+                            self.error = RuntimeError(f"shard {shard} exited with code {process.exitcode}")
+                        cancelled.set()
+                continue
+
+            if kind == 'rows':
+                if self.checkpoint is not None:
+                    self.checkpoint.record(payload)
+                self.data.extend(payload)
+                self.shard_scanned[shard] += len(payload)
+                self.queue.put(payload)
+            elif kind == 'metrics':
+                self.metrics.set_child(shard, payload)
+            elif kind == 'services':
+                for host, port, service, detail in payload:
+                    self.data.set_service(host, port, service, detail)
+                self.queue.put(ServiceBatch(payload))
+            else:  # 'done'
+                finished.add(shard)
+                self.shards_done += 1
+                self.dead_hosts.update(payload['dead_hosts'])
+                for host, stats in payload['rtt'].items():
+                    # (a host scanned by several shards keeps the estimate with the most samples)
+                    if host not in self.shard_rtt or stats['samples'] > self.shard_rtt[host]['samples']:
+                        self.shard_rtt[host] = stats
+                self.shard_rates.append(payload['rate'])
+                # A shard that failed fails the scan  -  the other shards are stopped (their results so far are kept)
+                if payload['error'] is not None:
+                    if self.error is None:
+                        self.error = RuntimeError(f"shard {shard}: {payload['error']}")
+                    cancelled.set()
+
+        for process in processes:
+            process.join()
+
+    # Progress across all the shards  -  {'scanned', 'total', 'shards', 'shards_done'}
+    @property
+    def progress(self):
+        progress = BasePortScanner.progress.fget(self)
+        progress['shards'] = len(self.shard_scanned)
+        progress['shards_done'] = self.shards_done
+        return progress
+
+    # RTT stats per host (from the shards that scanned them)
+    @property
+    def rtt_stats(self):
+        return dict(self.shard_rtt)
+
+    # Rate limits & backoffs added up over the shards
+    @property
+    def rate_stats(self):
+        stats = {'rate': None, 'per_host_rate': None, 'backoffs': 0}
+        for shard_stats in self.shard_rates:
+            for key in ('rate', 'per_host_rate'):
+                if shard_stats[key] is not None:
+                    stats[key] = (stats[key] or 0) + shard_stats[key]
+            stats['backoffs'] += shard_stats['backoffs']
+        return stats
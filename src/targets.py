@@ -0,0 +1,115 @@
+__all__ = ['TargetSet', 'parse_targets']
+
+# Target (host) specs  -  "10.0.0.5", "scanme.local", "10.0.0.0/24", "10.0.0.1-10.0.0.50", "10.0.0.1-50",
+# or any comma-separated mix of them  ("10.0.0.0/30, 192.168.1.10-12, localhost")
+
+# Import Libs
+import ipaddress
+
+
+# Set of target hosts parsed from a spec  -  ranges are kept as (first, last) numbers & expanded lazily while iterating
+class TargetSet:
+    def __init__(self, spec):
+        self.spec = spec
+
+        # Parsed parts of the spec (in order): (first, last) IPv4 numbers OR a hostname string
+        self.parts = []
+
+        for item in spec.split(","):
+            item = item.strip()
+            if item:
+                self.parts.append(self.parse_item(item))
+
+        if not self.parts:
+            raise ValueError("No target host given")
+
+    # Method to parse one comma-separated item of the spec
+    @staticmethod
+    def parse_item(item):
+        # CIDR block  ("10.0.0.0/24")
+        if "/" in item:
+            try:
+                network = ipaddress.IPv4Network(item, strict=False)
+            except ValueError:
+                raise ValueError(f"Invalid CIDR block: '{item}'") from None
+
+            first, last = int(network.network_address), int(network.broadcast_address)
+            # Skip the network & broadcast addresses (except for /31 & /32, which have none)
+            if network.prefixlen < 31:
+                first, last = first + 1, last - 1
+            return first, last
+
+        # Address range  ("10.0.0.1-10.0.0.50" or "10.0.0.1-50")
+        if "-" in item:
+            start, end = (x.strip() for x in item.split("-", 1))
+            try:
+                first = ipaddress.IPv4Address(start)
+            except ValueError:
+                # Not an address range  -  could still be a hostname with a '-' in it
+                return TargetSet.parse_host(item)
+
+            try:
+                if end.isdigit():  # Last octet only
+                    if int(end) > 255:
+                        raise ValueError
+                    last = ipaddress.IPv4Address((int(first) & 0xFFFFFF00) | int(end))
+                else:
+                    last = ipaddress.IPv4Address(end)
+            except ValueError:
+                raise ValueError(f"Invalid address range: '{item}'") from None
+
+            if last < first:
+                raise ValueError(f"Invalid address range (end before start): '{item}'")
+            return int(first), int(last)
+
+        # Single address  ("10.0.0.5")
+        try:
+            address = int(ipaddress.IPv4Address(item))
+            return address, address
+        except ValueError:
+            return TargetSet.parse_host(item)
+
+    # Method to check a hostname  ("scanme.local")
+    @staticmethod
+    def parse_host(item):
+        # Hostnames are only letters, digits, '-' & '.' (& '_', which some internal names have)  -  anything else is
+        # a typo
+        if not all(c.isalnum() or c in "-._" for c in item):
+            raise ValueError(f"Invalid target host: '{item}'")
+
+        # Labels (the parts between the dots) of 1-63 characters, not starting with '-'  (a final '.' is allowed)
+        labels = item[:-1].split(".") if item.endswith(".") else item.split(".")
+        if len(item) > 253 or not all(0 < len(label) <= 63 and not label.startswith("-") for label in labels):
+            raise ValueError(f"Invalid target host: '{item}'")
+
+        # Only digits  -  an IPv4 address with a typo ("10.0.0.300"), not a hostname
+        if all(label.isdigit() for label in labels):
+            raise ValueError(f"Invalid IP address: '{item}'")
+        return item
+
+    # Iterate the target hosts (as strings)  -  one at a time, nothing is expanded up front
+    def __iter__(self):
+        for part in self.parts:
+            if isinstance(part, str):
+                yield part
+            else:
+                for number in range(part[0], part[1] + 1):
+                    yield str(ipaddress.IPv4Address(number))
+
+    # Iterate the host names in the spec (the parts that need resolving)
+    def hostnames(self):
+        return [part for part in self.parts if isinstance(part, str)]
+
+    # Number of target hosts (without expanding the ranges)
+    def __len__(self):
+        return sum(1 if isinstance(part, str) else part[1] - part[0] + 1 for part in self.parts)
+
+    def __str__(self):
+        return self.spec
+
+
+# Function to parse a target spec  -  raises ValueError for an invalid spec
+def parse_targets(spec):
+    if isinstance(spec, TargetSet):
+        return spec
+    return TargetSet(spec)
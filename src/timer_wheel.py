@@ -0,0 +1,54 @@
+__all__ = ['TimerWheel']
+
+# Timer wheel  -  deadlines for thousands of connects without a timer (or a heap entry) each
+# Time is cut into 'tick' second slots around a ring of 'slots' dicts; a deadline is dropped into the slot of the
+# tick it falls in (rounded UP  -  never expires early) & each tick only looks at its own slot
+# Deadlines more than one turn of the ring away simply stay in their slot until their turn comes
+#
+# Adding & removing an item are O(1)  -  items that finish before their deadline are removed, so the wheel only
+# ever holds the items still pending (items must be hashable, each one in the wheel once)
+
+
+class TimerWheel:
+    def __init__(self, now, tick=0.01, slots=1024):
+        self.tick = tick
+        self.slots = [{} for _ in range(slots)]  # item -> due tick
+        self.due = {}  # item -> due tick (which slot it is in)
+        self.current = int(now / tick)  # Last tick expired
+
+    # Method to add an item expiring at 'deadline' (same clock as 'now')
+    def add(self, deadline, item):
+        due = max(-int(-deadline // self.tick), self.current + 1)
+        self.slots[due % len(self.slots)][item] = due
+        self.due[item] = due
+
+    # Method to remove an item before its deadline (nothing happens if it isn't in the wheel)
+    def remove(self, item):
+        due = self.due.pop(item, None)
+        if due is not None:
+            del self.slots[due % len(self.slots)][item]
+
+    # Method to take out every item whose deadline is at or before 'now'  -  returns them (in no special order)
+    def expire(self, now):
+        target = int(now / self.tick)
+        expired = []
+        if target <= self.current:
+            return expired
+
+        # Each slot between the last tick & this one (once round the ring at most)
+        size = len(self.slots)
+        for due_tick in range(self.current + 1, min(target, self.current + size) + 1):
+            slot = self.slots[due_tick % size]
+            if not slot:
+                continue
+            for item, due in list(slot.items()):
+                if due <= target:  # (otherwise due on a later turn of the ring)
+                    del slot[item]
+                    del self.due[item]
+                    expired.append(item)
+
+        self.current = target
+        return expired
+
+    def __len__(self):
+        return len(self.due)
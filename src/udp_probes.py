@@ -0,0 +1,76 @@
+__all__ = ['UdpProbe', 'PROBES', 'get_probe', 'reply_detail']
+
+# UDP probe payloads  -  most UDP services stay silent on an empty datagram, so well-known ports get a request
+# their service actually answers (a reply is the ONLY way to tell an open UDP port from a filtered one)
+# Ports not in the table get an empty datagram
+
+# Import Libs
+import struct
+
+# Max length of the detail text kept from a reply
+MAX_DETAIL = 80
+
+
+# Probe sent to a port  -  the service it is for & the datagram sent
+class UdpProbe:
+    __slots__ = ('service', 'payload')
+
+    def __init__(self, service, payload):
+        self.service = service
+        self.payload = payload
+
+
+# Function to build a DNS query  -  'name' as a list of labels, class 1 = IN / 3 = CHAOS
+def dns_query(labels, qtype, qclass=1, xid=0x5053):
+    question = b"".join(bytes([len(label)]) + label for label in labels) + b"\x00"
+    return struct.pack(">HHHHHH", xid, 0x0100, 1, 0, 0, 0) + question + struct.pack(">HH", qtype, qclass)
+
+
+# NetBIOS name of "*" (first-level encoded)  -  asks the host for its whole name table
+NBSTAT_NAME = b"\x20" + b"CK" + b"A" * 30 + b"\x00"
+
+# Probes of the well-known UDP ports
+PROBES = {
+    # DNS  -  version.bind TXT query (CHAOS class): answered by most servers, often with their version
+    53: UdpProbe("DNS", dns_query([b"version", b"bind"], 16, 3)),
+    # TFTP  -  read request for a (most likely missing) file: answered with the file or an error
+    69: UdpProbe("TFTP", b"\x00\x01" + b"r7tftp.txt\x00" + b"octet\x00"),
+    # RPC portmapper  -  NULL call (program 100000, version 2)
+    111: UdpProbe("RPC", struct.pack(">IIIIIIIIII", 0x72FE1AF1, 0, 2, 100000, 2, 0, 0, 0, 0, 0)),
+    # NTP  -  version 3 client request
+    123: UdpProbe("NTP", b"\x1b" + bytes(47)),
+    # NetBIOS name service  -  node status (NBSTAT) request for "*"
+    137: UdpProbe("NetBIOS", struct.pack(">HHHHHH", 0x80F0, 0, 1, 0, 0, 0) + NBSTAT_NAME + b"\x00\x21\x00\x01"),
+    # SNMP  -  v1 GetRequest of sysDescr.0 with the "public" community
+    161: UdpProbe("SNMP", bytes.fromhex("302602010004067075626c6963a019020101020100020100300e300c06082b06010201"
+                                        "0101000500")),
+    # SSDP  -  UPnP discovery request
+    1900: UdpProbe("SSDP", b"M-SEARCH * HTTP/1.1\r\nHOST: 239.255.255.250:1900\r\n"
+                           b"MAN: \"ssdp:discover\"\r\nMX: 1\r\nST: ssdp:all\r\n\r\n"),
+    # STUN  -  binding request
+    3478: UdpProbe("STUN", b"\x00\x01\x00\x00\x21\x12\xa4\x42" + b"PertScanSTUN"),
+    # SIP  -  OPTIONS request
+    5060: UdpProbe("SIP", b"OPTIONS sip:nm SIP/2.0\r\nVia: SIP/2.0/UDP nm;branch=z9hG4bK-pertscan;rport\r\n"
+                          b"From: <sip:nm@nm>;tag=root\r\nTo: <sip:nm2@nm2>\r\nCall-ID: 50000\r\nCSeq: 42 OPTIONS\r\n"
+                          b"Max-Forwards: 70\r\nContent-Length: 0\r\nContact: <sip:nm@nm>\r\n"
+                          b"Accept: application/sdp\r\n\r\n"),
+    # mDNS  -  DNS-SD service enumeration (PTR query, sent unicast to the port)
+    5353: UdpProbe("mDNS", dns_query([b"_services", b"_dns-sd", b"_udp", b"local"], 12, xid=0)),
+    # memcached  -  "stats" command (with the UDP frame header)
+    11211: UdpProbe("memcached", b"\x00\x01\x00\x00\x00\x01\x00\x00stats\r\n"),
+}
+
+# Probe of the ports not in the table  -  an empty datagram
+EMPTY = UdpProbe(None, b"")
+
+
+# Function to get the probe to send to a port
+def get_probe(port):
+    return PROBES.get(port, EMPTY)
+
+
+# Function to turn a reply into a short, printable detail text (the readable parts of it)
+def reply_detail(data):
+    text = data[:1024].decode("latin-1")
+    text = "".join(c if c.isprintable() else " " for c in text)
+    return " ".join(word for word in text.split() if len(word) > 1)[:MAX_DETAIL]
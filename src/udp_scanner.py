@@ -0,0 +1,355 @@
+__all__ = ['UdpPortScanner', 'UDP_SOCKETS']
+
+# UDP PortScanner  -  scans UDP ports from a FEW unprivileged, unconnected sockets (not one socket per port),
+# all driven by one selector loop in the scanner thread
+#
+# Each probe is a datagram the port's service answers (see udp_probes); replies are matched to their probe by
+# where they come from (address, port), so any number of ports share the same sockets:
+#
+#     reply                        ->  Open
+#     ICMP port unreachable        ->  Closed         (Linux: read from the sockets' error queue, IP_RECVERR)
+#     other ICMP unreachable       ->  Filtered
+#     no answer (after retries)    ->  Open|Filtered  (a silent service & a dropping firewall look the same)
+#
+# Without IP_RECVERR (non-Linux) the ICMP errors of unconnected sockets are not reported, so closed ports show up
+# as Open|Filtered too
+
+# Import Libs
+import sys
+import time
+import heapq
+import errno
+import socket
+import struct
+import selectors
+
+from src.port_catalog import get_catalog
+from src.results import ResultBatcher, SCAN_DONE, CLOSED, OPEN, FILTERED, OPEN_FILTERED, UNREACHABLE, UNRESOLVED, UDP
+from src.scheduler import ScanScheduler, BUSY
+from src.scanner import BasePortScanner, error_state
+from src.udp_probes import get_probe, reply_detail
+
+# Number of sockets the probes are sent from
+UDP_SOCKETS = 4
+
+# Receive buffer asked for on each socket (bytes)  -  replies pile up there between two reads
+RECEIVE_BUFFER = 1 << 20
+
+# Max size of a datagram read
+MAX_DATAGRAM = 4096
+
+# Socket option queueing ICMP errors on the socket's error queue (Linux; not in Python's socket module)
+IP_RECVERR = getattr(socket, "IP_RECVERR", 11 if sys.platform.startswith("linux") else None)
+MSG_ERRQUEUE = getattr(socket, "MSG_ERRQUEUE", 0x2000 if IP_RECVERR is not None else None)
+
+# struct sock_extended_err  -  errno, origin, ICMP type, ICMP code, ...
+SOCK_EXTENDED_ERR = struct.Struct("=IBBBBII")
+SO_EE_ORIGIN_ICMP = 2
+ICMP_DEST_UNREACH = 3
+ICMP_PORT_UNREACH = 3
+
+# Longest wait in the selector (seconds)
+MAX_WAIT = 0.1
+
+
+# Function to pick a default number of probes in flight  -  they cost no fd, but too many at once overflow the
+# receive buffers (& trip ICMP rate limits on the targets)
+def default_max_probes():
+    return 512
+
+
+# Probe waiting for an answer (several hosts if their names resolve to the same address)
+class PendingProbe:
+    __slots__ = ('hosts', 'port', 'sent', 'deadline')
+
+    def __init__(self, host, port, sent, deadline):
+        self.hosts = [host]
+        self.port = port
+        self.sent = sent
+        self.deadline = deadline
+
+
+# UDP PortScanner thread (runs separately from the main tkinter GUI thread)
+# Same contract as the other engines: args=(target, port_list), streams batches of
+# (ip, port, state, name, description, protocol) tuples to the queue, then SCAN_DONE when the scan is done
+class UdpPortScanner(BasePortScanner):
+    # Protocol scanned by the engine
+    protocol = UDP
+
+    # Method to get the default max number of probes in flight
+    def default_workers(self):
+        return default_max_probes()
+
+    # What happens during the thread process
+    def run(self):
+        try:
+            if self.verbose:
+                print("\nSCANNING...")
+
+            # Resolve the target host names once (up front)
+            self.resolve_targets()
+
+            # Load / start the checkpoint (if any)
+            self.open_checkpoint()
+
+            try:
+                # Start the port scan (results are streamed to the queue as they come in)
+                self.scan()
+            finally:
+                if self.checkpoint is not None:
+                    self.checkpoint.close()
+        except Exception as e:
+            # The scan failed  -  kept for the GUI / command line to report (the traceback is still printed)
+            self.fail(e)
+            raise
+        finally:
+            # (after the port scan is done  -  or has failed)
+            # Tell the Tkinter GUI thread that there are no more results coming
+            self.queue.put(SCAN_DONE)
+
+    # Method to open the sockets the probes are sent from  -  registered on 'selector'
+    def open_sockets(self, selector):
+        sockets = []
+        for _ in range(UDP_SOCKETS):
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.setblocking(False)
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECEIVE_BUFFER)
+            except OSError:  # (capped by the system  -  the default buffer will do)
+                pass
+            if IP_RECVERR is not None:
+                try:  # Queue the ICMP errors (port unreachable, ...) to read them with their address
+                    sock.setsockopt(socket.IPPROTO_IP, IP_RECVERR, 1)
+                except OSError:
+                    pass
+            sock.bind(("", 0))
+            selector.register(sock, selectors.EVENT_READ)
+            sockets.append(sock)
+        return sockets
+
+    def scan(self):
+        # Shared port metadata catalog (loaded once, constant-time lookups)
+        catalog = get_catalog()
+
+        # Number of probes in flight  -  capped, and never more than there are ports to scan
+        workers = max(1, min(self.max_workers, len(self.targets) * len(self.port_list)))
+
+        # Streams the results to the queue (& the checkpoint & 'data') in small batches
+        batcher = ResultBatcher(self.queue, checkpoint=self.checkpoint, store=self.data)
+
+        selector = selectors.DefaultSelector()
+        sockets = self.open_sockets(selector)
+        try:
+            # 1st pass: every (host, port) pair of all the targets  (incremental scan: priority ports first)
+            # (ports that get no answer are collected in 'retry' & probed again at the end with a longer timeout)
+            retry = {}
+            for scheduler in self.first_pass(workers):
+                self.scan_pass(selector, sockets, scheduler, workers, catalog, batcher, retry, 0)
+
+            # Retry passes: only the ports that got no answer (per host)
+            for attempt in range(1, self.retries + 1):
+                if not retry or self.cancelled.is_set():
+                    break
+                ports, retry = retry, {}
+                self.skip_dead_hosts(ports, catalog, batcher)
+                self.scan_pass(selector, sockets, ScanScheduler(list(ports), ports, workers, self.per_host_limit),
+                               workers, catalog, batcher, retry, attempt)
+        finally:
+            selector.close()
+            for sock in sockets:
+                sock.close()
+
+        # Send whatever is left in the batch
+        batcher.flush()
+
+    # Method to scan all the (host, port) pairs handed out by 'scheduler'  -  sends probes while there are free
+    # slots, reads the answers as they come in & times out the probes nobody answered
+    def scan_pass(self, selector, sockets, scheduler, workers, catalog, batcher, retry, attempt):
+        pending = {}  # (address, port) -> PendingProbe
+        deadlines = []  # Heap of (deadline, sequence number, (address, port))
+        in_flight = 0
+        sequence = 0
+        held = None  # Next probe to send  -  (host, address, port, time it may be sent at)
+        handed_out = False  # Every pair has been handed out by the scheduler
+
+        # Local ports of the sockets  -  probes of the scan's own ports arrive at these sockets & must not be taken
+        # for answers
+        own_ports = {sock.getsockname()[1] for sock in sockets}
+
+        # Function to report the result of a probe (for each of its hosts)
+        def finish(probe, state, now):
+            nonlocal in_flight
+            for host in probe.hosts:
+                in_flight -= 1
+                scheduler.done(host)
+                self.metrics.connect_done(state, now - probe.sent)
+                self.rate_limiter.report(state)
+                add_result(host, probe.port, state)
+
+        # Function to stream the result of a (host, port) pair
+        def add_result(host, port, state):
+            # No answer  -  probe it again at the end of the scan (no result yet)
+            if state == OPEN_FILTERED and attempt < self.retries:
+                retry.setdefault(host, []).append(port)
+                return
+
+            # Unreachable / unresolved  -  no point trying the rest of the host's ports
+            if state in (UNREACHABLE, UNRESOLVED):
+                self.give_up(host, state, scheduler, catalog, batcher)
+
+            port_name, port_description = catalog.lookup(port)
+            batcher.add((host, port, state, port_name, port_description, UDP), urgent=state == OPEN)
+
+            # If the port is open, output to console
+            if state == OPEN and self.verbose:
+                print(f'{host}: Port {port}/udp is open!')
+
+        # Function to handle an answer from (address, port)  -  a reply or an ICMP error
+        def answered(key, state, data=None):
+            probe = pending.pop(key, None)
+            if probe is None:  # Late / unexpected answer (probe timed out already)
+                return
+            now = time.monotonic()
+            self.get_rtt(probe.hosts[0]).add(now - probe.sent)
+            finish(probe, state, now)
+
+            # Identify the service from its reply
+            if data is not None and self.grab_banners:
+                for host in probe.hosts:
+                    self.found_service(host, probe.port, get_probe(probe.port).service, reply_detail(data))
+
+        # Function to read everything waiting on a socket  -  ICMP errors 1st (a pending error also fails the
+        # socket's next send / read)
+        def receive(sock):
+            if IP_RECVERR is not None:
+                while True:
+                    try:
+                        _, ancdata, _, address = sock.recvmsg(MAX_DATAGRAM, 512, MSG_ERRQUEUE)
+                    except OSError:  # Queue empty
+                        break
+                    for level, kind, data in ancdata:
+                        if len(data) >= SOCK_EXTENDED_ERR.size:
+                            answered(address[:2], icmp_state(SOCK_EXTENDED_ERR.unpack_from(data)))
+            while True:
+                try:
+                    data, address = sock.recvfrom(MAX_DATAGRAM)
+                except BlockingIOError:
+                    break
+                except ConnectionResetError:  # (Windows) ICMP error without its address  -  skip it
+                    continue
+                except OSError:
+                    break
+                if address[1] in own_ports and data == get_probe(sock.getsockname()[1]).payload:  # Our own probe
+                    continue
+                answered(address[:2], OPEN, data)
+
+        # Function to send the held probe  -  returns False if the socket can't take it right now
+        def send(now):
+            nonlocal held, in_flight, sequence
+            host, address, port, _ = held
+            key = (address, port)
+
+            if key in pending:  # Same address & port as a probe in flight (host names of the same address)
+                pending[key].hosts.append(host)
+            else:
+                sock = sockets[sequence % len(sockets)]
+                payload = get_probe(port).payload
+                try:
+                    sock.sendto(payload, key)
+                except BlockingIOError:  # Send buffer full  -  try again once the answers have been read
+                    return False
+                except OSError as e:
+                    # An ICMP error waiting on the socket fails the send  -  read it & try once more
+                    receive(sock)
+                    try:
+                        sock.sendto(payload, key)
+                    except BlockingIOError:
+                        return False
+                    except OSError as e:
+                        held = None
+                        in_flight += 1
+                        self.metrics.connect_started()
+                        finish(PendingProbe(host, port, now, now), error_state(e), now)
+                        return True
+
+                timeout = self.connect_timeout(self.get_rtt(host), attempt)
+                probe = pending[key] = PendingProbe(host, port, now, now + timeout)
+                heapq.heappush(deadlines, (probe.deadline, sequence, key))
+                sequence += 1
+
+            held = None
+            in_flight += 1
+            self.metrics.connect_started()
+            return True
+
+        while True:
+            now = time.monotonic()
+
+            # Probes nobody answered in time
+            while deadlines and deadlines[0][0] <= now:
+                _, _, key = heapq.heappop(deadlines)
+                probe = pending.get(key)
+                if probe is not None and probe.deadline <= now:
+                    del pending[key]
+                    finish(probe, OPEN_FILTERED, now)
+
+            # Cancelled  -  drop the probes in flight (no result) & stop
+            if self.cancelled.is_set():
+                for probe in pending.values():
+                    for host in probe.hosts:
+                        scheduler.done(host)
+                        self.metrics.connect_cancelled()
+                if held is not None:
+                    scheduler.done(held[0])
+                break
+
+            # Send probes while there are free slots (not while paused)
+            while self.running.is_set() and in_flight < workers:
+                if held is None:
+                    job = scheduler.next_job()
+                    if job is BUSY:  # Every active host is at its limit  -  wait for an answer / timeout
+                        break
+                    if job is None:  # Every pair has been handed out
+                        handed_out = True
+                        break
+
+                    host, port = job
+                    if host in self.dead_hosts:  # Host already given up on  -  report the port without scanning it
+                        scheduler.done(host)
+                        self.skip_ports(host, (port,), catalog, batcher)
+                        continue
+                    try:  # Host name -> address (cached, so only the 1st lookup of a host costs anything)
+                        address = self.resolver.resolve(host)
+                    except socket.gaierror:
+                        scheduler.done(host)
+                        add_result(host, port, UNRESOLVED)
+                        continue
+
+                    # Book the probe with the rate limiter (held until its time comes  -  the loop never sleeps)
+                    held = (host, address, port, now + self.rate_limiter.reserve(host))
+
+                if held[3] > now or not send(now):
+                    break
+
+            if handed_out and held is None and not pending:
+                break
+
+            # Wait for answers  -  until the next probe times out / may be sent (at most MAX_WAIT, so pause & cancel
+            # are seen)
+            wait = MAX_WAIT
+            if deadlines:
+                wait = min(wait, deadlines[0][0] - now)
+            if held is not None and in_flight < workers:
+                wait = min(wait, held[3] - now)
+            for key, _ in selector.select(max(0.0, wait)):
+                receive(key.fileobj)
+
+
+# Function to get the port state for an ICMP error (sock_extended_err fields)
+def icmp_state(fields):
+    error, origin, kind, code = fields[:4]
+    if origin == SO_EE_ORIGIN_ICMP and kind == ICMP_DEST_UNREACH:
+        if code == ICMP_PORT_UNREACH:  # Nothing listening on the port
+            return CLOSED
+        return FILTERED  # Host / network unreachable or administratively prohibited  -  a firewall answered
+    return error_state(OSError(error, errno.errorcode.get(error, "")))
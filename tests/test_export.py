@@ -0,0 +1,81 @@
+# Tests of the result files  -  written & read back, & binary files cut short / damaged
+#
+# Run from the repository root:
+#     python -m unittest discover tests
+
+# Import Libs
+import os
+import tempfile
+import unittest
+
+from src.export import open_writer, read_results
+from src.diff import Baseline
+from src.results import OPEN, CLOSED, FILTERED, TCP, UDP
+
+ROWS = [("10.0.0.1", 22, OPEN, "", "", TCP), ("10.0.0.1", 23, CLOSED, "", "", TCP),
+        ("10.0.0.2", 53, FILTERED, "", "", UDP), ("host.example", 443, OPEN, "", "", TCP)]
+
+
+class ResultFileTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    # Function to write ROWS (in two batches) to a file  -  returns its path
+    def write(self, name):
+        path = os.path.join(self.directory.name, name)
+        with open_writer(path) as writer:
+            writer.write(ROWS[:2])
+            writer.write(ROWS[2:])
+        return path
+
+    # Function to get the (ip, port, state, protocol) of each row read back from a file
+    @staticmethod
+    def read(path):
+        return [(row[0], row[1], row[2], row[5]) for row in read_results(path)]
+
+    def test_round_trip(self):
+        expected = [(row[0], row[1], row[2], row[5]) for row in ROWS]
+        for name in ("results.csv", "results.jsonl", "results.bin"):
+            with self.subTest(name):
+                self.assertEqual(self.read(self.write(name)), expected)
+
+    def test_binary_cut_short(self):
+        path = self.write("results.bin")
+        with open(path, "rb") as f:
+            data = f.read()
+
+        # Cut at every offset  -  either the whole blocks before the cut are read, or a ValueError (never anything else)
+        cut_path = os.path.join(self.directory.name, "cut.bin")
+        loaded = set()
+        for size in range(len(data)):
+            with open(cut_path, "wb") as f:
+                f.write(data[:size])
+            try:
+                loaded.add(len(self.read(cut_path)))
+            except ValueError:
+                continue
+        # (only cuts between blocks load: after the 1st block of rows, or before any)
+        self.assertEqual(loaded, {0, 2})
+
+    def test_binary_damaged(self):
+        path = self.write("results.bin")
+        with open(path, "rb") as f:
+            data = bytearray(f.read())
+        # 1st row's host number  -  after the header (5), the hosts block (5 + 2 + 8) & the rows block's tag / count (5)
+        data[5 + 15 + 5] = 99
+        with open(path, "wb") as f:
+            f.write(data)
+        with self.assertRaises(ValueError):
+            self.read(path)
+
+    def test_baseline_cut_short(self):
+        path = self.write("results.bin")
+        with open(path, "r+b") as f:
+            f.truncate(os.path.getsize(path) - 3)
+        with self.assertRaises(ValueError):
+            Baseline.load(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
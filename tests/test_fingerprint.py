@@ -0,0 +1,180 @@
+# Tests of the banner grabbing stage  -  against local (loopback) listeners playing a few services
+#
+# Run from the repository root:
+#     python -m unittest discover tests
+
+# Import Libs
+import os
+import ssl
+import time
+import socket
+import threading
+import unittest
+from unittest import mock
+
+from src import fingerprint
+from src.fingerprint import BannerGrabber, grab_banner
+
+HOST = "127.0.0.1"
+
+# Self-signed certificate & key of the TLS listener
+CERTIFICATE = os.path.join(os.path.dirname(__file__), "localhost.pem")
+
+
+# Local listener  -  runs 'handler(conn)' on its own thread for each connection (closes the connection after it)
+class Listener:
+    def __init__(self, handler, tls=False):
+        self.handler = handler
+        self.context = None
+        if tls:
+            self.context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            self.context.load_cert_chain(CERTIFICATE)
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.bind((HOST, 0))
+        self.sock.listen(16)
+        self.port = self.sock.getsockname()[1]
+        threading.Thread(target=self.accept, daemon=True).start()
+
+    def accept(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:  # Closed
+                return
+            threading.Thread(target=self.serve, args=(conn,), daemon=True).start()
+
+    def serve(self, conn):
+        try:
+            conn.settimeout(5)
+            if self.context is not None:
+                conn = self.context.wrap_socket(conn, server_side=True)
+            self.handler(conn)
+        except OSError:  # (the scanner hung up  -  or a plain text client on the TLS port)
+            pass
+        finally:
+            conn.close()
+
+    def close(self):
+        self.sock.close()
+
+
+# Services played by the listeners
+def ssh(conn):
+    conn.sendall(b"SSH-2.0-OpenSSH_9.6p1 Ubuntu-3\r\n")
+    conn.recv(256)
+
+
+def http(conn):
+    conn.recv(1024)
+    conn.sendall(b"HTTP/1.1 200 OK\r\nServer: nginx/1.25.3\r\nContent-Length: 0\r\n\r\n")
+
+
+def smtp(conn):
+    conn.sendall(b"220 mail.example.test ESMTP Postfix\r\n")
+    if conn.recv(256).startswith(b"EHLO"):
+        conn.sendall(b"250-mail.example.test\r\n250-PIPELINING\r\n250-STARTTLS\r\n250 8BITMIME\r\n")
+    conn.recv(256)
+
+
+def silent(conn):
+    conn.recv(1024)
+
+
+class GrabBannerTest(unittest.TestCase):
+    def setUp(self):
+        self.listeners = []
+
+    def tearDown(self):
+        for listener in self.listeners:
+            listener.close()
+
+    def listen(self, handler, tls=False):
+        listener = Listener(handler, tls)
+        self.listeners.append(listener)
+        return listener.port
+
+    def grab(self, port):
+        return grab_banner(HOST, port, connect_timeout=2, read_timeout=0.3)
+
+    def test_plain_banner(self):
+        self.assertEqual(self.grab(self.listen(ssh)), ("SSH", "OpenSSH_9.6p1 Ubuntu-3"))
+
+    def test_http(self):
+        self.assertEqual(self.grab(self.listen(http)), ("HTTP", "nginx/1.25.3"))
+
+    def test_smtp_starttls(self):
+        port = self.listen(smtp)
+        with mock.patch.dict(fingerprint.PROBES, {port: fingerprint.PROBES[25]}):
+            self.assertEqual(self.grab(port), ("SMTP+STARTTLS", "mail.example.test ESMTP Postfix"))
+
+    def test_smtp_without_probe(self):
+        # (a port without a probe  -  the greeting alone is matched)
+        self.assertEqual(self.grab(self.listen(smtp)), ("SMTP", "mail.example.test ESMTP Postfix"))
+
+    def test_tls_on_unusual_port(self):
+        self.assertEqual(self.grab(self.listen(http, tls=True)), ("HTTPS", "nginx/1.25.3"))
+
+    def test_tls_port(self):
+        port = self.listen(ssh, tls=True)
+        with mock.patch.object(fingerprint, "TLS_PORTS", frozenset((port,))):
+            self.assertEqual(self.grab(port), ("SSH/TLS", "OpenSSH_9.6p1 Ubuntu-3"))
+
+    def test_silent(self):
+        self.assertEqual(self.grab(self.listen(silent)), (None, ""))
+
+    def test_closed(self):
+        port = self.listen(silent)
+        self.listeners.pop().close()
+        self.assertEqual(self.grab(port), (None, ""))
+
+
+class BannerGrabberTest(unittest.TestCase):
+    # Slow fingerprinting  -  every port takes 'delay' seconds
+    def grabber(self, workers, delay):
+        found = []
+        grabber = BannerGrabber(lambda *result: found.append(result), workers=workers)
+        patcher = mock.patch.object(fingerprint, "grab_banner", lambda *args: (time.sleep(delay), ("SSH", ""))[1])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return grabber, found
+
+    def test_no_wait_when_full(self):
+        grabber, found = self.grabber(workers=2, delay=0.05)
+        started = time.monotonic()
+        for port in range(100):
+            grabber.submit("h", HOST, port, wait=False)
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertLessEqual(grabber.executor._work_queue.qsize(), 2 * grabber.QUEUED_PER_WORKER)
+
+        grabber.close()
+        self.assertEqual(sorted(port for _, port, _, _ in found), list(range(100)))
+
+    def test_parked_ports_are_started(self):
+        grabber, found = self.grabber(workers=1, delay=0.01)
+        for port in range(20):
+            grabber.submit("h", HOST, port, wait=False)
+        deadline = time.monotonic() + 5
+        while len(found) < 20 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(found), 20)
+        self.assertFalse(grabber.parked)
+        grabber.close()
+
+    def test_cancel_drops_parked_ports(self):
+        grabber, found = self.grabber(workers=1, delay=0.05)
+        for port in range(50):
+            grabber.submit("h", HOST, port, wait=False)
+        grabber.close(cancel=True)
+        self.assertLess(len(found), 50)
+
+    def test_each_port_once(self):
+        grabber, found = self.grabber(workers=2, delay=0)
+        for _ in range(3):
+            grabber.submit("h", HOST, 22)
+        grabber.close()
+        self.assertEqual(found, [("h", 22, "SSH", "")])
+
+
+if __name__ == "__main__":
+    unittest.main()